@@ -0,0 +1,79 @@
+# compare event loop time with VACUUM (ANALYZE) on every loop against
+# threshold based table maintenance
+#
+# run against the local docker postgres (docker-compose up rail_pm_rds) with the
+# .env file variables exported. a scratch table is created and dropped.
+#
+# every run starts from a freshly created and vacuumed table, runs alternate in
+# ABBA order so neither strategy always goes first.
+#
+# results of two invocations, 1 cpu / 6 GB, postgres 16.2, each the mean of
+# the two runs of a strategy
+#   VACUUM (ANALYZE) every loop: 8.76s, 9.13s (~0.45s per loop)
+#   threshold maintenance:       4.55s, 4.16s (~0.22s per loop)
+import time
+from typing import Dict, List
+
+import sqlalchemy as sa
+
+from lamp_py.postgres.postgres_utils import DatabaseIndex, DatabaseManager
+
+TABLE_ROWS = 2_000_000
+ROWS_PER_LOOP = 5_000
+LOOPS = 20
+
+benchmark_table = sa.Table(
+    "maintenance_benchmark",
+    sa.MetaData(),
+    sa.Column("pk_id", sa.Integer, primary_key=True),
+    sa.Column("service_date", sa.Integer, nullable=False),
+    sa.Column("stop_timestamp", sa.Integer, nullable=True),
+)
+
+
+def run_loops(db_manager: DatabaseManager, maintain: bool) -> float:
+    """run LOOPS updates of ROWS_PER_LOOP rows followed by table maintenance"""
+    start = time.monotonic()
+    for loop in range(LOOPS):
+        db_manager.execute(
+            sa.update(benchmark_table)
+            .where(benchmark_table.c.pk_id % (TABLE_ROWS // ROWS_PER_LOOP) == loop)
+            .values(stop_timestamp=benchmark_table.c.stop_timestamp + 1)
+        )
+        if maintain:
+            db_manager.maintain_table(benchmark_table)
+        else:
+            db_manager.vacuum_analyze(benchmark_table)
+    return time.monotonic() - start
+
+
+def create_table(db_manager: DatabaseManager) -> None:
+    """create and fill a freshly vacuumed benchmark table"""
+    benchmark_table.drop(db_manager.engine, checkfirst=True)
+    benchmark_table.create(db_manager.engine)
+    db_manager.execute(
+        sa.text(
+            f"INSERT INTO {benchmark_table.name} (service_date, stop_timestamp) "
+            f"SELECT 20240101 + i % 30, i FROM generate_series(1, {TABLE_ROWS}) AS i;"
+        )
+    )
+    db_manager.vacuum_analyze(benchmark_table)
+
+
+rpm_db_manager = DatabaseManager(db_index=DatabaseIndex.RAIL_PERFORMANCE_MANAGER)
+run_seconds: Dict[bool, List[float]] = {False: [], True: []}
+
+try:
+    for maintain_run in (False, True, True, False):
+        create_table(rpm_db_manager)
+        run_seconds[maintain_run].append(run_loops(rpm_db_manager, maintain=maintain_run))
+finally:
+    benchmark_table.drop(rpm_db_manager.engine, checkfirst=True)
+
+every_loop_seconds = sum(run_seconds[False]) / len(run_seconds[False])
+maintained_seconds = sum(run_seconds[True]) / len(run_seconds[True])
+
+print(f"{LOOPS} loops updating {ROWS_PER_LOOP} of {TABLE_ROWS} rows, mean of {len(run_seconds[False])} runs")
+print(f"VACUUM (ANALYZE) every loop: {every_loop_seconds:.2f}s ({every_loop_seconds / LOOPS:.3f}s per loop)")
+print(f"threshold maintenance:       {maintained_seconds:.2f}s ({maintained_seconds / LOOPS:.3f}s per loop)")
+print(f"runs: {run_seconds}")
@@ -0,0 +1,156 @@
+# compare the previous pandas path for vehicle position events, carriage lists
+# converted to python objects, a pivot_table and row by row consist strings,
+# against the polars list join and group by path, on a full day of synthetic
+# multi-car vehicle positions
+#
+# run from the repository root with the lamp_py package installed. ROWS is
+# roughly the number of rail vehicle positions in a weekday, a smaller row
+# count can be passed as the first argument. each path is run in its own
+# process so peak resident memory can be compared.
+import resource
+import sys
+import time
+from multiprocessing import get_context
+from typing import Callable, Dict, Tuple, Union
+
+import numpy
+import pandas
+import polars as pl
+import pyarrow
+
+from lamp_py.performance_manager.gtfs_utils import unique_trip_stop_columns
+from lamp_py.performance_manager.l0_rt_vehicle_positions import consist_labels_expr, transform_vp_timestamps
+
+ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 4_000_000
+STOPS_PER_TRIP = 20
+POSITIONS_PER_STOP = 25
+TRIPS = max(1, ROWS // (STOPS_PER_TRIP * POSITIONS_PER_STOP))
+CARS_PER_TRAIN = 6
+
+
+def carriage_array(rng: numpy.random.Generator, null_fraction: float) -> pyarrow.Array:
+    """list of carriage label structs for every row, like the gtfs-rt parquet files"""
+    labels = pyarrow.array(rng.integers(1000, 2000, ROWS * CARS_PER_TRAIN)).cast(pyarrow.string())
+    carriages = pyarrow.StructArray.from_arrays([labels], names=["label"])
+    offsets = pyarrow.array(numpy.arange(0, ROWS * CARS_PER_TRAIN + 1, CARS_PER_TRAIN, dtype=numpy.int32))
+    mask = pyarrow.array(rng.random(ROWS) < null_fraction)
+    return pyarrow.ListArray.from_arrays(offsets, carriages, mask=mask)
+
+
+def synthetic_vehicle_positions() -> pyarrow.Table:
+    """full day of vehicle positions, as read from parquet after transform_vp_datatypes"""
+    rng = numpy.random.default_rng(0)
+    trip = numpy.sort(rng.integers(0, TRIPS, ROWS))
+    stop = rng.integers(0, STOPS_PER_TRIP, ROWS)
+    return pyarrow.table(
+        {
+            "service_date": pyarrow.array(numpy.full(ROWS, 20240101)),
+            "route_id": pyarrow.array(numpy.array(["Red", "Orange", "Blue"])[trip % 3]),
+            "trip_id": pyarrow.array(trip.astype(str)),
+            "parent_station": pyarrow.array(numpy.char.add("place-", stop.astype(str))),
+            "stop_id": pyarrow.array(stop.astype(str)),
+            "stop_sequence": pyarrow.array(stop),
+            "start_time": pyarrow.array(trip * 10),
+            "direction_id": pyarrow.array(trip % 2 == 0),
+            "vehicle_id": pyarrow.array(numpy.char.add("R-", (trip % 200).astype(str))),
+            "vehicle_label": pyarrow.array((trip % 200).astype(str)),
+            "revenue": pyarrow.array(numpy.full(ROWS, True)),
+            "static_version_key": pyarrow.array(numpy.full(ROWS, 1)),
+            "is_moving": pyarrow.array(rng.random(ROWS) < 0.5),
+            "vehicle_timestamp": pyarrow.array(1704085000 + numpy.arange(ROWS, dtype=numpy.int64)),
+            "vehicle_consist": carriage_array(rng, null_fraction=0.5),
+            "multi_carriage_details": carriage_array(rng, null_fraction=0.0),
+        }
+    )
+
+
+def to_pandas(table: Union[pyarrow.Table, pl.DataFrame]) -> pandas.DataFrame:
+    """pandas vehicle positions with nullable integer columns"""
+    vehicle_positions = table.to_pandas()
+    for column in ("service_date", "start_time"):
+        vehicle_positions[column] = vehicle_positions[column].astype("Int64")
+    return vehicle_positions
+
+
+def pivot_path(table: pyarrow.Table) -> pandas.DataFrame:
+    """previous pivot_table and map(lambda) implementation of transform_vp_timestamps"""
+    vehicle_positions = to_pandas(table)
+    trip_stop_columns = unique_trip_stop_columns()
+
+    vp_timestamps = pandas.pivot_table(
+        vehicle_positions,
+        index=trip_stop_columns,
+        columns="is_moving",
+        aggfunc={"vehicle_timestamp": "min"},
+    ).reset_index(drop=False)
+
+    rename_mapper: Dict[Tuple[str, Union[str, bool]], str] = {(column, ""): column for column in trip_stop_columns}
+    rename_mapper.update({("vehicle_timestamp", True): "vp_move_timestamp"})
+    rename_mapper.update({("vehicle_timestamp", False): "vp_stop_timestamp"})
+
+    vp_timestamps.columns = vp_timestamps.columns.to_flat_index()  # type: ignore[attr-defined]
+    vp_timestamps = vp_timestamps.rename(columns=rename_mapper)
+
+    vehicle_positions = vehicle_positions.drop(columns=["is_moving", "vehicle_timestamp"]).drop_duplicates(
+        subset=trip_stop_columns
+    )
+    vehicle_positions = pandas.merge(
+        vp_timestamps,
+        vehicle_positions,
+        how="left",
+        on=trip_stop_columns,
+        validate="one_to_one",
+    )
+
+    vehicle_positions["vp_move_timestamp"] = vehicle_positions["vp_move_timestamp"].astype("Int64")
+    vehicle_positions["vp_stop_timestamp"] = vehicle_positions["vp_stop_timestamp"].astype("Int64")
+
+    for column in ("vehicle_consist", "multi_carriage_details"):
+        vehicle_positions[column] = vehicle_positions[column].map(
+            lambda vc: "|".join(str(vc_val["label"]) for vc_val in vc),
+            na_action="ignore",
+        )
+
+    vehicle_positions["vehicle_consist"] = numpy.where(
+        vehicle_positions["vehicle_consist"].isnull(),
+        vehicle_positions["multi_carriage_details"],
+        vehicle_positions["vehicle_consist"],
+    )
+    return vehicle_positions.drop(columns=["multi_carriage_details"])
+
+
+def polars_path(table: pyarrow.Table) -> pandas.DataFrame:
+    """consist strings built on read, as in get_vp_dataframe, then transform_vp_timestamps"""
+    vehicle_positions = pl.from_arrow(table)
+    assert isinstance(vehicle_positions, pl.DataFrame)
+    vehicle_positions = vehicle_positions.with_columns(
+        consist_labels_expr(column, vehicle_positions.schema[column])
+        for column in ("vehicle_consist", "multi_carriage_details")
+    )
+    return transform_vp_timestamps(to_pandas(vehicle_positions))
+
+
+def measure(path: Callable[[pyarrow.Table], pandas.DataFrame]) -> Tuple[float, float, pandas.DataFrame]:
+    """run path on a full day, returning seconds, peak resident MB and the events"""
+    table = synthetic_vehicle_positions()
+    start = time.monotonic()
+    events = path(table)
+    seconds = time.monotonic() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return seconds, peak_mb, events
+
+
+if __name__ == "__main__":
+    with get_context("spawn").Pool(1, maxtasksperchild=1) as pool:
+        pivot_seconds, pivot_mb, pivot_events = pool.apply(measure, (pivot_path,))
+        polars_seconds, polars_mb, polars_events = pool.apply(measure, (polars_path,))
+
+    pandas.testing.assert_frame_equal(
+        pivot_events[polars_events.columns].reset_index(drop=True),
+        polars_events,
+        check_dtype=False,
+    )
+
+    print(f"{ROWS} vehicle positions, {polars_events.shape[0]} trip stop events")
+    print(f"pivot_table + map: {pivot_seconds:.2f}s, peak rss {pivot_mb:.0f} MB")
+    print(f"polars group_by:   {polars_seconds:.2f}s, peak rss {polars_mb:.0f} MB")
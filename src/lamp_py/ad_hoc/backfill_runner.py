@@ -117,7 +117,7 @@ class GtfsRtTripsAdHocConverter(GtfsRtConverter):
             # self.move_s3_files()
             # self.clean_local_folders()
 
-    def write_local_pq(self, table: pyarrow.Table, local_path: str) -> None:
+    def write_local_pq(self, table: pyarrow.Table, local_path: str) -> bool:
         """
         just write the file out..
         """
@@ -126,6 +126,7 @@ class GtfsRtTripsAdHocConverter(GtfsRtConverter):
         writer = pq.ParquetWriter(local_path, schema=table.schema, compression="zstd", compression_level=3)
         writer.write_table(table)
         writer.close()
+        return False
 
     def process_files(self) -> Iterable[pyarrow.table]:
         """
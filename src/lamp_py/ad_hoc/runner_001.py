@@ -47,6 +47,7 @@ class AdHocConverter(GtfsRtConverter):
         else:
             process_logger.log_complete()
         finally:
+            self.compact_springboard_files()
             self.clean_local_folders()
 
     def sync_with_s3(self, local_path: str) -> bool:
@@ -0,0 +1,103 @@
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    TypeVar,
+)
+
+import boto3
+from botocore.config import Config
+from pyarrow import fs
+
+T = TypeVar("T")
+
+# seconds that a pooled client can go unused before it is replaced, so that
+# long idle processes do not hold on to stale connections
+IDLE_SECONDS = 5 * 60
+
+
+def max_attempts() -> int:
+    """
+    number of attempts for each aws request, including the first one.
+    configured with the AWS_MAX_ATTEMPTS environment variable
+    """
+    return int(os.environ.get("AWS_MAX_ATTEMPTS", 5))
+
+
+@dataclass
+class PooledClient:
+    """client or filesystem held by the pool"""
+
+    value: Any
+    last_used: float
+
+
+class ClientPool:
+    """
+    process wide registry of aws clients and filesystems
+
+    creating a client resolves credentials and opens new connections, so
+    clients are created once per process and reused by all threads. boto3
+    clients and pyarrow filesystems are thread safe, but can not be shared
+    with forked processes. the pool starts over in forked children, spawned
+    processes start with an empty pool.
+    """
+
+    def __init__(self) -> None:
+        self.clients: Dict[str, PooledClient] = {}
+        self.lock = threading.Lock()
+
+    def reset(self) -> None:
+        """drop all pooled clients"""
+        self.clients = {}
+        self.lock = threading.Lock()
+
+    def get(self, name: str, factory: Callable[[], T]) -> T:
+        """
+        get the pooled client for name, creating it with factory if it does
+        not exist or has been idle for longer than IDLE_SECONDS
+        """
+        now = time.monotonic()
+        with self.lock:
+            pooled = self.clients.get(name)
+            if pooled is None or now - pooled.last_used > IDLE_SECONDS:
+                pooled = PooledClient(value=factory(), last_used=now)
+                self.clients[name] = pooled
+            pooled.last_used = now
+            return pooled.value
+
+
+POOL = ClientPool()
+os.register_at_fork(after_in_child=POOL.reset)
+
+
+def get_client(service_name: str) -> boto3.client:
+    """
+    get the pooled boto3 client for an aws service
+    """
+
+    def create_client() -> boto3.client:
+        # sessions are not thread safe, each client gets its own
+        return boto3.session.Session().client(
+            service_name,
+            config=Config(
+                retries={"total_max_attempts": max_attempts(), "mode": "standard"},
+                max_pool_connections=32,
+            ),
+        )
+
+    return POOL.get(f"client_{service_name}", create_client)
+
+
+def get_s3_filesystem() -> fs.S3FileSystem:
+    """
+    get the pooled pyarrow s3 filesystem
+    """
+    return POOL.get(
+        "s3_filesystem",
+        lambda: fs.S3FileSystem(retry_strategy=fs.AwsStandardS3RetryStrategy(max_attempts=max_attempts())),
+    )
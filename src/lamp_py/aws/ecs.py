@@ -5,8 +5,7 @@ from multiprocessing import Process
 from queue import Queue
 from typing import Any, Optional
 
-import boto3
-
+from lamp_py.aws.client_pool import get_client
 from lamp_py.runtime_utils.process_logger import ProcessLogger
 
 
@@ -62,7 +61,7 @@ def check_for_parallel_tasks() -> None:
     process_logger = ProcessLogger("check_for_tasks")
     process_logger.log_start()
 
-    client = boto3.client("ecs")
+    client = get_client("ecs")
     ecs_cluster = os.environ["ECS_CLUSTER"]
     ecs_task_group = os.environ["ECS_TASK_GROUP"]
 
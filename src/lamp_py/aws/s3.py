@@ -1,11 +1,14 @@
+import hashlib
 import logging
 import os
+import pathlib
+import random
 import re
 import time
-from concurrent.futures import ThreadPoolExecutor
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import date, datetime, timezone
 from io import BytesIO
-from threading import current_thread
 from typing import (
     IO,
     Callable,
@@ -13,6 +16,7 @@ from typing import (
     Iterator,
     List,
     Optional,
+    Tuple,
     Union,
     cast,
 )
@@ -20,23 +24,26 @@ from typing import (
 import boto3
 import botocore
 import botocore.exceptions
+from boto3.s3.transfer import TransferConfig
 import pandas
+import polars as pl
 import pyarrow as pa
 import pyarrow.compute as pc
 import pyarrow.dataset as pd
 import pyarrow.parquet as pq
 from botocore.exceptions import ClientError
-from pyarrow import Table, fs
+from pyarrow import Table
 from pyarrow.util import guid
 
+from lamp_py.aws.client_pool import get_client, get_s3_filesystem
 from lamp_py.runtime_utils.lamp_exception import LampInvalidReplacementError
 from lamp_py.runtime_utils.process_logger import ProcessLogger, override_log_level
 from lamp_py.utils.date_range_builder import build_data_range_paths
 
 
 def get_s3_client() -> boto3.client:
-    """Thin function needed for stubbing tests"""
-    return boto3.client("s3")
+    """Thin function needed for stubbing tests, returns the pooled s3 client"""
+    return get_client("s3")
 
 
 def upload_file(file_name: str, object_path: str, extra_args: Optional[Dict] = None) -> bool:
@@ -220,6 +227,92 @@ def object_exists(obj: str) -> bool:
         raise exception
 
 
+def object_etag(obj: str) -> Optional[str]:
+    """
+    Get the ETag of an s3 object, also used as an existence check
+
+    will raise on any error other than "NoSuchKey"
+
+    :param obj - expected as 's3://my_bucket/object' or 'my_bucket/object'
+
+    :return: ETag of object without quotes if object exists, otherwise None
+    """
+    try:
+        s3_client = get_s3_client()
+
+        # trim off leading s3://
+        obj = obj.replace("s3://", "")
+
+        # split into bucket and object name
+        bucket, obj = obj.split("/", 1)
+
+        object_head = s3_client.head_object(Bucket=bucket, Key=obj)
+        return str(object_head["ETag"]).strip('"')
+
+    except botocore.exceptions.ClientError as exception:
+        if exception.response["Error"]["Code"] == "404":
+            return None
+        raise exception
+
+
+# copies of replaced objects are kept until unused for this long, lazy frames
+# built by other processes only open their copy when collected
+CACHE_GRACE_SECONDS = 60 * 60
+
+
+def cached_download(object_path: str, cache_dir: str) -> Optional[str]:
+    """
+    Download an S3 object to a local cache directory, once per object ETag
+
+    cached files are named by a hash of object_path and the object ETag, so a
+    copy is reused until the object is replaced. every use of a copy updates
+    its modification time, copies of replaced objects are removed from the
+    cache directory once unused for CACHE_GRACE_SECONDS.
+
+    :param object_path: S3 object path to download from (including bucket)
+    :param cache_dir: local directory to cache object in
+
+    :return: path of cached file, object_path if the object could not be
+        downloaded, None if the object does not exist
+    """
+    etag = object_etag(object_path)
+    if etag is None:
+        return None
+
+    path_key = hashlib.sha1(object_path.encode()).hexdigest()
+    local_file = os.path.join(cache_dir, f"{path_key}-{etag}.parquet")
+    try:
+        os.utime(local_file)
+        return local_file
+    except FileNotFoundError:
+        pass
+
+    os.makedirs(cache_dir, exist_ok=True)
+    download_path = f"{local_file}.{os.getpid()}"
+    try:
+        if not download_file(object_path, download_path):
+            return object_path
+        os.replace(download_path, local_file)
+    except OSError:
+        return object_path
+    finally:
+        pathlib.Path(download_path).unlink(missing_ok=True)
+
+    # drop copies of replaced versions of the object that are no longer in
+    # use, in progress downloads of other processes are left alone
+    stale_before = time.time() - CACHE_GRACE_SECONDS
+    for cached_file in pathlib.Path(cache_dir).glob(f"{path_key}-*.parquet"):
+        if str(cached_file) == local_file:
+            continue
+        try:
+            if cached_file.stat().st_mtime < stale_before:
+                cached_file.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+
+    return local_file
+
+
 def version_check(obj: str, version: str) -> bool:
     """
     Compare an s3 file's lamp version to a given version
@@ -247,10 +340,184 @@ def get_zip_buffer(filename: str) -> IO[bytes]:
     # inspired by
     # https://betterprogramming.pub/unzip-and-gzip-incoming-s3-files-with-aws-lambda-f7bccf0099c9
     (bucket, file) = filename.split("/", 1)
-    s3_resource = boto3.resource("s3")
-    zipped_file = s3_resource.Object(bucket_name=bucket, key=file)
+    zipped_file = get_s3_client().get_object(Bucket=bucket, Key=file)
+
+    return BytesIO(zipped_file["Body"].read())
+
+
+# number of concurrent list requests used to list a prefix
+S3_LIST_WORKERS = 16
+# number of "/" delimited levels that are discovered to split up a prefix
+S3_LIST_MAX_DEPTH = 4
+
+
+def _list_objects(
+    s3_client: boto3.client,
+    bucket_name: str,
+    file_prefix: str,
+    start_after: Optional[str] = None,
+) -> List[Dict]:
+    """
+    list all non-empty objects under a prefix, in key order
+    """
+    list_args = {"Bucket": bucket_name, "Prefix": file_prefix}
+    if start_after is not None:
+        list_args["StartAfter"] = start_after
+
+    objects = []
+    for page in s3_client.get_paginator("list_objects_v2").paginate(**list_args):
+        objects += [obj for obj in page.get("Contents", []) if obj["Size"] > 0]
+    return objects
+
+
+def _list_sub_prefixes(
+    s3_client: boto3.client,
+    bucket_name: str,
+    file_prefix: str,
+    keep_object: Callable[[Dict], bool],
+    max_list_size: Optional[int] = None,
+) -> Tuple[List[Dict], List[str], Optional[str]]:
+    """
+    list the kept objects directly under a prefix and its "/" delimited
+    sub-prefixes
+
+    :param keep_object: only return objects this is True for
+    :param max_list_size: stop listing once more than this many objects are
+        kept, objects and sub-prefixes are then only complete up to the last
+        kept object
 
-    return BytesIO(zipped_file.get()["Body"].read())
+    :return objects, sub-prefixes and the key of the last kept object if
+        listing stopped early, None otherwise
+    """
+    objects: List[Dict] = []
+    sub_prefixes = []
+    for page in s3_client.get_paginator("list_objects_v2").paginate(
+        Bucket=bucket_name, Prefix=file_prefix, Delimiter="/"
+    ):
+        objects += [obj for obj in page.get("Contents", []) if keep_object(obj)]
+        sub_prefixes += [sub_prefix["Prefix"] for sub_prefix in page.get("CommonPrefixes", [])]
+        if max_list_size is not None and len(objects) > max_list_size and page.get("IsTruncated", False):
+            return objects, sub_prefixes, objects[-1]["Key"]
+    return objects, sub_prefixes, None
+
+
+# pylint: disable=R0912,R0913,R0914,R0917
+# pylint too many branches, arguments and local variables
+def _list_objects_fan_out(
+    s3_client: boto3.client,
+    bucket_name: str,
+    file_prefix: str,
+    max_list_size: Optional[int] = None,
+    in_filter: Optional[str] = None,
+    start_after: Optional[str] = None,
+) -> List[Dict]:
+    """
+    list non-empty objects under a prefix, in key order
+
+    the first page of objects is listed as usual. if the prefix holds more
+    objects, it is split into its "/" delimited sub-prefixes (partitions like
+    year=/month=/day=/ or yyyy/mm/dd/) that are listed concurrently.
+
+    :param max_list_size: stop listing once more than this many objects are
+        found, the first max_list_size + 1 objects in key order are returned
+    :param in_filter: only return objects with this sub-string in their key
+    :param start_after: only return objects with keys that sort after this key
+    """
+    objects: Dict[str, Dict] = {}
+
+    def keep_object(obj: Dict) -> bool:
+        return (
+            obj["Size"] > 0
+            and (in_filter is None or in_filter in obj["Key"])
+            and (start_after is None or obj["Key"] > start_after)
+        )
+
+    def add_objects(new_objects: List[Dict]) -> None:
+        for obj in new_objects:
+            if keep_object(obj):
+                objects[obj["Key"]] = obj
+
+    def list_size_reached() -> bool:
+        return max_list_size is not None and len(objects) > max_list_size
+
+    list_args = {"Bucket": bucket_name, "Prefix": file_prefix}
+    if start_after is not None:
+        list_args["StartAfter"] = start_after
+    first_page = s3_client.list_objects_v2(**list_args)
+    add_objects(first_page.get("Contents", []))
+    if not first_page.get("IsTruncated", False) or list_size_reached():
+        return list(objects.values())
+
+    # sub-prefixes that sort before the last listed key only hold keys that
+    # were already listed
+    last_key = first_page["Contents"][-1]["Key"]
+
+    def is_listed(sub_prefix: str) -> bool:
+        return sub_prefix < last_key and not last_key.startswith(sub_prefix)
+
+    # keys after the last object kept by a discovery that stopped at
+    # max_list_size may be incomplete
+    stop_key: Optional[str] = None
+
+    with ThreadPoolExecutor(max_workers=S3_LIST_WORKERS) as pool:
+        # discover sub-prefixes, a level at a time, until there are enough to
+        # keep all of the workers busy
+        leaves = [file_prefix]
+        for _ in range(S3_LIST_MAX_DEPTH):
+            if len(leaves) >= S3_LIST_WORKERS:
+                break
+            expanded = list(
+                pool.map(
+                    lambda prefix: _list_sub_prefixes(s3_client, bucket_name, prefix, keep_object, max_list_size),
+                    leaves,
+                )
+            )
+            leaves = []
+            for direct_objects, sub_prefixes, last_listed in expanded:
+                add_objects(direct_objects)
+                leaves += [sub_prefix for sub_prefix in sub_prefixes if not is_listed(sub_prefix)]
+                if last_listed is not None and (stop_key is None or last_listed < stop_key):
+                    stop_key = last_listed
+            leaves = [leaf for leaf in leaves if stop_key is None or leaf < stop_key]
+            if len(leaves) == 0:
+                break
+
+        # list the sub-prefixes concurrently and collect their objects in key
+        # order, so listing can stop at max_list_size
+        leaves.sort()
+        running: deque[Tuple[str, Future]] = deque()
+        next_leaf = 0
+        stop_prefix = None
+        while next_leaf < len(leaves) or len(running) > 0:
+            while next_leaf < len(leaves) and len(running) < S3_LIST_WORKERS:
+                leaf = leaves[next_leaf]
+                leaf_start_after = last_key if last_key.startswith(leaf) else None
+                running.append((leaf, pool.submit(_list_objects, s3_client, bucket_name, leaf, leaf_start_after)))
+                next_leaf += 1
+
+            _, future = running.popleft()
+            add_objects(future.result())
+            if list_size_reached():
+                if len(running) > 0:
+                    stop_prefix = running[0][0]
+                elif next_leaf < len(leaves):
+                    stop_prefix = leaves[next_leaf]
+                for _, pending in running:
+                    pending.cancel()
+                break
+
+    # drop objects that sort after sub-prefixes that were never listed
+    listed = [
+        objects[key]
+        for key in sorted(objects)
+        if (stop_prefix is None or key < stop_prefix) and (stop_key is None or key <= stop_key)
+    ]
+    if max_list_size is not None:
+        return listed[: max_list_size + 1]
+    return listed
+
+
+# pylint: enable=R0912,R0913,R0914,R0917
 
 
 def file_list_from_s3(
@@ -276,22 +543,14 @@ def file_list_from_s3(
         process_logger.log_start()
 
         try:
-            s3_client = get_s3_client()
-            paginator = s3_client.get_paginator("list_objects_v2")
-            pages = paginator.paginate(Bucket=bucket_name, Prefix=file_prefix)
-
-            filepaths = []
-            for page in pages:
-                if page["KeyCount"] == 0:
-                    continue
-                for obj in page["Contents"]:
-                    if obj["Size"] == 0:
-                        continue
-                    if in_filter is None or in_filter in obj["Key"]:
-                        filepaths.append(os.path.join("s3://", bucket_name, obj["Key"]))
-
-                if len(filepaths) > max_list_size:
-                    break
+            objects = _list_objects_fan_out(
+                get_s3_client(),
+                bucket_name,
+                file_prefix,
+                max_list_size=max_list_size,
+                in_filter=in_filter,
+            )
+            filepaths = [os.path.join("s3://", bucket_name, obj["Key"]) for obj in objects]
 
             process_logger.add_metadata(list_size=len(filepaths))
             process_logger.log_complete()
@@ -301,12 +560,48 @@ def file_list_from_s3(
             return []
 
 
-def file_list_from_s3_with_details(bucket_name: str, file_prefix: str) -> List[Dict]:
+def file_list_from_s3_strict(bucket_name: str, file_prefix: str) -> List[str]:
+    """
+    Get a list of s3 objects, raising listing errors
+
+    file_list_from_s3 returns an empty list if listing fails, use this where a
+    failed listing must not be taken for missing objects
+
+    :param bucket_name: the name of the bucket to look inside of
+    :param file_prefix: prefix filter for object keys
+
+    :return List[
+        object path as s3://bucket-name/object-key
+    ]
+    """
+    process_logger = ProcessLogger("file_list_from_s3_strict", bucket_name=bucket_name, file_prefix=file_prefix)
+    process_logger.log_start()
+
+    try:
+        objects = _list_objects_fan_out(get_s3_client(), bucket_name, file_prefix)
+    except Exception as exception:
+        process_logger.log_failure(exception)
+        raise exception
+
+    filepaths = [os.path.join("s3://", bucket_name, obj["Key"]) for obj in objects]
+    process_logger.add_metadata(list_size=len(filepaths))
+    process_logger.log_complete()
+    return filepaths
+
+
+def file_list_from_s3_with_details(
+    bucket_name: str,
+    file_prefix: str,
+    max_list_size: Optional[int] = None,
+    start_after: Optional[str] = None,
+) -> List[Dict]:
     """
     Get a list of s3 objects with additional details
 
     :param bucket_name: the name of the bucket to look inside of
     :param file_prefix: prefix filter for object keys
+    :param max_list_size: stop listing once more than this many objects are found
+    :param start_after: only list objects with keys that sort after this key
 
     return_dict = {
         "s3_obj_path": "str: object path as s3://bucket-name/object-key",
@@ -324,24 +619,21 @@ def file_list_from_s3_with_details(bucket_name: str, file_prefix: str) -> List[D
     process_logger.log_start()
 
     try:
-        s3_client = get_s3_client()
-        paginator = s3_client.get_paginator("list_objects_v2")
-        pages = paginator.paginate(Bucket=bucket_name, Prefix=file_prefix)
-
-        filepaths = []
-        for page in pages:
-            if page["KeyCount"] == 0:
-                continue
-            for obj in page["Contents"]:
-                if obj["Size"] == 0:
-                    continue
-                filepaths.append(
-                    {
-                        "s3_obj_path": os.path.join("s3://", bucket_name, obj["Key"]),
-                        "size_bytes": obj["Size"],
-                        "last_modified": obj["LastModified"],
-                    }
-                )
+        objects = _list_objects_fan_out(
+            get_s3_client(),
+            bucket_name,
+            file_prefix,
+            max_list_size=max_list_size,
+            start_after=start_after,
+        )
+        filepaths = [
+            {
+                "s3_obj_path": os.path.join("s3://", bucket_name, obj["Key"]),
+                "size_bytes": obj["Size"],
+                "last_modified": obj["LastModified"],
+            }
+            for obj in objects
+        ]
 
         process_logger.add_metadata(list_size=len(filepaths))
         process_logger.log_complete()
@@ -361,10 +653,10 @@ def file_list_from_s3_date_range(
     """
     Get a list of s3 objects between two dates
 
+    each date is listed concurrently, objects are returned in date order
+
     :param bucket_name: the name of the bucket to look inside of
     :param path_template: prefix template string for object keys - will be populated with dates
-    :param max_list_size: max number of objects to return
-    :param in_filter: arbirtary sub-string filter on the full object path
     :param start_date: date object with day/month/year
     :param end_date: date object with day/month/year
 
@@ -373,16 +665,19 @@ def file_list_from_s3_date_range(
     ]
     """
     paths = build_data_range_paths(path_template, start_date, end_date)
-    full_list = []
-    for search_path in paths:
-        full_list.extend(
-            file_list_from_s3(
-                bucket_name=bucket_name,
-                file_prefix=os.path.join(file_prefix, search_path),
-                suppress_logging_below_level=logging.CRITICAL,
-            )
-        )
-    return full_list
+    s3_client = get_s3_client()
+
+    def list_date(search_path: str) -> List[str]:
+        try:
+            return [
+                os.path.join("s3://", bucket_name, obj["Key"])
+                for obj in _list_objects(s3_client, bucket_name, os.path.join(file_prefix, search_path))
+            ]
+        except Exception:
+            return []
+
+    with ThreadPoolExecutor(max_workers=S3_LIST_WORKERS) as pool:
+        return [filepath for date_list in pool.map(list_date, paths) for filepath in date_list]
 
 
 def get_last_modified_object(bucket_name: str, file_prefix: str, version: Optional[str] = None) -> Optional[Dict]:
@@ -412,72 +707,84 @@ def get_last_modified_object(bucket_name: str, file_prefix: str, version: Option
     return None
 
 
-def _move_s3_object(filename: str, to_bucket: str) -> Optional[str]:
+# maximum number of keys in a DeleteObjects request
+S3_DELETE_BATCH_SIZE = 1000
+# objects that can not be copied in a single CopyObject request are copied
+# with a multipart copy of parts this size
+S3_MULTIPART_COPY_BYTES = 256 * 1024 * 1024
+# upper limit of the backoff between attempts to move objects
+S3_MOVE_MAX_BACKOFF_SECONDS = 15.0
+
+
+def _copy_s3_object(s3_client: boto3.client, filename: str, to_bucket: str) -> Optional[Tuple[str, str]]:
     """
-    Move a single s3 file to the to_bucket bucket. break the incoming s3 path
-    into parts that are used for copying. each process will have it's own
-    boto session and resource available, from the _init_process_session function
-    to avoid multi-processing issues
+    Server side copy of a single s3 file to the to_bucket bucket, retaining
+    the object key. objects are copied with a single CopyObject request, if s3
+    rejects the object as too large it is copied as a multipart copy instead.
 
     :param filename - expected as 's3://my_bucket/the/path/to/the/file.json
     :param to_bucket bucket name
 
-    :return - 'None' if exception occured during move, otherwise 'filename'
+    :return - 'None' if exception occured during copy, otherwise the source
+        bucket and key of the copied object
     """
     try:
-        process_logger = ProcessLogger("move_s3_object", filename=filename)
+        process_logger = ProcessLogger("copy_s3_object", filename=filename)
         process_logger.log_start()
 
-        s3_resource = current_thread().__dict__["boto_s3_resource"]
+        # trim off leading s3:// and split into bucket and object key
+        from_bucket, copy_key = filename.replace("s3://", "").split("/", 1)
+        copy_source = {"Bucket": from_bucket, "Key": copy_key}
 
-        # trim off leading s3://
-        copy_key = filename.replace("s3://", "")
-
-        # string before first delimiter is the bucket name
-        from_bucket = copy_key.split("/")[0]
-
-        # trim off bucket name
-        copy_key = copy_key.replace(f"{from_bucket}/", "")
-
-        # json args for cop
-        destination_bucket = s3_resource.Bucket(to_bucket)
-        destination_object = destination_bucket.Object(copy_key)
-        destination_object.copy(
-            {
-                "Bucket": from_bucket,
-                "Key": copy_key,
-            }
-        )
-
-        # delete the source object
-        source_bucket = s3_resource.Bucket(from_bucket)
-        source_object = source_bucket.Object(copy_key)
-        response = source_object.delete()
-        process_logger.add_metadata(**response)
+        try:
+            s3_client.copy_object(CopySource=copy_source, Bucket=to_bucket, Key=copy_key)
+        except ClientError as error:
+            if error.response.get("Error", {}).get("Code") not in ("InvalidRequest", "EntityTooLarge"):
+                raise error
+            process_logger.add_metadata(multipart=True)
+            s3_client.copy(
+                copy_source,
+                to_bucket,
+                copy_key,
+                Config=TransferConfig(
+                    multipart_threshold=S3_MULTIPART_COPY_BYTES,
+                    multipart_chunksize=S3_MULTIPART_COPY_BYTES,
+                ),
+            )
 
     except Exception as error:
-        _init_process_session()
         process_logger.log_failure(error)
         return None
 
     process_logger.log_complete()
-    return filename
+    return from_bucket, copy_key
 
 
-def _init_process_session() -> None:
+def _delete_s3_objects(s3_client: boto3.client, bucket: str, keys: List[str]) -> List[str]:
     """
-    Initialization function for any process in multi processing pool needing to
-    use a boto session object
-
-    this avoids the expensive operation of creating a new session for every unti of work
-    in the pool
+    Delete objects from a bucket with DeleteObjects requests of up to
+    S3_DELETE_BATCH_SIZE keys
 
-    not totally sure this is the best way to retain the session on process initialization
-    but it seems to work
+    :return - keys that were deleted
     """
-    process_data = current_thread()
-    process_data.__dict__["boto_session"] = boto3.session.Session()
-    process_data.__dict__["boto_s3_resource"] = process_data.__dict__["boto_session"].resource("s3")
+    deleted: List[str] = []
+    for batch_start in range(0, len(keys), S3_DELETE_BATCH_SIZE):
+        batch = keys[batch_start : batch_start + S3_DELETE_BATCH_SIZE]
+        process_logger = ProcessLogger("delete_s3_objects", bucket=bucket, key_count=len(batch))
+        process_logger.log_start()
+        try:
+            response = s3_client.delete_objects(
+                Bucket=bucket,
+                Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True},
+            )
+            # quiet mode only reports the keys that could not be deleted
+            failed = {error["Key"] for error in response.get("Errors", [])}
+            deleted += [key for key in batch if key not in failed]
+            process_logger.add_metadata(failed_count=len(failed))
+            process_logger.log_complete()
+        except Exception as error:
+            process_logger.log_failure(error)
+    return deleted
 
 
 # pylint: disable=R0914
@@ -486,6 +793,9 @@ def move_s3_objects(files: List[str], to_bucket: str) -> List[str]:
     """
     Move list of S3 objects to to_bucket bucket, retaining the object path.
 
+    objects are copied concurrently, then deleted from their source buckets in
+    batches. failed moves are retried with exponential backoff and jitter.
+
     :param files: list of s3 filepath uris
     :param destination: directory or S3 bucket to move to formatted without
         leading 's3://'
@@ -511,29 +821,40 @@ def move_s3_objects(files: List[str], to_bucket: str) -> List[str]:
     )
     process_logger.log_start()
 
+    s3_client = get_s3_client()
     for retry_attempt in range(retry_count):
         max_pool_size = max(1, int(len(files_to_move) / files_per_pool))
         pool_size = min(32, cpu_count + 4, max_pool_size)
         process_logger.add_metadata(pool_size=pool_size)
-        results = []
         try:
-            with ThreadPoolExecutor(max_workers=pool_size, initializer=_init_process_session) as pool:
-                for filename in files_to_move:
-                    results.append(pool.submit(_move_s3_object, filename, to_bucket))
-            for result in results:
-                current_result = result.result()
-                if isinstance(current_result, str):
-                    files_to_move.discard(current_result)
+            # copy all objects, then group the copied objects by source bucket
+            with ThreadPoolExecutor(max_workers=pool_size) as pool:
+                copy_results = list(
+                    pool.map(
+                        lambda filename: (filename, _copy_s3_object(s3_client, filename, to_bucket)), files_to_move
+                    )
+                )
+            copied: Dict[str, Dict[str, str]] = {}
+            for filename, copy_result in copy_results:
+                if copy_result is not None:
+                    from_bucket, copy_key = copy_result
+                    copied.setdefault(from_bucket, {})[copy_key] = filename
+
+            # delete the source objects of all copies
+            for from_bucket, key_files in copied.items():
+                for deleted_key in _delete_s3_objects(s3_client, from_bucket, list(key_files)):
+                    files_to_move.discard(key_files[deleted_key])
 
         except Exception as exception:
             found_exception = exception
 
         # all files moved, exit retry loop
-        if len(files_to_move) == 0:
+        if len(files_to_move) == 0 or retry_attempt == retry_count - 1:
             break
 
-        # wait for gremlins to disappear
-        time.sleep(15)
+        # wait for gremlins to disappear, backing off exponentially with full
+        # jitter so that retries from concurrent converters do not line up
+        time.sleep(random.uniform(0, min(S3_MOVE_MAX_BACKOFF_SECONDS, 2.0 ** (retry_attempt + 1))))
 
     process_logger.add_metadata(failed_count=len(files_to_move), retry_attempts=retry_attempt)
 
@@ -621,7 +942,7 @@ def write_parquet_file(
     process_logger.add_metadata(write_path=write_path)
 
     # write teh parquet file to the partitioned path
-    with pq.ParquetWriter(where=write_path, schema=table.schema, filesystem=fs.S3FileSystem()) as pq_writer:
+    with pq.ParquetWriter(where=write_path, schema=table.schema, filesystem=get_s3_filesystem()) as pq_writer:
         pq_writer.write(table)
 
     # call the visitor function if it exists
@@ -674,7 +995,7 @@ def _get_pyarrow_dataset(
     """
     Internal function to get pyarrow dataset from parquet file(s)
     """
-    active_fs = fs.S3FileSystem()
+    active_fs = get_s3_filesystem()
 
     if isinstance(filename, list):
         to_load = [f.replace("s3://", "") for f in filename]
@@ -745,6 +1066,19 @@ def read_parquet_chunks(
         yield batch.to_pandas()
 
 
+def scan_parquet(
+    filename: Union[str, List[str]],
+    filters: Optional[pd.Expression] = None,
+) -> pl.LazyFrame:
+    """
+    Lazily scan parquet file or files from s3 as a polars LazyFrame
+
+    filters are applied by the pyarrow dataset scanner, column selections and
+    simple polars predicates are also pushed down to the scanner on collect
+    """
+    return pl.scan_pyarrow_dataset(_get_pyarrow_dataset(filename, filters))
+
+
 def replace_remote_parquet(
     file_name: str,
     object_path: str,
@@ -770,7 +1104,7 @@ def replace_remote_parquet(
         if object_exists(object_path):
             if not object_path.endswith(".parquet"):
                 raise LampInvalidReplacementError(f"Existing object {object_path} is not a parquet file")
-            existing_row_count = pq.read_metadata(object_path, filesystem=fs.S3FileSystem()).num_rows
+            existing_row_count = pq.read_metadata(object_path, filesystem=get_s3_filesystem()).num_rows
             new_row_count = pq.read_metadata(file_name).num_rows
             if new_row_count < existing_row_count:
                 raise LampInvalidReplacementError(f"{new_row_count} < {existing_row_count}: cancelling upload")
@@ -1,16 +1,39 @@
+import os
 import re
+import time
+from pathlib import Path
 from typing import Optional, Dict, List
-from datetime import timedelta, date
+from datetime import datetime, timedelta, timezone, date
 
 import polars as pl
 
-from lamp_py.aws.s3 import file_list_from_s3_with_details, dt_from_obj_path, get_last_modified_object
+from lamp_py.aws.s3 import file_list_from_s3_with_details, get_last_modified_object
+from lamp_py.runtime_utils.process_logger import ProcessLogger
 from lamp_py.runtime_utils.remote_files import (
+    S3Location,
     springboard_rt_vehicle_positions,
     tm_stop_crossing,
     tm_daily_work_piece,
     bus_events,
 )
+from lamp_py.utils.date_range_builder import build_data_range_paths
+
+# local manifests of input files, so each run only lists recent files from s3
+MANIFEST_DIR = Path(os.getenv("TEMP_DIR", default="/tmp")).joinpath("bus_event_file_manifest")
+
+# files are still being written or compacted for the latest file date and the
+# date before it, these dates are re-listed on every refresh
+MANIFEST_LOOKBACK_DAYS = 1
+
+# all files are re-listed once a day, to drop any objects removed from s3
+MANIFEST_MAX_AGE = timedelta(days=1)
+
+MANIFEST_SCHEMA = {
+    "s3_obj_path": pl.String(),
+    "size_bytes": pl.Int64(),
+    "last_modified": pl.Datetime(time_unit="us", time_zone="UTC"),
+    "file_date": pl.Date(),
+}
 
 
 def service_date_from_filename(tm_filename: str) -> Optional[date]:
@@ -31,6 +54,118 @@ def service_date_from_filename(tm_filename: str) -> Optional[date]:
         return None
 
 
+def partition_date_expr() -> pl.Expr:
+    """date of s3_obj_path partitioned as 'year=YYYY/month=MM/day=DD', vectorized dt_from_obj_path"""
+    s3_obj_path = pl.col("s3_obj_path")
+    return pl.date(
+        s3_obj_path.str.extract(r"year=(\d{4})").cast(pl.Int32),
+        s3_obj_path.str.extract(r"month=(\d{1,2})").cast(pl.Int8),
+        s3_obj_path.str.extract(r"day=(\d{1,2})").cast(pl.Int8),
+    )
+
+
+def filename_date_expr() -> pl.Expr:
+    """date of s3_obj_path named '...YYYYMMDD.parquet', vectorized service_date_from_filename"""
+    return pl.col("s3_obj_path").str.extract(r"(\d{8}).parquet").str.to_date("%Y%m%d", strict=False)
+
+
+# pylint: disable=R0914
+def refresh_file_manifest(
+    source: str,
+    location: S3Location,
+    file_date: pl.Expr,
+    day_prefix: Optional[str] = None,
+) -> pl.DataFrame:
+    """
+    Get all files for a source from its local manifest, after listing files
+    that may have changed since the last refresh from s3
+
+    Files dated MANIFEST_LOOKBACK_DAYS before the latest file date in the
+    manifest, or later, are re-listed. If day_prefix is set, these are listed
+    per day, otherwise files are listed after the last object key dated
+    before the lookback, as keys sort by date. All files are listed if the
+    manifest is missing or older than MANIFEST_MAX_AGE.
+
+    :param source: name of the manifest
+    :param location: s3 location of the source files
+    :param file_date: expression for the date of a file from s3_obj_path
+    :param day_prefix: prefix template of files for a day, filled in with
+        build_data_range_paths
+
+    :return dataframe:
+        s3_obj_path -> String
+        size_bytes -> Int64
+        last_modified -> Datetime
+        file_date -> Date
+    """
+    manifest_path = MANIFEST_DIR.joinpath(f"{source}.parquet")
+    full_listing_marker = MANIFEST_DIR.joinpath(f"{source}.full_listing")
+
+    logger = ProcessLogger("refresh_file_manifest", source=source)
+    logger.log_start()
+
+    manifest = pl.DataFrame(schema=MANIFEST_SCHEMA)
+    if (
+        full_listing_marker.exists()
+        and time.time() - full_listing_marker.stat().st_mtime < MANIFEST_MAX_AGE.total_seconds()
+    ):
+        try:
+            manifest = pl.read_parquet(manifest_path)
+        except Exception as exception:
+            logger.log_warning(exception)
+
+    since: Optional[date] = None
+    if manifest.shape[0] > 0:
+        latest_file_date = manifest.get_column("file_date").max()
+        assert isinstance(latest_file_date, date)
+        since = latest_file_date - timedelta(days=MANIFEST_LOOKBACK_DAYS)
+        manifest = manifest.filter(pl.col("file_date") < since)
+
+    if since is None:
+        objects = file_list_from_s3_with_details(bucket_name=location.bucket, file_prefix=location.prefix)
+    elif day_prefix is not None:
+        objects = []
+        for prefix in build_data_range_paths(
+            os.path.join(location.prefix, day_prefix),
+            start_date=since,
+            end_date=max(since, datetime.now(tz=timezone.utc).date()),
+        ):
+            objects += file_list_from_s3_with_details(bucket_name=location.bucket, file_prefix=prefix)
+    else:
+        last_path = manifest.get_column("s3_obj_path").max()
+        objects = file_list_from_s3_with_details(
+            bucket_name=location.bucket,
+            file_prefix=location.prefix,
+            start_after=None if last_path is None else str(last_path).replace(f"s3://{location.bucket}/", "", 1),
+        )
+
+    listed = (
+        pl.DataFrame(objects, schema=MANIFEST_SCHEMA)
+        .with_columns(file_date.alias("file_date"))
+        .filter(pl.col("file_date").is_not_null())
+    )
+    if since is not None:
+        listed = listed.filter(pl.col("file_date") >= since)
+    manifest = pl.concat([manifest, listed]).unique(subset="s3_obj_path", keep="last").sort("s3_obj_path")
+
+    MANIFEST_DIR.mkdir(parents=True, exist_ok=True)
+    manifest.write_parquet(f"{manifest_path}.{os.getpid()}")
+    os.replace(f"{manifest_path}.{os.getpid()}", manifest_path)
+    if since is None:
+        full_listing_marker.touch()
+
+    logger.add_metadata(
+        full_listing=since is None,
+        listed_count=listed.shape[0],
+        manifest_count=manifest.shape[0],
+    )
+    logger.log_complete()
+    return manifest
+
+
+# pylint: enable=R0914
+
+
 def vehicle_position_files_as_frame() -> pl.DataFrame:
     """
     :return dataframe:
@@ -40,17 +175,19 @@ def vehicle_position_files_as_frame() -> pl.DataFrame:
         service_date -> Date
         source -> String
     """
-    # pull all of the vehicle position files from s3 along with their last
-    # modified datetime. convert to a dataframe and generate a service date
-    # from the partition paths. add a source column for later merging.
-    vp_objects = file_list_from_s3_with_details(
-        bucket_name=springboard_rt_vehicle_positions.bucket,
-        file_prefix=springboard_rt_vehicle_positions.prefix,
-    )
-    vp_df = pl.DataFrame(vp_objects).with_columns(
-        (pl.col("s3_obj_path").map_elements(lambda x: dt_from_obj_path(x).date(), return_dtype=pl.Date)).alias(
-            "service_date"
-        ),
+    # pull all of the vehicle position files along with their last modified
+    # datetime and the date of their partition path, as a service date. add a
+    # source column for later merging.
+    vp_df = refresh_file_manifest(
+        source="gtfs_rt",
+        location=springboard_rt_vehicle_positions,
+        file_date=partition_date_expr(),
+        day_prefix="year={yy}/month={mm}/day={dd}/",
+    ).select(
+        "s3_obj_path",
+        "size_bytes",
+        "last_modified",
+        pl.col("file_date").alias("service_date"),
         pl.lit("gtfs_rt").alias("source"),
     )
 
@@ -105,22 +242,19 @@ def transit_master_stop_crossing_events_files_as_frame() -> pl.DataFrame:
         service_date -> Date
         source -> String
     """
-    # pull all of the transit master files from s3 along with their last
-    # modified datetime. convert to a dataframe and generate a service date
-    # from the filename. add a source column for later merging.
-    tm_objects = file_list_from_s3_with_details(
-        bucket_name=tm_stop_crossing.bucket,
-        file_prefix=tm_stop_crossing.prefix,
-    )
-    return (
-        pl.DataFrame(tm_objects)
-        .with_columns(
-            (pl.col("s3_obj_path").map_elements(service_date_from_filename, return_dtype=pl.Date)).alias(
-                "service_date"
-            ),
-            pl.lit("transit_master_stop_crossing").alias("source"),
-        )
-        .filter(pl.col("service_date").is_not_null())
+    # pull all of the transit master files along with their last modified
+    # datetime and the date in their filename, as a service date. add a source
+    # column for later merging.
+    return refresh_file_manifest(
+        source="transit_master_stop_crossing",
+        location=tm_stop_crossing,
+        file_date=filename_date_expr(),
+    ).select(
+        "s3_obj_path",
+        "size_bytes",
+        "last_modified",
+        pl.col("file_date").alias("service_date"),
+        pl.lit("transit_master_stop_crossing").alias("source"),
     )
 
 
@@ -133,22 +267,19 @@ def daily_work_piece_files_as_frame() -> pl.DataFrame:
         service_date -> Date
         source -> String
     """
-    # pull all of the transit master files from s3 along with their last
-    # modified datetime. convert to a dataframe and generate a service date
-    # from the filename. add a source column for later merging.
-    work_piece_objects = file_list_from_s3_with_details(
-        bucket_name=tm_daily_work_piece.bucket,
-        file_prefix=tm_daily_work_piece.prefix,
-    )
-    return (
-        pl.DataFrame(work_piece_objects)
-        .with_columns(
-            (pl.col("s3_obj_path").map_elements(service_date_from_filename, return_dtype=pl.Date)).alias(
-                "service_date"
-            ),
-            pl.lit("transit_master_daily_work_piece").alias("source"),
-        )
-        .filter(pl.col("service_date").is_not_null())
+    # pull all of the transit master files along with their last modified
+    # datetime and the date in their filename, as a service date. add a source
+    # column for later merging.
+    return refresh_file_manifest(
+        source="transit_master_daily_work_piece",
+        location=tm_daily_work_piece,
+        file_date=filename_date_expr(),
+    ).select(
+        "s3_obj_path",
+        "size_bytes",
+        "last_modified",
+        pl.col("file_date").alias("service_date"),
+        pl.lit("transit_master_daily_work_piece").alias("source"),
     )
 
 
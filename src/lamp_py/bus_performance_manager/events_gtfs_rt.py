@@ -1,10 +1,8 @@
 from datetime import date
-from typing import List
+from typing import List, Optional, cast
 
 import dataframely as dy
 import polars as pl
-from pyarrow.fs import S3FileSystem
-import pyarrow.compute as pc
 
 from lamp_py.bus_performance_manager.events_gtfs_schedule import BusBaseSchema
 from lamp_py.utils.gtfs_utils import bus_route_ids_for_service_date
@@ -35,126 +33,83 @@ class GTFSEvents(BusBaseSchema):
         return pl.when(pl.col("gtfs_stop_sequence").eq(pl.lit(1))).then(pl.col("gtfs_departure_dt").is_not_null())
 
 
-def _read_with_polars(service_date: date, gtfs_rt_files: List[str], bus_routes: List[str]) -> pl.DataFrame:
+# vehicle position columns read for bus events, with the type they are cast
+# to in every file
+VEHICLE_POSITION_COLUMNS = {
+    "vehicle.trip.route_id": pl.String(),
+    "vehicle.trip.trip_id": pl.String(),
+    "vehicle.stop_id": pl.String(),
+    "vehicle.current_stop_sequence": pl.Int64(),
+    "vehicle.trip.direction_id": pl.Int8(),
+    "vehicle.trip.start_time": pl.String(),
+    "vehicle.trip.start_date": pl.String(),
+    "vehicle.vehicle.id": pl.String(),
+    "vehicle.vehicle.label": pl.String(),
+    "vehicle.current_status": pl.String(),
+    "vehicle.position.latitude": pl.Float64(),
+    "vehicle.position.longitude": pl.Float64(),
+    "vehicle.timestamp": pl.Int64(),
+}
+
+# vehicle positions without these columns are dropped, files without any of
+# them have no bus vehicle positions
+REQUIRED_COLUMNS = [
+    "vehicle.trip.route_id",
+    "vehicle.trip.start_date",
+    "vehicle.current_status",
+    "vehicle.stop_id",
+    "vehicle.trip.trip_id",
+    "vehicle.vehicle.id",
+    "vehicle.timestamp",
+    "vehicle.trip.start_time",
+]
+
+
+def _bus_vehicle_positions(
+    vehicle_positions: pl.LazyFrame, service_date: date, bus_routes: List[str]
+) -> Optional[pl.LazyFrame]:
     """
-    Read RT_VEHICLE_POSITIONS parquet files with polars engine
-
-    Polars engine appears to be faster and use less memory than pyarrow enginer, but is not as
-    compatible with all parquet file formats as pyarrow engine
-    """
-    vehicle_positions = (
-        pl.scan_parquet(gtfs_rt_files)
-        .filter(
-            (pl.col("vehicle.trip.route_id").is_in(bus_routes))
-            & (pl.col("vehicle.trip.start_date") == service_date.strftime("%Y%m%d"))
-            & pl.col("vehicle.current_status").is_not_null()
-            & pl.col("vehicle.stop_id").is_not_null()
-            & pl.col("vehicle.trip.trip_id").is_not_null()
-            & pl.col("vehicle.vehicle.id").is_not_null()
-            & pl.col("vehicle.timestamp").is_not_null()
-            & pl.col("vehicle.trip.start_time").is_not_null()
-        )
-        .select(
-            pl.col("vehicle.trip.route_id").cast(pl.String).alias("route_id"),
-            pl.col("vehicle.trip.trip_id").cast(pl.String).alias("trip_id"),
-            pl.col("vehicle.stop_id").cast(pl.String).alias("stop_id"),
-            pl.col("vehicle.current_stop_sequence").cast(pl.Int64).alias("stop_sequence"),
-            pl.col("vehicle.trip.direction_id").cast(pl.Int8).alias("direction_id"),
-            pl.col("vehicle.trip.start_time").cast(pl.String).alias("start_time"),
-            pl.col("vehicle.trip.start_date").cast(pl.String).alias("service_date"),
-            pl.col("vehicle.vehicle.id").cast(pl.String).alias("vehicle_id"),
-            pl.col("vehicle.vehicle.label").cast(pl.String).alias("vehicle_label"),
-            pl.col("vehicle.current_status").cast(pl.String).alias("current_status"),
-            pl.col("vehicle.position.latitude").cast(pl.Float64).alias("latitude"),
-            pl.col("vehicle.position.longitude").cast(pl.Float64).alias("longitude"),
-            pl.from_epoch("vehicle.timestamp").alias("vehicle_timestamp"),
-        )
-        # We only care if the bus is IN_TRANSIT_TO or STOPPED_AT, wso we're replacing the INCOMING_TO enum from this column
-        # https://github.com/google/transit/blob/master/gtfs-realtime/spec/en/reference.md?plain=1#L270
-        .with_columns(
-            pl.when(pl.col("current_status") == "INCOMING_AT")
-            .then(pl.lit("IN_TRANSIT_TO"))
-            .otherwise(pl.col("current_status"))
-            .cast(pl.String)
-            .alias("current_status"),
-        )
-        .collect()
-    )
-
-    return vehicle_positions
+    Filter and select bus vehicle positions from a RT_VEHICLE_POSITIONS scan
 
+    Daily files do not always have the same schema, columns can be missing,
+    all null or have different types. Each file is scanned on its own, with
+    VEHICLE_POSITION_COLUMNS cast to a common type and missing columns
+    inserted as nulls, so the scans can be concatenated. Filters are on the
+    file columns so that they, and the column selection, are pushed down to
+    the parquet scan.
 
-def _read_with_pyarrow(service_date: date, gtfs_rt_files: List[str], bus_routes: List[str]) -> pl.DataFrame:
+    :return lazy frame of bus vehicle positions, None if scan has none
     """
-    Read RT_VEHICLE_POSITIONS parquet files with pyarrow engine, instead of polars engine
-
-    the polars implmentation of parquet reader sometimes has issues with files in staging bucket
-    pyarrow engine is more forgiving in reading some parquet file formats at the cost of read speed
-    and memory usage, compared to polars native parquet reader/scanner
-    """
-    gtfs_rt_files = [uri.replace("s3://", "") for uri in gtfs_rt_files]
-    columns = [
-        "vehicle.trip.route_id",
-        "vehicle.trip.trip_id",
-        "vehicle.trip.direction_id",
-        "vehicle.trip.start_time",
-        "vehicle.trip.start_date",
-        "vehicle.vehicle.id",
-        "vehicle.vehicle.label",
-        "vehicle.stop_id",
-        "vehicle.current_stop_sequence",
-        "vehicle.current_status",
-        "vehicle.timestamp",
-        "vehicle.position.latitude",
-        "vehicle.position.longitude",
-    ]
-    # pyarrow_exp filter expression is used to limit memory usage during read operation
-    pyarrow_exp = pc.field("vehicle.trip.route_id").isin(bus_routes)
-    vehicle_positions = (
-        pl.read_parquet(
-            gtfs_rt_files,
-            columns=columns,
-            use_pyarrow=True,
-            pyarrow_options={"filesystem": S3FileSystem(), "filters": pyarrow_exp},
-        )
-        .filter(
-            (pl.col("vehicle.trip.route_id").is_in(bus_routes))
-            & (pl.col("vehicle.trip.start_date") == service_date.strftime("%Y%m%d"))
-            & pl.col("vehicle.current_status").is_not_null()
-            & pl.col("vehicle.stop_id").is_not_null()
-            & pl.col("vehicle.trip.trip_id").is_not_null()
-            & pl.col("vehicle.vehicle.id").is_not_null()
-            & pl.col("vehicle.timestamp").is_not_null()
-            & pl.col("vehicle.trip.start_time").is_not_null()
-        )
-        .select(
-            pl.col("vehicle.trip.route_id").cast(pl.String).alias("route_id"),
-            pl.col("vehicle.trip.trip_id").cast(pl.String).alias("trip_id"),
-            pl.col("vehicle.stop_id").cast(pl.String).alias("stop_id"),
-            pl.col("vehicle.current_stop_sequence").cast(pl.Int64).alias("stop_sequence"),
-            pl.col("vehicle.trip.direction_id").cast(pl.Int8).alias("direction_id"),
-            pl.col("vehicle.trip.start_time").cast(pl.String).alias("start_time"),
-            pl.col("vehicle.trip.start_date").cast(pl.String).alias("service_date"),
-            pl.col("vehicle.vehicle.id").cast(pl.String).alias("vehicle_id"),
-            pl.col("vehicle.vehicle.label").cast(pl.String).alias("vehicle_label"),
-            pl.col("vehicle.current_status").cast(pl.String).alias("current_status"),
-            pl.col("vehicle.position.latitude").cast(pl.Float64).alias("latitude"),
-            pl.col("vehicle.position.longitude").cast(pl.Float64).alias("longitude"),
-            pl.from_epoch("vehicle.timestamp").alias("vehicle_timestamp"),
-        )
-        # We only care if the bus is IN_TRANSIT_TO or STOPPED_AT, wso we're replacing the INCOMING_TO enum from this column
-        # https://github.com/google/transit/blob/master/gtfs-realtime/spec/en/reference.md?plain=1#L270
-        .with_columns(
-            pl.when(pl.col("current_status") == "INCOMING_AT")
-            .then(pl.lit("IN_TRANSIT_TO"))
-            .otherwise(pl.col("current_status"))
-            .cast(pl.String)
-            .alias("current_status"),
-        )
+    file_schema = vehicle_positions.collect_schema()
+
+    if any(file_schema.get(column, pl.Null()) == pl.Null() for column in REQUIRED_COLUMNS):
+        return None
+
+    def file_column(column: str) -> pl.Expr:
+        if column in file_schema:
+            return pl.col(column).cast(VEHICLE_POSITION_COLUMNS[column])
+        return pl.lit(None, dtype=VEHICLE_POSITION_COLUMNS[column])
+
+    return vehicle_positions.filter(
+        file_column("vehicle.trip.route_id").is_in(bus_routes)
+        & (file_column("vehicle.trip.start_date") == service_date.strftime("%Y%m%d"))
+        & pl.all_horizontal(pl.col(column).is_not_null() for column in REQUIRED_COLUMNS)
+    ).select(
+        file_column("vehicle.trip.route_id").alias("route_id"),
+        file_column("vehicle.trip.trip_id").alias("trip_id"),
+        file_column("vehicle.stop_id").alias("stop_id"),
+        file_column("vehicle.current_stop_sequence").alias("stop_sequence"),
+        file_column("vehicle.trip.direction_id").alias("direction_id"),
+        file_column("vehicle.trip.start_time").alias("start_time"),
+        file_column("vehicle.trip.start_date").alias("service_date"),
+        file_column("vehicle.vehicle.id").alias("vehicle_id"),
+        file_column("vehicle.vehicle.label").alias("vehicle_label"),
+        file_column("vehicle.current_status").alias("current_status"),
+        file_column("vehicle.position.latitude").alias("latitude"),
+        file_column("vehicle.position.longitude").alias("longitude"),
+        pl.from_epoch(file_column("vehicle.timestamp")).alias("vehicle_timestamp"),
     )
 
-    return vehicle_positions
-
 
 def read_vehicle_positions(service_date: date, gtfs_rt_files: List[str]) -> pl.DataFrame:
     """
@@ -182,18 +137,36 @@ def read_vehicle_positions(service_date: date, gtfs_rt_files: List[str]) -> pl.D
         "read_vehicle_positions",
         service_date=service_date,
         file_count=len(gtfs_rt_files),
-        reader_engine="polars",
     )
     logger.log_start()
     bus_routes = bus_route_ids_for_service_date(service_date)
 
-    # need to investigate which is actually faster/works.
-    # as of 7/15/25, the pyarrow reader was faster on my local machine
-    try:
-        vehicle_positions = _read_with_polars(service_date, gtfs_rt_files, bus_routes)
-    except Exception as _:
-        logger.add_metadata(reader_engine="pyarrow")
-        vehicle_positions = _read_with_pyarrow(service_date, gtfs_rt_files, bus_routes)
+    file_scans = [
+        _bus_vehicle_positions(pl.scan_parquet(gtfs_rt_file), service_date, bus_routes)
+        for gtfs_rt_file in gtfs_rt_files
+    ]
+    vehicle_position_scans = [file_scan for file_scan in file_scans if file_scan is not None]
+    logger.add_metadata(skipped_file_count=len(file_scans) - len(vehicle_position_scans))
+
+    if len(vehicle_position_scans) == 0:
+        vehicle_position_scans = [
+            cast(
+                pl.LazyFrame,
+                _bus_vehicle_positions(pl.LazyFrame(schema=VEHICLE_POSITION_COLUMNS), service_date, bus_routes),
+            )
+        ]
+    vehicle_positions = (
+        pl.concat(vehicle_position_scans, how="vertical")
+        # We only care if the bus is IN_TRANSIT_TO or STOPPED_AT, wso we're replacing the INCOMING_TO enum from this column
+        # https://github.com/google/transit/blob/master/gtfs-realtime/spec/en/reference.md?plain=1#L270
+        .with_columns(
+            pl.when(pl.col("current_status") == "INCOMING_AT")
+            .then(pl.lit("IN_TRANSIT_TO"))
+            .otherwise(pl.col("current_status"))
+            .cast(pl.String)
+            .alias("current_status"),
+        ).collect()
+    )
 
     logger.log_complete()
     return vehicle_positions
@@ -7,6 +7,7 @@ import polars as pl
 
 from lamp_py.bus_performance_manager.events_gtfs_schedule import BusBaseSchema
 from lamp_py.bus_performance_manager.events_tm_schedule import TransitMasterSchedule
+from lamp_py.bus_performance_manager.tm_tables import scan_tm_table
 from lamp_py.runtime_utils.remote_files import (
     tm_trip_file,
     tm_vehicle_file,
@@ -172,7 +173,7 @@ def get_daily_work_pieces(daily_work_piece_files: List[str]) -> dy.DataFrame[TMD
     # be scheduled for a single day of the week but we reuse Runs and Blocks
     # across different scheduled days.
     tm_work_pieces = (
-        pl.scan_parquet(tm_work_piece_file.s3_uri)
+        scan_tm_table(tm_work_piece_file)
         .select(
             "WORK_PIECE_ID",
             "BLOCK_ID",
@@ -189,7 +190,7 @@ def get_daily_work_pieces(daily_work_piece_files: List[str]) -> dy.DataFrame[TMD
     # Time Table Version Id is similar to our Static Schedule Version keys in
     #   the Rail Performance Manager DB
     tm_blocks = (
-        pl.scan_parquet(tm_block_file.s3_uri)
+        scan_tm_table(tm_block_file)
         .select(
             "BLOCK_ID",
             "BLOCK_ABBR",
@@ -203,7 +204,7 @@ def get_daily_work_pieces(daily_work_piece_files: List[str]) -> dy.DataFrame[TMD
     # Time Table Version Id is similar to our Static Schedule Version keys in
     #   the Rail Performance Manager DB
     tm_runs = (
-        pl.scan_parquet(tm_run_file.s3_uri)
+        scan_tm_table(tm_run_file)
         .select(
             "RUN_ID",
             "RUN_DESIGNATOR",
@@ -220,7 +221,7 @@ def get_daily_work_pieces(daily_work_piece_files: List[str]) -> dy.DataFrame[TMD
     # Time Table Version Id is similar to our Static Schedule Version keys in
     #   the Rail Performance Manager DB
     tm_trips = (
-        pl.scan_parquet(tm_trip_file.s3_uri)
+        scan_tm_table(tm_trip_file)
         .select(
             "TRIP_ID",
             "BLOCK_ID",
@@ -290,7 +291,7 @@ def get_daily_work_pieces(daily_work_piece_files: List[str]) -> dy.DataFrame[TMD
     # Operator Id is the TM Operator Table Key
     # Operator Logon Id is the Badge Number
     tm_operators = (
-        pl.scan_parquet(tm_operator_file.s3_uri)
+        scan_tm_table(tm_operator_file)
         .select(
             "OPERATOR_ID",
             "ONBOARD_LOGON_ID",
@@ -301,7 +302,7 @@ def get_daily_work_pieces(daily_work_piece_files: List[str]) -> dy.DataFrame[TMD
     # Vehicle Id is the TM Vehicle Table Key
     # Property Tag is Vehicle Label used by the MBTA
     tm_vehicles = (
-        pl.scan_parquet(tm_vehicle_file.s3_uri)
+        scan_tm_table(tm_vehicle_file)
         .select(
             "VEHICLE_ID",
             "PROPERTY_TAG",
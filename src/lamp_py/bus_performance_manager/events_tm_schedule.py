@@ -5,6 +5,7 @@ import dataframely as dy
 import polars as pl
 
 from lamp_py.bus_performance_manager.events_gtfs_schedule import BusBaseSchema
+from lamp_py.bus_performance_manager.tm_tables import scan_tm_table
 from lamp_py.runtime_utils.process_logger import ProcessLogger
 from lamp_py.runtime_utils.remote_files import (
     tm_daily_sched_adherence_waiver_file,
@@ -55,7 +56,7 @@ def generate_tm_schedule(service_date: date) -> dy.DataFrame[TransitMasterSchedu
     logger = ProcessLogger("generate_tm_schedule")
     logger.log_start()
     tm_geo_nodes = (
-        pl.scan_parquet(tm_geo_node_file.s3_uri)
+        scan_tm_table(tm_geo_node_file)
         .select(
             "GEO_NODE_ID",
             "GEO_NODE_ABBR",
@@ -68,7 +69,7 @@ def generate_tm_schedule(service_date: date) -> dy.DataFrame[TransitMasterSchedu
     # route id.
     # NOTE: some of these route ids have leading zeros
     tm_routes = (
-        pl.scan_parquet(tm_route_file.s3_uri)
+        scan_tm_table(tm_route_file)
         .select(
             "ROUTE_ID",
             "ROUTE_ABBR",
@@ -80,7 +81,7 @@ def generate_tm_schedule(service_date: date) -> dy.DataFrame[TransitMasterSchedu
     # the trip id is the transit master key and the trip serial number is the
     # gtfs trip id.
     tm_trips = (
-        pl.scan_parquet(tm_trip_file.s3_uri)
+        scan_tm_table(tm_trip_file)
         .select(
             "TRIP_ID",
             "TRIP_SERIAL_NUMBER",
@@ -94,7 +95,7 @@ def generate_tm_schedule(service_date: date) -> dy.DataFrame[TransitMasterSchedu
     # the vehicle id is the transit master key and the property tag is the
     # vehicle label
     tm_vehicles = (
-        pl.scan_parquet(tm_vehicle_file.s3_uri)
+        scan_tm_table(tm_vehicle_file)
         .select(
             "VEHICLE_ID",
             "PROPERTY_TAG",
@@ -103,14 +104,14 @@ def generate_tm_schedule(service_date: date) -> dy.DataFrame[TransitMasterSchedu
         .unique()
     )
 
-    tm_time_points = pl.scan_parquet(tm_time_point_file.s3_uri).select(
+    tm_time_points = scan_tm_table(tm_time_point_file).select(
         "TIME_POINT_ID",
         "TIME_POINT_ABBR",
         "TIME_PT_NAME",
     )
 
     waivers = (
-        pl.scan_parquet(tm_daily_sched_adherence_waiver_file.s3_uri)
+        scan_tm_table(tm_daily_sched_adherence_waiver_file)
         .filter(pl.col("MISSED_ALLOWED_FLAG").eq(pl.lit(1)))
         .select(
             "WAIVER_ID",
@@ -0,0 +1,28 @@
+import os
+
+import polars as pl
+
+from lamp_py.aws.s3 import cached_download
+from lamp_py.runtime_utils.remote_files import S3Location
+
+# local copies of whole table TransitMaster exports, shared by every service
+# date processed in a run, see cached_download
+TM_TABLE_CACHE_DIR = os.path.join(os.getenv("TEMP_DIR", default="/tmp"), "tm_table_cache")
+
+
+def scan_tm_table(tm_table: S3Location) -> pl.LazyFrame:
+    """
+    Get a lazy frame of a whole table TransitMaster export (i.e. TMMAIN_TRIP)
+
+    s3 exports are read from a local copy, that is only downloaded again when
+    the export is replaced, instead of from s3 for every service date.
+
+    :param tm_table: location of TransitMaster export parquet file
+    """
+    tm_table_file = tm_table.s3_uri
+    if tm_table_file.startswith("s3://"):
+        cached_file = cached_download(tm_table_file, TM_TABLE_CACHE_DIR)
+        if cached_file is not None:
+            tm_table_file = cached_file
+
+    return pl.scan_parquet(tm_table_file)
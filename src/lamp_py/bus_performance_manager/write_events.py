@@ -1,7 +1,8 @@
 from datetime import date, timedelta
 import os
 import tempfile
-from typing import Optional
+from multiprocessing import get_context
+from typing import Dict, List, Optional
 from polars.exceptions import ComputeError
 
 import pyarrow.parquet as pq
@@ -11,13 +12,163 @@ from lamp_py.bus_performance_manager.events_metrics import run_bus_performance_p
 from lamp_py.runtime_utils.lamp_exception import LampExpectedNotFoundError, LampInvalidProcessingError
 from lamp_py.runtime_utils.remote_files import bus_events, bus_operator_mapping
 from lamp_py.runtime_utils.remote_files import VERSION_KEY
+from lamp_py.runtime_utils.memory_budget import memory_budget
 from lamp_py.runtime_utils.process_logger import ProcessLogger
-from lamp_py.aws.s3 import get_last_modified_object, object_exists, upload_file
+from lamp_py.aws.s3 import file_list_from_s3_strict, get_last_modified_object, upload_file
 from lamp_py.tableau.jobs.bus_performance import BUS_RECENT_NDAYS
-from lamp_py.utils.date_range_builder import build_data_range_paths
+
+# approximate peak memory of processing a single service date
+SERVICE_DATE_MEMORY_BYTES = 4 * 1024 * 1024 * 1024
+
+
+def bus_metrics_filename(service_date: date) -> str:
+    """filename of bus events for a service date"""
+    return f"{service_date.strftime('%Y%m%d')}.parquet"
+
+
+def operator_mapping_filename(service_date: date) -> str:
+    """filename of operator id mapping for a service date"""
+    return f"operator_map_pii_{service_date.strftime('%Y%m%d')}.parquet"
+
+
+def service_date_workers(service_date_count: int) -> int:
+    """
+    number of service dates to process at once, limited by cpu count and by
+    memory, BUS_METRICS_MEMORY_BUDGET_MB or 80% of system memory
+    """
+    budget_bytes = memory_budget("BUS_METRICS_MEMORY_BUDGET_MB")
+
+    process_count = os.cpu_count()
+    if process_count is None:
+        process_count = 4
+
+    return max(1, min(service_date_count, process_count, budget_bytes // SERVICE_DATE_MEMORY_BYTES))
+
+
+def write_bus_metrics_day(
+    service_date: date,
+    service_date_files: Dict[str, List[str]],
+    debug_flags: Dict[str, dict[str, bool]],
+) -> None:
+    """
+    Write bus-performance parquet files to S3 for a single service date
+
+    run in its own process when multiple service dates are written at once
+
+    Inputs:
+        service_date: service date of bus metrics to process
+        service_date_files: input files for service date, from event_files_to_load
+        debug_flags: debug flags of write_bus_metrics
+    """
+    gtfs_files = service_date_files["gtfs_rt"]
+    tm_files = service_date_files["transit_master_stop_crossing"]
+    tm_files_work_pieces = service_date_files["transit_master_daily_work_piece"]
+
+    day_logger = ProcessLogger(
+        "write_bus_metrics_day",
+        service_date=service_date,
+        gtfs_file_count=len(gtfs_files),
+        tm_file_count=len(tm_files),
+        tm_work_piece=len(tm_files_work_pieces),
+    )
+    day_logger.log_start()
+
+    # need gtfs_rt and tm files to run process
+    if len(gtfs_files) == 0:
+        day_logger.log_failure(FileNotFoundError(f"No RT_VEHICLE_POSITION files found for {service_date}"))
+        return
+
+    if len(tm_files) == 0:
+        day_logger.log_warning(FileNotFoundError(f"No TransitMaster files found for {service_date}"))
+        return
+
+    if len(tm_files_work_pieces) == 0:
+        day_logger.log_warning(FileNotFoundError(f"No Daily Work Piece files found for {service_date}"))
+        return
+
+    # do bus events
+    try:
+        events_df, operator_id_mapping = run_bus_performance_pipeline(
+            service_date, gtfs_files, tm_files, tm_files_work_pieces, **debug_flags
+        )
+
+        day_logger.add_metadata(bus_performance_rows=events_df.shape[0])
+
+        output_filepath_bus_metrics = bus_metrics_filename(service_date)
+        output_filepath_operator_mapping = operator_mapping_filename(service_date)
+
+        if debug_flags.get("write_local_only"):
+            events_df.write_parquet(os.path.join("/tmp/", output_filepath_bus_metrics), use_pyarrow=True)
+            operator_id_mapping.write_parquet(os.path.join("/tmp/", output_filepath_operator_mapping), use_pyarrow=True)
+        else:
+            with tempfile.TemporaryDirectory() as tempdir:
+                events_df.write_parquet(os.path.join(tempdir, output_filepath_bus_metrics), use_pyarrow=True)
+                operator_id_mapping.write_parquet(
+                    os.path.join(tempdir, output_filepath_operator_mapping), use_pyarrow=True
+                )
+
+                upload_file(
+                    file_name=os.path.join(tempdir, output_filepath_bus_metrics),
+                    object_path=os.path.join(bus_events.s3_uri, output_filepath_bus_metrics),
+                    extra_args={"Metadata": {VERSION_KEY: bus_events.version}},
+                )
+                upload_file(
+                    file_name=os.path.join(tempdir, output_filepath_operator_mapping),
+                    object_path=os.path.join(bus_operator_mapping.s3_uri, output_filepath_operator_mapping),
+                    extra_args={"Metadata": {VERSION_KEY: bus_operator_mapping.version}},
+                )
+    except LampExpectedNotFoundError as exception:
+        # service_date not found = ExpectedNotFound
+        day_logger.add_metadata(skipped_day=exception)
+        return
+    except LampInvalidProcessingError as exception:
+        # num service date > 1 = InvalidProcessing (this should never happen)
+        day_logger.log_failure(exception)
+    except (OSError, ComputeError) as exception:
+        # common errors related to processing remote files
+        day_logger.log_failure(exception)
+        return
+    except Exception as exception:
+        day_logger.log_failure(exception)
+
+    day_logger.log_complete()
+
+
+def write_bus_metrics_for_dates(
+    event_files: Dict[date, Dict[str, List[str]]],
+    debug_flags: Dict[str, dict[str, bool]],
+) -> None:
+    """
+    Write bus-performance parquet files for each service date in event_files
+
+    service dates are independent, so multiple dates are processed in a pool
+    of spawned processes, sized by service_date_workers. a single date is
+    processed in this process.
+    """
+    service_dates = sorted(event_files.keys())
+    workers = service_date_workers(len(service_dates))
+
+    logger = ProcessLogger("write_bus_metrics_for_dates", service_date_count=len(service_dates), workers=workers)
+    logger.log_start()
+
+    if workers == 1:
+        for service_date in service_dates:
+            write_bus_metrics_day(service_date, event_files[service_date], debug_flags)
+    else:
+        # each process handles one service date, releasing its memory on exit
+        with get_context("spawn").Pool(processes=workers, maxtasksperchild=1) as pool:
+            results = [
+                pool.apply_async(write_bus_metrics_day, (service_date, event_files[service_date], debug_flags))
+                for service_date in service_dates
+            ]
+            for result in results:
+                result.get()
+            pool.close()
+            pool.join()
+
+    logger.log_complete()
 
 
-# pylint: disable=R0914
 def write_bus_metrics(
     start_date: Optional[date] = None,
     end_date: Optional[date] = None,
@@ -44,85 +195,12 @@ def write_bus_metrics(
     event_files = event_files_to_load(start_date, end_date)
     logger.add_metadata(service_date_count=len(event_files))
 
-    for service_date in event_files.keys():
-        gtfs_files = event_files[service_date]["gtfs_rt"]
-        tm_files = event_files[service_date]["transit_master_stop_crossing"]
-        tm_files_work_pieces = event_files[service_date]["transit_master_daily_work_piece"]
-
-        day_logger = ProcessLogger(
-            "write_bus_metrics_day",
-            service_date=service_date,
-            gtfs_file_count=len(gtfs_files),
-            tm_file_count=len(tm_files),
-            tm_work_piece=len(tm_files_work_pieces),
-        )
-        day_logger.log_start()
-
-        # need gtfs_rt and tm files to run process
-        if len(gtfs_files) == 0:
-            day_logger.log_failure(FileNotFoundError(f"No RT_VEHICLE_POSITION files found for {service_date}"))
-            continue
-
-        if len(tm_files) == 0:
-            day_logger.log_warning(FileNotFoundError(f"No TransitMaster files found for {service_date}"))
-            continue
-
-        if len(tm_files_work_pieces) == 0:
-            day_logger.log_warning(FileNotFoundError(f"No Daily Work Piece files found for {service_date}"))
-            continue
-
-        # do bus events
-        try:
-            events_df, operator_id_mapping = run_bus_performance_pipeline(
-                service_date, gtfs_files, tm_files, tm_files_work_pieces, **debug_flags
-            )
-
-            day_logger.add_metadata(bus_performance_rows=events_df.shape[0])
-
-            output_filepath_bus_metrics = f"{service_date.strftime('%Y%m%d')}.parquet"
-            output_filepath_operator_mapping = f"operator_map_pii_{service_date.strftime('%Y%m%d')}.parquet"
-
-            if debug_flags.get("write_local_only"):
-                events_df.write_parquet(os.path.join("/tmp/", output_filepath_bus_metrics), use_pyarrow=True)
-                operator_id_mapping.write_parquet(
-                    os.path.join("/tmp/", output_filepath_operator_mapping), use_pyarrow=True
-                )
-            else:
-                with tempfile.TemporaryDirectory() as tempdir:
-                    events_df.write_parquet(os.path.join(tempdir, output_filepath_bus_metrics), use_pyarrow=True)
-                    operator_id_mapping.write_parquet(
-                        os.path.join(tempdir, output_filepath_operator_mapping), use_pyarrow=True
-                    )
-
-                    upload_file(
-                        file_name=os.path.join(tempdir, output_filepath_bus_metrics),
-                        object_path=os.path.join(bus_events.s3_uri, output_filepath_bus_metrics),
-                        extra_args={"Metadata": {VERSION_KEY: bus_events.version}},
-                    )
-                    upload_file(
-                        file_name=os.path.join(tempdir, output_filepath_operator_mapping),
-                        object_path=os.path.join(bus_operator_mapping.s3_uri, output_filepath_operator_mapping),
-                        extra_args={"Metadata": {VERSION_KEY: bus_operator_mapping.version}},
-                    )
-        except LampExpectedNotFoundError as exception:
-            # service_date not found = ExpectedNotFound
-            day_logger.add_metadata(skipped_day=exception)
-            continue
-        except LampInvalidProcessingError as exception:
-            # num service date > 1 = InvalidProcessing (this should never happen)
-            day_logger.log_failure(exception)
-        except (OSError, ComputeError) as exception:
-            # common errors related to processing remote files
-            day_logger.log_failure(exception)
-            continue
-        except Exception as exception:
-            day_logger.log_failure(exception)
-
-        day_logger.log_complete()
+    write_bus_metrics_for_dates(event_files, debug_flags)
 
     logger.log_complete()
 
 
+# pylint: disable=R0914
 def regenerate_bus_metrics_recent(num_days: int = BUS_RECENT_NDAYS, **debug_flags: dict[str, bool]) -> None:
     """
     Check if latest updated schema is the same for all files in a recent num_days
@@ -150,8 +228,8 @@ def regenerate_bus_metrics_recent(num_days: int = BUS_RECENT_NDAYS, **debug_flag
         # check if schema match - regenerate if no match
         if today:
             start_day = today - timedelta(days=num_days)
-            latest_path = os.path.join(bus_events.s3_uri, f"{today.strftime('%Y%m%d')}.parquet")
-            prior_path = os.path.join(bus_events.s3_uri, f"{start_day.strftime('%Y%m%d')}.parquet")
+            latest_path = os.path.join(bus_events.s3_uri, bus_metrics_filename(today))
+            prior_path = os.path.join(bus_events.s3_uri, bus_metrics_filename(start_day))
 
             regenerate_days = False
 
@@ -167,20 +245,39 @@ def regenerate_bus_metrics_recent(num_days: int = BUS_RECENT_NDAYS, **debug_flag
                 regenerated=regenerate_days, start_date=prior_path, end_date=latest_path
             )
 
-            # check if any file paths are missing - regenerate all if any in the expected range are missing
-            expected_bus_events_paths = build_data_range_paths(
-                bus_events.s3_uri + "/{yy}{mm:02d}{dd:02d}.parquet", start_date=start_day, end_date=today
-            )
-            expected_bus_operator_mapping_paths = build_data_range_paths(
-                bus_operator_mapping.s3_uri + "/operator_mapping_pii_{yy}{mm:02d}{dd:02d}.parquet",
-                start_date=start_day,
-                end_date=today,
-            )
-
-            for day in zip(expected_bus_events_paths, expected_bus_operator_mapping_paths):
-                if not object_exists(day[0]) or not object_exists(day[1]):
-                    regenerate_bus_metrics_logger.add_metadata(regenerate_missing_day=day[0])
-                    missing_date = service_date_from_filename(day[0])
-                    write_bus_metrics(start_date=missing_date, end_date=missing_date, **debug_flags)
+            # check if any files are missing - regenerate all days in the expected range that are missing.
+            # listing errors are raised, so a failed listing is not taken for missing days
+            bus_events_files = {
+                os.path.basename(path)
+                for path in file_list_from_s3_strict(bucket_name=bus_events.bucket, file_prefix=bus_events.prefix)
+            }
+            bus_operator_mapping_files = {
+                os.path.basename(path)
+                for path in file_list_from_s3_strict(
+                    bucket_name=bus_operator_mapping.bucket, file_prefix=bus_operator_mapping.prefix
+                )
+            }
+            expected_dates = [start_day + timedelta(days=day) for day in range(num_days + 1)]
+            missing_dates = [
+                service_date
+                for service_date in expected_dates
+                if bus_metrics_filename(service_date) not in bus_events_files
+                or operator_mapping_filename(service_date) not in bus_operator_mapping_files
+            ]
+            regenerate_bus_metrics_logger.add_metadata(regenerate_missing_day_count=len(missing_dates))
+
+            if missing_dates:
+                event_files = event_files_to_load(start_date=min(missing_dates), end_date=max(missing_dates))
+                write_bus_metrics_for_dates(
+                    {
+                        service_date: event_files[service_date]
+                        for service_date in missing_dates
+                        if service_date in event_files
+                    },
+                    debug_flags,
+                )
 
     regenerate_bus_metrics_logger.log_complete()
+
+
+# pylint: enable=R0914
@@ -5,6 +5,7 @@ from typing import (
     Tuple,
 )
 
+import pyarrow
 from pyarrow import csv
 import polars as pl
 
@@ -14,6 +15,7 @@ from lamp_py.aws.s3 import (
     file_list_from_s3,
 )
 from lamp_py.ingestion.utils import (
+    append_constant_columns,
     ordered_schedule_frame,
     file_as_bytes_buf,
 )
@@ -113,8 +115,7 @@ class GtfsConverter(Converter):
             table = csv.read_csv(table_file)
 
             # add the last modified timestamp
-            version_column = [version_key] * table.num_rows
-            table = table.append_column("timestamp", [version_column])
+            table = append_constant_columns(table, {"timestamp": pyarrow.scalar(version_key, pyarrow.int64())})
 
         s3_prefix = table_filename.replace(".txt", "").upper()
 
@@ -1,8 +1,9 @@
-import json
 import logging
 import os
+import pathlib
 import shutil
 import tempfile
+import time
 from concurrent.futures import ThreadPoolExecutor
 from dataclasses import (
     dataclass,
@@ -19,6 +20,7 @@ from typing import (
     Iterable,
     List,
     Optional,
+    Set,
     Tuple,
 )
 
@@ -31,7 +33,9 @@ import pyarrow.compute as pc
 import pyarrow.parquet as pq
 import pyarrow.dataset as pd
 
+from lamp_py.aws.client_pool import get_s3_filesystem
 from lamp_py.aws.s3 import (
+    delete_object,
     move_s3_objects,
     file_list_from_s3,
     download_file,
@@ -45,12 +49,17 @@ from lamp_py.ingestion.config_busloc_vehicle import RtBusVehicleDetail
 from lamp_py.ingestion.config_rt_trip import RtTripDetail
 from lamp_py.ingestion.config_rt_vehicle import RtVehicleDetail
 from lamp_py.ingestion.converter import ConfigType, Converter
-from lamp_py.runtime_utils.lamp_exception import NoImplException
+from lamp_py.runtime_utils.lamp_exception import AWSException, NoImplException
 from lamp_py.ingestion.gtfs_rt_detail import GTFSRTDetail
 from lamp_py.ingestion.utils import (
     GTFS_RT_HASH_COL,
+    append_constant_columns,
+    append_gtfs_rt_hash_index,
+    clear_gtfs_rt_hash_index,
+    gtfs_rt_json_to_table,
     hash_gtfs_rt_table,
     hash_gtfs_rt_parquet,
+    read_gtfs_rt_hash_index,
 )
 from lamp_py.runtime_utils.remote_files import (
     LAMP,
@@ -124,6 +133,8 @@ class TableData:
     files: List[str] = field(default_factory=list)
 
 
+# pylint: disable=R0904
+# pylint too many public methods (more than 20)
 class GtfsRtConverter(Converter):
     """
     Converter that handles GTFS Real Time JSON data
@@ -136,6 +147,11 @@ class GtfsRtConverter(Converter):
     https_mbta_integration.mybluemix.net_vehicleCount.gz
     """
 
+    # new records are uploaded to springboard as part files on every event
+    # loop. full day files are re-uploaded, and their parts removed, at most
+    # once per compaction interval (seconds)
+    compaction_interval = 5 * 60
+
     def __init__(self, config_type: ConfigType, metadata_queue: Queue[Optional[str]], max_workers: int = 4) -> None:
         Converter.__init__(self, config_type, metadata_queue)
 
@@ -200,6 +216,7 @@ class GtfsRtConverter(Converter):
         finally:
             self.data_parts = {}
             self.move_s3_files()
+            self.compact_springboard_files()
             self.clean_local_folders()
 
     def thread_init(self) -> None:
@@ -211,7 +228,7 @@ class GtfsRtConverter(Converter):
         """
         thread_data = current_thread()
         if self.files and self.files[0].startswith("s3://"):
-            thread_data.__dict__["file_system"] = fs.S3FileSystem()
+            thread_data.__dict__["file_system"] = get_s3_filesystem()
         else:
             thread_data.__dict__["file_system"] = fs.LocalFileSystem()
 
@@ -320,48 +337,38 @@ class GtfsRtConverter(Converter):
 
             # some of our older files are named incorrectly, with a simple
             # .json suffix rather than a .json.gz suffix. in those cases, the
-            # s3 open_input_stream is unable to deduce the correct compression
-            # algo and fails with a UnicodeDecodeError. catch this failure and
-            # retry using a gzip compression algo. (EAFP Style)
-            try:
-                with file_system.open_input_stream(filename) as file:
-                    json_data = json.load(file)
-            except UnicodeDecodeError as _:
+            # open_input_stream is unable to deduce the correct compression
+            # algo and returns the raw gzip bytes. check for the gzip magic
+            # number and reopen using a gzip compression algo.
+            with file_system.open_input_stream(filename) as file:
+                buffer = file.read_buffer()
+            if buffer.size >= 2 and buffer.slice(0, 2).to_pybytes() == b"\x1f\x8b":
                 with file_system.open_input_stream(filename, compression="gzip") as file:
-                    json_data = json.load(file)
-
-            # parse timestamp info out of the header
-            feed_timestamp = json_data["header"]["timestamp"]
-            timestamp = datetime.fromtimestamp(feed_timestamp, timezone.utc)
+                    buffer = file.read_buffer()
 
             try:
-                table = pyarrow.Table.from_pylist(json_data["entity"], schema=self.detail.import_schema)
-            except pyarrow.ArrowTypeError as e:
+                feed_timestamp, table = gtfs_rt_json_to_table(buffer, self.detail.import_schema)
+            except pyarrow.ArrowInvalid as e:
                 if self.config_type == ConfigType.RT_ALERTS:
-                    table = pyarrow.Table.from_pylist(
-                        json_data["entity"],
-                        schema=pyarrow.schema(
+                    feed_timestamp, table = gtfs_rt_json_to_table(
+                        buffer,
+                        pyarrow.schema(
                             [v.pyarrow_field(k) for k, v in ProposedAlertsRecord.entity.inner.inner.items()]  # type: ignore[attr-defined]
                         ),
                     )
                 else:
                     raise e
 
-            table = table.append_column(
-                "year",
-                pyarrow.array([timestamp.year] * table.num_rows, pyarrow.uint16()),
-            )
-            table = table.append_column(
-                "month",
-                pyarrow.array([timestamp.month] * table.num_rows, pyarrow.uint8()),
-            )
-            table = table.append_column(
-                "day",
-                pyarrow.array([timestamp.day] * table.num_rows, pyarrow.uint8()),
-            )
-            table = table.append_column(
-                "feed_timestamp",
-                pyarrow.array([feed_timestamp] * table.num_rows, pyarrow.uint64()),
+            timestamp = datetime.fromtimestamp(feed_timestamp, timezone.utc)
+
+            table = append_constant_columns(
+                table,
+                {
+                    "year": pyarrow.scalar(timestamp.year, pyarrow.uint16()),
+                    "month": pyarrow.scalar(timestamp.month, pyarrow.uint8()),
+                    "day": pyarrow.scalar(timestamp.day, pyarrow.uint8()),
+                    "feed_timestamp": pyarrow.scalar(feed_timestamp, pyarrow.uint64()),
+                },
             )
 
         except FileNotFoundError as _:
@@ -405,7 +412,8 @@ class GtfsRtConverter(Converter):
 
     def sync_with_s3(self, local_path: str) -> bool:
         """
-        Sync local_path with S3 object
+        Sync local_path with S3 object and any springboard part files that have
+        not been compacted into it yet
 
         :param local_path: local tmp path file to sync
 
@@ -416,6 +424,7 @@ class GtfsRtConverter(Converter):
 
         local_folder = local_path.replace(os.path.basename(local_path), "")
         os.makedirs(local_folder, exist_ok=True)
+        pathlib.Path(self.compaction_marker(local_path, "parts")).unlink(missing_ok=True)
 
         s3_files = file_list_from_s3(
             S3_SPRINGBOARD,
@@ -424,21 +433,242 @@ class GtfsRtConverter(Converter):
         if len(s3_files) == 1:
             s3_path = s3_files[0].replace("s3://", "")
             download_file(s3_path, local_path)
+
+        self.merge_springboard_parts(local_path)
+
+        return os.path.exists(local_path)
+
+    def springboard_parts_prefix(self, local_path: str) -> str:
+        """
+        S3 springboard prefix of the part files that belong to a local parquet
+        file
+
+        parts are kept outside of the config type prefix, so they are never
+        listed by readers of springboard day files
+        """
+        day_folder = os.path.relpath(os.path.dirname(local_path), os.path.join(self.tmp_folder, LAMP))
+        return os.path.join(LAMP, "SPRINGBOARD_PARTS", day_folder) + "/"
+
+    def merged_springboard_parts(self, local_path: str) -> Set[str]:
+        """
+        springboard part files with records in local_path, that are removed
+        when the day file is compacted
+
+        :return set of part object paths, without leading s3://
+        """
+        parts_marker = self.compaction_marker(local_path, "parts")
+        if not os.path.exists(parts_marker):
+            return set()
+        with open(parts_marker, "r", encoding="utf8") as parts_file:
+            return set(parts_file.read().split())
+
+    def add_merged_springboard_parts(self, local_path: str, s3_parts: List[str]) -> None:
+        """record springboard part files with records in local_path"""
+        with open(self.compaction_marker(local_path, "parts"), "a", encoding="utf8") as parts_file:
+            parts_file.writelines(f"{s3_part.replace('s3://', '')}\n" for s3_part in s3_parts)
+
+    def merge_springboard_parts(self, local_path: str, s3_parts: Optional[List[str]] = None) -> None:
+        """
+        merge springboard part files into local_path
+
+        records in parts that were already compacted into the day file, but
+        not removed, are only kept once. raises if any part can not be
+        downloaded, so no part is removed without being merged.
+
+        :param local_path: local tmp path file, may not exist yet
+        :param s3_parts: part files to merge, all part files of local_path if None
+        """
+        if s3_parts is None:
+            s3_parts = file_list_from_s3(S3_SPRINGBOARD, file_prefix=self.springboard_parts_prefix(local_path))
+        if len(s3_parts) == 0:
+            return
+
+        log = ProcessLogger("merge_springboard_parts", local_path=local_path, part_count=len(s3_parts))
+        log.log_start()
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            to_merge = [local_path] if os.path.exists(local_path) else []
+            for part_count, s3_part in enumerate(s3_parts):
+                part_path = os.path.join(temp_dir, f"{part_count}.parquet")
+                if not download_file(s3_part.replace("s3://", ""), part_path):
+                    exception = AWSException(f"unable to download springboard part {s3_part}")
+                    log.log_failure(exception)
+                    raise exception
+                to_merge.append(part_path)
+
+            try:
+                # local_path may already be hashed, records are hashed again after merging
+                records = pl.concat(
+                    [pl.read_parquet(path).drop(GTFS_RT_HASH_COL, strict=False) for path in to_merge],
+                    how="diagonal_relaxed",
+                ).unique(maintain_order=True)
+            except pl.exceptions.PolarsError as exception:
+                # nested RT_ALERTS columns can change within a service day,
+                # the service day is reset in that case
+                if self.config_type != ConfigType.RT_ALERTS:
+                    raise exception
+                log.add_metadata(merge_skipped=True)
+                records = pl.read_parquet(to_merge[-1]).drop(GTFS_RT_HASH_COL, strict=False)
+
+            records.sort(by=[self.detail.partition_column], maintain_order=True).write_parquet(
+                local_path, compression="zstd", compression_level=3
+            )
+        hash_gtfs_rt_parquet(local_path)
+        # the hash index is rebuilt from the merged records when it is next read
+        clear_gtfs_rt_hash_index(local_path)
+
+        # parts have to be removed by the next compaction
+        self.add_merged_springboard_parts(local_path, s3_parts)
+        pathlib.Path(self.compaction_marker(local_path, "pending")).touch()
+        log.add_metadata(number_of_rows=records.height)
+        log.log_complete()
+
+    def compaction_marker(self, local_path: str, marker: str) -> str:
+        """
+        path of a compaction marker file for a local parquet file
+
+        pending: part files have been uploaded since the day file was last uploaded
+        compacted: modified time is the last upload of the day file
+        parts: part files with records in the local file, see merged_springboard_parts
+        """
+        return f"{local_path.removesuffix('.parquet')}_{marker}"
+
+    def compaction_due(self, local_path: str) -> bool:
+        """check if the springboard day file of local_path should be re-uploaded"""
+        compacted_marker = self.compaction_marker(local_path, "compacted")
+        if not os.path.exists(compacted_marker):
             return True
+        return time.time() - os.path.getmtime(compacted_marker) >= self.compaction_interval
+
+    # pylint: disable=R0914
+    # pylint too many local variables (more than 15)
+    def compact_springboard_file(self, local_path: str, rail_records: Optional[pyarrow.Table] = None) -> bool:
+        """
+        upload local parquet file, without hash column, as the springboard day
+        file and remove the springboard part files merged into it
+
+        part files that are not in the local file yet, i.e. uploaded by another
+        process, are merged first.
+
+        trip updates also upload the light and heavy rail records of the day
+        file as a terminal predictions file.
 
-        return False
+        :param local_path: path to local parquet file
+        :param rail_records: recent rail records, dropped as duplicates from
+            local_path, to add to the terminal predictions file
 
-    def make_hash_dataset(self, table: pyarrow.Table, local_path: str) -> pd.Dataset:
+        :return bool: True if the springboard day file was uploaded
         """
-        create dataset, with hash column, that will be written to parquet file
+        log = ProcessLogger("compact_springboard_file", local_path=local_path)
+        log.log_start()
 
-        :param table: pyarrow Table
+        s3_parts = file_list_from_s3(S3_SPRINGBOARD, file_prefix=self.springboard_parts_prefix(local_path))
+        merged_parts = self.merged_springboard_parts(local_path)
+        unmerged_parts = [s3_part for s3_part in s3_parts if s3_part.replace("s3://", "") not in merged_parts]
+        if len(unmerged_parts) > 0:
+            log.add_metadata(unmerged_part_count=len(unmerged_parts))
+            self.merge_springboard_parts(local_path, unmerged_parts)
+
+        write_rail = self.config_type in [ConfigType.DEV_GREEN_RT_TRIP_UPDATES, ConfigType.RT_TRIP_UPDATES]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            upload_path = os.path.join(temp_dir, "upload.parquet")
+            rail_full_set_path = os.path.join(temp_dir, "rail_full_set.parquet")
+
+            local_pq = pq.ParquetFile(local_path)
+            schema = local_pq.schema_arrow
+            no_hash_schema = schema.remove(schema.get_field_index(GTFS_RT_HASH_COL))
+
+            with (
+                pq.ParquetWriter(
+                    upload_path, schema=no_hash_schema, compression="zstd", compression_level=3
+                ) as upload_writer,
+                # include the hash column for debug
+                pq.ParquetWriter(
+                    rail_full_set_path, schema=schema, compression="zstd", compression_level=3
+                ) as rail_full_set_writer,
+            ):
+                # local row groups are grouped by partition, keep them as is
+                for row_group in range(local_pq.num_row_groups):
+                    write_table = local_pq.read_row_group(row_group)
+                    upload_writer.write_table(write_table.drop_columns(GTFS_RT_HASH_COL))
+                    if write_rail:
+                        rail_full_set_writer.write_table(
+                            write_table.filter(
+                                FilterBankRtTripUpdates.ParquetFilter.light_rail
+                                | FilterBankRtTripUpdates.ParquetFilter.heavy_rail
+                            )
+                        )
+                if write_rail and rail_records is not None:
+                    rail_full_set_writer.write_table(rail_records.cast(schema))
+
+            # upload the upload_path file (without hash) to s3
+            # replace the first part of the path with the s3 path
+            uploaded = upload_file(
+                upload_path,
+                local_path.replace(self.tmp_folder, S3_SPRINGBOARD),
+            )
+            if uploaded and write_rail:
+                upload_file(
+                    rail_full_set_path,
+                    local_path.replace(self.tmp_folder, S3_SPRINGBOARD).replace(
+                        "RT_TRIP_UPDATES", "TERMINAL_PREDICTIONS_TRIP_UPDATES"
+                    ),
+                )
+
+        if uploaded:
+            for s3_part in s3_parts:
+                delete_object(s3_part)
+            pathlib.Path(self.compaction_marker(local_path, "parts")).unlink(missing_ok=True)
+            pathlib.Path(self.compaction_marker(local_path, "compacted")).touch()
+            pathlib.Path(self.compaction_marker(local_path, "pending")).unlink(missing_ok=True)
+        else:
+            # retry on a later event loop
+            pathlib.Path(self.compaction_marker(local_path, "pending")).touch()
+
+        log.add_metadata(uploaded=uploaded, part_count=len(s3_parts))
+        log.log_complete()
+        return uploaded
+
+    # pylint: enable=R0914
+
+    def compact_springboard_files(self) -> None:
+        """
+        compact springboard day files with pending part files that are due.
+
+        day files older than the most recent day are always compacted, so no
+        part files are left behind when their local folders are cleaned up.
+        """
+        root_folder = os.path.join(self.tmp_folder, LAMP, str(self.config_type))
+        day_folders = sorted(
+            pathlib.Path(root_folder).glob("year=*/month=*/day=*"),
+            key=lambda folder: datetime.strptime(str(folder), f"{root_folder}/year=%Y/month=%m/day=%d"),
+        )
+        for pending_marker in pathlib.Path(root_folder).glob("year=*/month=*/day=*/*_pending"):
+            local_path = f"{str(pending_marker).removesuffix('_pending')}.parquet"
+            if not os.path.exists(local_path):
+                continue
+            if pending_marker.parent == day_folders[-1] and not self.compaction_due(local_path):
+                continue
+            try:
+                if self.compact_springboard_file(local_path):
+                    self.send_metadata(local_path.replace(self.tmp_folder, S3_SPRINGBOARD))
+            except Exception as exception:
+                logging.exception(exception)
+
+    def local_dataset(self, schema: pyarrow.Schema, local_path: str) -> Optional[pd.Dataset]:
+        """
+        create dataset of the existing records in the local parquet file, with
+        hash column
+
+        :param schema: schema of the records being added, with hash column
         :param local_path: path to local parquet file
+
+        :return dataset of existing records, None if there are no existing records
         """
-        log = ProcessLogger("make_hash_datset")
+        log = ProcessLogger("local_dataset")
         log.log_start()
-        table = hash_gtfs_rt_table(table)
-        out_ds = pd.dataset(table)
+        local_ds = None
 
         if self.sync_with_s3(local_path):
             hash_gtfs_rt_parquet(local_path)
@@ -448,131 +678,124 @@ class GtfsRtConverter(Converter):
             # RT_ALERTS updates are essentially the same throughout a service day so resetting the
             # dataset will have minimal impact on archived data
             try:
-                out_ds = pd.dataset(
-                    [
-                        pd.dataset(table),
-                        pd.dataset(local_path, schema=table.schema),
-                    ],
-                )
+                local_ds = pd.dataset(local_path, schema=schema)
             except pyarrow.ArrowTypeError as exception:
                 if self.config_type != ConfigType.RT_ALERTS:
                     raise exception
+
+        # the hash index only describes records of the local parquet file
+        if local_ds is None:
+            clear_gtfs_rt_hash_index(local_path)
+
         log.log_complete()
-        return out_ds
+        return local_ds
 
-    # pylint: disable=R0914
-    # pylint too many local variables (more than 15)
-    def write_local_pq(self, table: pyarrow.Table, local_path: str) -> None:
+    def write_local_pq(self, table: pyarrow.Table, local_path: str) -> bool:
         """
         merge pyarrow Table with existing local_path parquet file
 
+        new records are uploaded to springboard as a part file, the full day
+        file is only uploaded when its compaction is due
+
         :param table: pyarrow Table
         :param local_path: path to local parquet file
+
+        :return bool: True if the springboard day file was uploaded
         """
-        out_ds = self.make_hash_dataset(table, local_path)
+        table = hash_gtfs_rt_table(table)
+        schema = table.schema
+        local_ds = self.local_dataset(schema, local_path)
 
+        # new records are sorted by feed_timestamp and only the first instance
+        # of each record hash is kept. records are also dropped if their hash
+        # is in the hash index of the existing records, starting 45 minutes
+        # before the earliest new record.
         unique_ts_min = pc.min(table.column("feed_timestamp")).as_py() - (60 * 45)
-
-        no_hash_schema = out_ds.schema.remove(out_ds.schema.get_field_index(GTFS_RT_HASH_COL))
+        if local_ds is None:
+            index_hashes = pl.Series(GTFS_RT_HASH_COL, [], dtype=pl.UInt64)
+        else:
+            index_hashes = read_gtfs_rt_hash_index(local_path, unique_ts_min)
+
+        new_pl = (
+            pl.DataFrame(table)
+            .filter(pl.col(self.detail.partition_column).is_not_null())
+            .sort(by=["feed_timestamp"], maintain_order=True)
+            .with_columns(
+                (
+                    pl.col(GTFS_RT_HASH_COL).is_first_distinct()
+                    & pl.col(GTFS_RT_HASH_COL).is_in(index_hashes.implode()).not_()
+                ).alias("keep_record")
+            )
+        )
+        del index_hashes
 
         with tempfile.TemporaryDirectory() as temp_dir:
             hash_pq_path = os.path.join(temp_dir, "hash.parquet")
-            upload_path = os.path.join(temp_dir, "upload.parquet")
-            rail_full_set_path = os.path.join(temp_dir, "rail_full_set.parquet")
 
-            hash_writer = pq.ParquetWriter(hash_pq_path, schema=out_ds.schema, compression="zstd", compression_level=3)
-            upload_writer = pq.ParquetWriter(
-                upload_path, schema=no_hash_schema, compression="zstd", compression_level=3
+            # combine existing and new records and sort them by partition. rows
+            # without a partition value are not written.
+            out_pl = new_pl.filter(pl.col("keep_record"))
+            if local_ds is not None:
+                out_pl = pl.concat(
+                    [
+                        pl.DataFrame(local_ds.to_table(filter=pc.field(self.detail.partition_column).is_valid())),
+                        out_pl.drop("keep_record"),
+                    ]
+                )
+            out_pl = out_pl.drop("keep_record", strict=False).sort(
+                by=[self.detail.partition_column], maintain_order=True
             )
 
-            # include the hash column for debug
-            rail_full_set_writer = pq.ParquetWriter(
-                rail_full_set_path, schema=out_ds.schema, compression="zstd", compression_level=3
-            )
+            # write each partition slice as its own row group
+            with pq.ParquetWriter(hash_pq_path, schema=schema, compression="zstd", compression_level=3) as hash_writer:
+                part_offset = 0
+                for part_length in out_pl.group_by(self.detail.partition_column, maintain_order=True).len()["len"]:
+                    hash_writer.write_table(out_pl.slice(part_offset, part_length).to_arrow().cast(schema))
+                    part_offset += part_length
+            del out_pl
 
-            partitions = pc.unique(
-                out_ds.to_table(columns=[self.detail.partition_column]).column(self.detail.partition_column)
-            )
-            for part in partitions:
-                write_table = out_ds.to_table(
-                    filter=(
-                        (pc.field(self.detail.partition_column) == part) & (pc.field("feed_timestamp") < unique_ts_min)
-                    )
-                )
+            # overwrite existing hashed parquet path
+            os.replace(hash_pq_path, local_path)
+            append_gtfs_rt_hash_index(local_path, new_pl.filter(pl.col("keep_record")))
 
-                hash_writer.write_table(write_table)
-                upload_writer.write_table(write_table.drop_columns(GTFS_RT_HASH_COL))
-                write_table = (
-                    pl.from_arrow(
-                        out_ds.to_table(
-                            filter=(
-                                (pc.field(self.detail.partition_column) == part)
-                                & (pc.field("feed_timestamp") >= unique_ts_min)
-                            )
-                        )
-                    )
-                    .sort(by=["feed_timestamp"])  # type: ignore
-                    .unique(subset=GTFS_RT_HASH_COL, keep="first")
-                    .to_arrow()
-                    .cast(out_ds.schema)
-                )
-                if self.config_type in [ConfigType.DEV_GREEN_RT_TRIP_UPDATES, ConfigType.RT_TRIP_UPDATES]:
-                    lr_write_table = out_ds.to_table(
-                        filter=(
-                            (pc.field(self.detail.partition_column) == part)
-                            & (pc.field("feed_timestamp") < unique_ts_min)
-                            & (
-                                FilterBankRtTripUpdates.ParquetFilter.light_rail
-                                | FilterBankRtTripUpdates.ParquetFilter.heavy_rail
-                            )
-                        )
-                    )
-                    rail_full_set_writer.write_table(lr_write_table)
-
-                    lr_write_table = (
-                        pl.from_arrow(
-                            out_ds.to_table(
-                                filter=(
-                                    (pc.field(self.detail.partition_column) == part)
-                                    & (pc.field("feed_timestamp") >= unique_ts_min)
-                                    & (
-                                        FilterBankRtTripUpdates.ParquetFilter.light_rail
-                                        | FilterBankRtTripUpdates.ParquetFilter.heavy_rail
-                                    )
-                                )
-                            )
-                        )
-                        .sort(by=["feed_timestamp"])  # type: ignore
-                        .to_arrow()
-                        .cast(out_ds.schema)
-                    )
-                    rail_full_set_writer.write_table(lr_write_table)
+        if not self.compaction_due(local_path) and self.upload_springboard_part(
+            new_pl.filter(pl.col("keep_record")).drop("keep_record").to_arrow().cast(schema), local_path
+        ):
+            return False
 
-                hash_writer.write_table(write_table)
-                upload_writer.write_table(write_table.drop_columns(GTFS_RT_HASH_COL))
+        # the rail full set also keeps the new records that were dropped as duplicates
+        return self.compact_springboard_file(
+            local_path,
+            rail_records=new_pl.filter(pl.col("keep_record").not_()).drop("keep_record").to_arrow().cast(schema),
+        )
 
-            hash_writer.close()
-            upload_writer.close()
-            rail_full_set_writer.close()
+    def upload_springboard_part(self, table: pyarrow.Table, local_path: str) -> bool:
+        """
+        upload new records of a local parquet file, without hash column, as a
+        springboard part file
 
-            # overwrite existing hashed parquet path
-            os.replace(hash_pq_path, local_path)
+        :param table: new records, with hash column
+        :param local_path: path to local parquet file
 
-            # upload the upload_path file (without hash) to s3
-            # replace the first part of the path with the s3 path
-            upload_file(
-                upload_path,
-                local_path.replace(self.tmp_folder, S3_SPRINGBOARD),
+        :return bool: True if the part file was uploaded
+        """
+        with tempfile.TemporaryDirectory() as temp_dir:
+            part_path = os.path.join(temp_dir, "part.parquet")
+            pq.write_table(
+                table.drop_columns(GTFS_RT_HASH_COL),
+                part_path,
+                compression="zstd",
+                compression_level=3,
             )
-            if self.config_type in [ConfigType.DEV_GREEN_RT_TRIP_UPDATES, ConfigType.RT_TRIP_UPDATES]:
-                upload_file(
-                    rail_full_set_path,
-                    local_path.replace(self.tmp_folder, S3_SPRINGBOARD).replace(
-                        "RT_TRIP_UPDATES", "TERMINAL_PREDICTIONS_TRIP_UPDATES"
-                    ),
-                )
+            s3_part = os.path.join(
+                S3_SPRINGBOARD, self.springboard_parts_prefix(local_path), f"{time.time_ns()}.parquet"
+            )
+            uploaded = upload_file(part_path, s3_part)
 
-    # pylint: enable=R0914
+        if uploaded:
+            self.add_merged_springboard_parts(local_path, [s3_part])
+            pathlib.Path(self.compaction_marker(local_path, "pending")).touch()
+        return uploaded
 
     def continuous_pq_update(self, table: pyarrow.Table) -> None:
         """
@@ -597,8 +820,8 @@ class GtfsRtConverter(Converter):
 
             log.add_metadata(local_path=local_path)
 
-            self.write_local_pq(table, local_path)
-            self.send_metadata(local_path.replace(self.tmp_folder, S3_SPRINGBOARD))
+            if self.write_local_pq(table, local_path):
+                self.send_metadata(local_path.replace(self.tmp_folder, S3_SPRINGBOARD))
 
             # record the number of rows in the final parquet file for logging
             metadata = pq.read_metadata(local_path)
@@ -635,8 +858,12 @@ class GtfsRtConverter(Converter):
                 continue
             paths[datetime.strptime(w_dir, f"{root_folder}/year=%Y/month=%m/day=%d")] = w_dir
 
-        # remove all local day folders except two most recent
+        # remove all local day folders except two most recent. folders with
+        # part files that are not compacted yet are kept, so the compaction is
+        # retried.
         for key in sorted(paths.keys())[:-days_to_keep]:
+            if len(list(pathlib.Path(paths[key]).glob("*_pending"))) > 0:
+                continue
             shutil.rmtree(paths[key])
 
     def move_s3_files(self) -> None:
@@ -1,16 +1,22 @@
+import glob
 import os
+import pathlib
+from dataclasses import dataclass
 from multiprocessing import get_context
+from multiprocessing.pool import AsyncResult
 from queue import Queue
 from typing import (
     Dict,
     List,
     Optional,
+    Tuple,
 )
 
 from lamp_py.aws.s3 import (
     move_s3_objects,
-    file_list_from_s3,
+    file_list_from_s3_with_details,
 )
+from lamp_py.runtime_utils.memory_budget import memory_budget
 from lamp_py.runtime_utils.process_logger import ProcessLogger
 
 from lamp_py.ingestion.convert_gtfs import GtfsConverter
@@ -28,6 +34,16 @@ from lamp_py.runtime_utils.remote_files import LAMP, S3_ERROR, S3_INCOMING
 from lamp_py.ingestion.utils import group_sort_file_list
 from lamp_py.ingestion.compress_gtfs.gtfs_to_parquet import gtfs_to_parquet
 
+# rough peak memory use of a converter process, used to schedule converters
+# under INGESTION_MEMORY_BUDGET_MB (defaults to 80% of system memory)
+#
+# every process pays for its interpreter and imports, gzipped json feeds
+# expand when decoded into tables, and the local day file of the config type
+# is read and rewritten in memory for each table written.
+WORKER_MEMORY_BYTES = 512 * 1024 * 1024
+INCOMING_MEMORY_FACTOR = 20
+LOCAL_MEMORY_FACTOR = 8
+
 
 class NoImplConverter(Converter):
     """
@@ -50,6 +66,146 @@ def run_converter(converter: Converter) -> None:
     converter.convert()
 
 
+@dataclass
+class ConverterUnit:
+    """
+    one unit of converter work, the files of a config type for a single hour
+    """
+
+    converter: Converter
+    memory_bytes: int
+
+
+def local_file_bytes(tmp_folder: str, config_type: ConfigType) -> int:
+    """
+    size of the largest local day file of a config type
+
+    :param tmp_folder: local folder the converter of the config type writes to
+    :param config_type: config type of the day files
+    """
+    local_files = glob.glob(
+        os.path.join(
+            tmp_folder,
+            LAMP,
+            str(config_type),
+            "year=*/month=*/day=*/*.parquet",
+        )
+    )
+    return max((os.path.getsize(path) for path in local_files), default=0)
+
+
+def converter_units(
+    file_details: List[Dict],
+    metadata_queue: Queue[Optional[str]],
+) -> Dict[ConfigType, List[ConverterUnit]]:
+    """
+    split incoming files into one converter per config type and hour
+
+    units of a config type are returned in chronological order, files that
+    can not be converted are returned as a single ERROR unit
+
+    :param file_details: incoming files as returned by file_list_from_s3_with_details
+    :param metadata_queue: queue of springboard paths for the rds writer
+
+    :return units of work for each config type
+    """
+    file_sizes = {detail["s3_obj_path"]: detail["size_bytes"] for detail in file_details}
+
+    hour_files: Dict[Tuple[ConfigType, str], List[str]] = {}
+    error_files: List[str] = []
+
+    for file_group in group_sort_file_list(list(file_sizes)).values():
+        # get the config type from the file name. if something goes wrong, add
+        # these files to the error converter where they will be moved from
+        # incoming to error s3 buckets.
+        try:
+            config_type = ConfigType.from_filename(file_group[0])
+        except IgnoreIngestion:
+            continue
+        except ConfigTypeFromFilenameException:
+            error_files += file_group
+            continue
+
+        for file in file_group:
+            # filenames start with a "YYYY-MM-DDTHH:MM:SSZ" timestamp
+            hour_files.setdefault((config_type, pathlib.Path(file).name[:13]), []).append(file)
+
+    units: Dict[ConfigType, List[ConverterUnit]] = {}
+    local_bytes: Dict[ConfigType, int] = {}
+    for (config_type, _), files in sorted(hour_files.items(), key=lambda item: (item[0][0].value, item[0][1])):
+        # config types with several filename patterns are kept in timestamp order
+        files.sort(key=lambda file: pathlib.Path(file).name[:20])
+
+        converter: Converter
+        try:
+            converter = GtfsRtConverter(config_type, metadata_queue)
+        except NoImplException:
+            error_files += files
+            continue
+        converter.add_files(files)
+
+        if config_type not in local_bytes:
+            local_bytes[config_type] = local_file_bytes(converter.tmp_folder, config_type)
+
+        memory_bytes = (
+            WORKER_MEMORY_BYTES
+            + INCOMING_MEMORY_FACTOR * sum(file_sizes[file] for file in files)
+            + LOCAL_MEMORY_FACTOR * local_bytes[config_type]
+        )
+        units.setdefault(config_type, []).append(ConverterUnit(converter, memory_bytes))
+
+    if len(error_files) > 0:
+        converter = NoImplConverter(ConfigType.ERROR, metadata_queue)
+        converter.add_files(error_files)
+        units[ConfigType.ERROR] = [ConverterUnit(converter, WORKER_MEMORY_BYTES)]
+
+    return units
+
+
+def schedule_converter_units(
+    pending: Dict[ConfigType, List[ConverterUnit]],
+    running: Dict[ConfigType, int],
+    budget_bytes: int,
+    process_count: int,
+) -> List[ConverterUnit]:
+    """
+    pick the pending units to start next, largest first, while their memory
+    estimates fit in the memory budget next to the running units
+
+    only one unit of a config type runs at a time, because all units of a
+    config type share its local day files. a unit is always started when
+    nothing is running, even if it does not fit in the budget.
+
+    :param pending: pending units for each config type, started units are removed
+    :param running: memory estimate of the running unit for each config type
+    :param budget_bytes: memory budget of all running units
+    :param process_count: maximum number of running units
+
+    :return units to start
+    """
+    running_bytes = sum(running.values())
+    running_count = len(running)
+
+    candidates = sorted(
+        (config_type for config_type, units in pending.items() if len(units) > 0 and config_type not in running),
+        key=lambda config_type: pending[config_type][0].memory_bytes,
+        reverse=True,
+    )
+
+    to_start: List[ConverterUnit] = []
+    for config_type in candidates:
+        if running_count >= process_count:
+            break
+        unit = pending[config_type][0]
+        if running_count > 0 and running_bytes + unit.memory_bytes > budget_bytes:
+            continue
+        to_start.append(pending[config_type].pop(0))
+        running_bytes += unit.memory_bytes
+        running_count += 1
+
+    return to_start
+
+
 def ingest_gtfs_archive(metadata_queue: Queue[Optional[str]]) -> None:
     """
     ingest gtfs schedules from MBTA GTFS schedule archive
@@ -70,39 +226,28 @@ def ingest_s3_files(metadata_queue: Queue[Optional[str]], bucket_filter: str = L
     tables to parquet files in the springboard bucket, add the parquet
     filepaths to the metadata table as unprocessed, and move gtfs files to the
     archive bucket (or error bucket in the event of an error)
+
+    each config type and hour of files is converted in its own process. these
+    units are packed onto processes so that their estimated memory use stays
+    within the memory budget.
     """
     logger = ProcessLogger(process_name="ingest_s3_files")
     logger.log_start()
 
+    pending: Dict[ConfigType, List[ConverterUnit]] = {}
     try:
-        files = file_list_from_s3(bucket_name=S3_INCOMING, file_prefix=bucket_filter, max_list_size=10000)
-
-        grouped_files = group_sort_file_list(files)
-
-        for k, v in grouped_files.items():
-            logger.add_metadata(ingest_config_type=k, ingest_number_of_files=len(v))
-        # initialize with an error / no impl converter, the rest will be added in as
-        # the appear.
-        converters: Dict[ConfigType, Converter] = {}
-        error_files: List[str] = []
-
-        for file_group in grouped_files.values():
-            # get the config type from the file name and create a converter for this
-            # type if one does not already exist. add the files to their converter.
-            # if something goes wrong, add these files to the error converter where
-            # they will be moved from incoming to error s3 buckets.
-            try:
-                config_type = ConfigType.from_filename(file_group[0])
-                if config_type not in converters:
-                    converters[config_type] = GtfsRtConverter(config_type, metadata_queue)
-                converters[config_type].add_files(file_group)
-            except IgnoreIngestion:
-                continue
-            except (ConfigTypeFromFilenameException, NoImplException):
-                error_files += file_group
-
-        converters[ConfigType.ERROR] = NoImplConverter(ConfigType.ERROR, metadata_queue)
-        converters[ConfigType.ERROR].add_files(error_files)
+        file_details = file_list_from_s3_with_details(
+            bucket_name=S3_INCOMING, file_prefix=bucket_filter, max_list_size=10000
+        )
+
+        pending = converter_units(file_details, metadata_queue)
+
+        for config_type, units in pending.items():
+            logger.add_metadata(
+                ingest_config_type=str(config_type),
+                ingest_number_of_files=sum(len(unit.converter.files) for unit in units),
+                ingest_number_of_units=len(units),
+            )
 
     except Exception as exception:
         logger.log_failure(exception)
@@ -112,7 +257,7 @@ def ingest_s3_files(metadata_queue: Queue[Optional[str]], bucket_filter: str = L
     # Using signal.signal to detect ECS termination and multiprocessing.Manager
     # to manage the metadata queue along with multiprocessing.Pool.map causes
     # inadvertent SIGTERM signals to be sent and blocks the main event loop. To
-    # fix this, we use multiprocessing.Pool.map_async. We use pool.close()
+    # fix this, we use multiprocessing.Pool.apply_async. We use pool.close()
     # and pool.join() to ensure all work has completed in pools.
     #
     # Also worth noting, this application is run on Ubuntu when run on ECS,
@@ -123,9 +268,35 @@ def ingest_s3_files(metadata_queue: Queue[Optional[str]], bucket_filter: str = L
     process_count = os.cpu_count()
     if process_count is None:
         process_count = 4
-    if len(converters) > 0:
+    budget_bytes = memory_budget("INGESTION_MEMORY_BUDGET_MB")
+    logger.add_metadata(memory_budget_mb=budget_bytes // (1024 * 1024))
+
+    if sum(len(units) for units in pending.values()) > 0:
         with get_context("spawn").Pool(processes=process_count, maxtasksperchild=1) as pool:
-            pool.map_async(run_converter, converters.values())
+            running: Dict[ConfigType, Tuple[AsyncResult, int]] = {}
+            while True:
+                for unit in schedule_converter_units(
+                    pending,
+                    {config_type: memory_bytes for config_type, (_, memory_bytes) in running.items()},
+                    budget_bytes,
+                    process_count,
+                ):
+                    running[unit.converter.config_type] = (
+                        pool.apply_async(run_converter, (unit.converter,)),
+                        unit.memory_bytes,
+                    )
+
+                if len(running) == 0:
+                    break
+
+                # wait for any running unit to finish before scheduling more
+                while not any(result.ready() for result, _ in running.values()):
+                    next(iter(running.values()))[0].wait(timeout=0.1)
+                running = {
+                    config_type: (result, memory_bytes)
+                    for config_type, (result, memory_bytes) in running.items()
+                    if not result.ready()
+                }
             pool.close()
             pool.join()
 
@@ -1,16 +1,19 @@
 import os
 import re
+import glob
 import gzip
+import time
 import shutil
 import pathlib
 import datetime
 import zoneinfo
 import tempfile
-from typing import Dict, List
+from typing import Dict, List, Tuple
 from urllib import request
 from io import BytesIO
 
 import pyarrow
+import pyarrow.json as pj
 import pyarrow.parquet as pq
 import pyarrow.compute as pc
 import polars as pl
@@ -18,6 +21,7 @@ import polars as pl
 from lamp_py.runtime_utils.process_logger import ProcessLogger
 
 GTFS_RT_HASH_COL = "lamp_record_hash"
+GTFS_RT_HASH_INDEX_MAX_PARTS = 64
 
 
 def group_sort_file_list(filepaths: List[str]) -> Dict[str, List[str]]:
@@ -203,6 +207,86 @@ def explode_table_column(table: pyarrow.table, column: str) -> pyarrow.table:
     )
 
 
+def _relax_type(dtype: pyarrow.DataType, json_types: bool) -> pyarrow.DataType:
+    """
+    mark every nested field of dtype as nullable
+
+    if json_types is set, large string and list types are replaced with the
+    regular variants that the pyarrow json reader is able to produce
+    """
+    if pyarrow.types.is_struct(dtype):
+        return pyarrow.struct([_relax_field(f, json_types) for f in dtype])
+    if pyarrow.types.is_large_list(dtype) and not json_types:
+        return pyarrow.large_list(_relax_field(dtype.value_field, json_types))
+    if pyarrow.types.is_list(dtype) or pyarrow.types.is_large_list(dtype):
+        return pyarrow.list_(_relax_field(dtype.value_field, json_types))
+    if pyarrow.types.is_large_string(dtype) and json_types:
+        return pyarrow.string()
+    return dtype
+
+
+def _relax_field(field: pyarrow.Field, json_types: bool) -> pyarrow.Field:
+    """nullable copy of field with all nested fields relaxed"""
+    return pyarrow.field(field.name, _relax_type(field.type, json_types), nullable=True)
+
+
+def gtfs_rt_json_to_table(buffer: pyarrow.Buffer, entity_schema: pyarrow.Schema) -> Tuple[int, pyarrow.Table]:
+    """
+    decode a GTFS-RT json feed message directly into a pyarrow table
+
+    the feed message is parsed by the arrow json reader with an explicit
+    schema, so entities are never materialized as python objects. fields not
+    found in entity_schema are ignored.
+
+    nested field nullability from entity_schema is not enforced, entities are
+    frequently missing "required" fields.
+
+    :param buffer: uncompressed json feed message
+    :param entity_schema: schema of each element of the feed "entity" list
+
+    :return int: feed header timestamp
+    :return pyarrow.Table: table of feed entities, one row per entity
+    """
+    entity_type = pyarrow.struct([_relax_field(f, json_types=True) for f in entity_schema])
+    feed_schema = pyarrow.schema(
+        [
+            ("header", pyarrow.struct([("timestamp", pyarrow.uint64())])),
+            ("entity", pyarrow.list_(entity_type)),
+        ]
+    )
+
+    # each feed message is a single json object, the entire message must fit
+    # into one block for the reader to parse it
+    feed = pj.read_json(
+        pyarrow.BufferReader(buffer),
+        read_options=pj.ReadOptions(block_size=buffer.size + 1),
+        parse_options=pj.ParseOptions(explicit_schema=feed_schema, unexpected_field_behavior="ignore"),
+    )
+
+    feed_timestamp = pc.struct_field(feed.column("header"), "timestamp")[0].as_py()
+    entities = pc.list_flatten(feed.column("entity")).combine_chunks()
+    entities = entities.cast(pyarrow.struct([_relax_field(f, json_types=False) for f in entity_schema]))
+
+    return (feed_timestamp, pyarrow.Table.from_struct_array(entities))
+
+
+def append_constant_columns(table: pyarrow.Table, columns: Dict[str, pyarrow.Scalar]) -> pyarrow.Table:
+    """
+    append columns that hold a single value for every row of a table
+
+    values are filled natively by arrow, rather than from a python list of
+    num_rows elements
+
+    :param table: table to append columns to
+    :param columns: map of column name to typed scalar value for that column
+
+    :return table with columns appended, in the order provided
+    """
+    for name, value in columns.items():
+        table = table.append_column(pyarrow.field(name, value.type), pyarrow.repeat(value, table.num_rows))
+    return table
+
+
 def hash_gtfs_rt_table(table: pyarrow.Table) -> pyarrow.Table:
     """
     add GTFS_RT_HASH_COL column to pyarrow table, if not already present
@@ -257,6 +341,85 @@ def hash_gtfs_rt_parquet(path: str) -> None:
         os.replace(tmp_pq, path)
 
 
+def gtfs_rt_hash_index_files(path: str) -> List[str]:
+    """
+    list the hash index part files that belong to a local gtfs-rt parquet file
+
+    index parts are stored next to the parquet file, in the same day partition
+    folder, so they are removed along with it
+    """
+    return sorted(glob.glob(f"{glob.escape(path.removesuffix('.parquet'))}_hash_index_*.parquet"))
+
+
+def clear_gtfs_rt_hash_index(path: str) -> None:
+    """remove all hash index part files of a local gtfs-rt parquet file"""
+    for index_file in gtfs_rt_hash_index_files(path):
+        os.remove(index_file)
+
+
+def append_gtfs_rt_hash_index(path: str, records: pl.DataFrame) -> None:
+    """
+    append record hashes to the hash index of a local gtfs-rt parquet file
+
+    each call writes a new index part. once GTFS_RT_HASH_INDEX_MAX_PARTS parts
+    exist, all parts are compacted into a single part sorted by
+    feed_timestamp, so row group statistics can skip older hashes on read.
+
+    :param path: local gtfs-rt parquet file path
+    :param records: frame with GTFS_RT_HASH_COL and feed_timestamp columns
+    """
+    index_files = gtfs_rt_hash_index_files(path)
+    records = records.select(
+        pl.col(GTFS_RT_HASH_COL).cast(pl.UInt64),
+        pl.col("feed_timestamp").cast(pl.UInt64),
+    )
+
+    # part names sort in write order
+    part_path = f"{path.removesuffix('.parquet')}_hash_index_{time.time_ns()}.parquet"
+
+    if len(index_files) + 1 < GTFS_RT_HASH_INDEX_MAX_PARTS:
+        records.write_parquet(part_path, statistics=True)
+        return
+
+    pl.concat([pl.read_parquet(index_files, hive_partitioning=False), records]).sort(by="feed_timestamp").write_parquet(
+        part_path, statistics=True, row_group_size=512 * 1024
+    )
+    for index_file in index_files:
+        os.remove(index_file)
+
+
+def read_gtfs_rt_hash_index(path: str, min_feed_timestamp: int) -> pl.Series:
+    """
+    read record hashes at or after min_feed_timestamp from the hash index of a
+    local gtfs-rt parquet file
+
+    if the parquet file has no index, as happens after it is synced from s3,
+    the index is built from the GTFS_RT_HASH_COL column of the file.
+
+    like the hash column itself, index hashes are only comparable within a
+    single version of polars and must not be persisted outside of local tmp
+    storage.
+
+    :param path: local gtfs-rt parquet file path
+    :param min_feed_timestamp: earliest feed_timestamp of hashes to return
+
+    :return series of record hashes
+    """
+    index_files = gtfs_rt_hash_index_files(path)
+    if len(index_files) == 0:
+        hash_gtfs_rt_parquet(path)
+        append_gtfs_rt_hash_index(path, pl.read_parquet(path, columns=[GTFS_RT_HASH_COL, "feed_timestamp"]))
+        index_files = gtfs_rt_hash_index_files(path)
+
+    return (
+        pl.scan_parquet(index_files, hive_partitioning=False)
+        .filter(pl.col("feed_timestamp") >= min_feed_timestamp)
+        .select(GTFS_RT_HASH_COL)
+        .collect()
+        .to_series()
+    )
+
+
 def gzip_file(path: str, keep_original: bool = False) -> None:
     """
     gzip local file
@@ -1,10 +1,13 @@
 import datetime
-from typing import Optional, List, Union
+import threading
+from typing import Dict, Optional, List, Union
 from functools import lru_cache
 from zoneinfo import ZoneInfo
 
 import numpy
 import pandas
+import polars as pl
+import pyarrow
 import pytz
 import sqlalchemy as sa
 
@@ -16,6 +19,7 @@ from lamp_py.postgres.rail_performance_manager_schema import (
 )
 from lamp_py.runtime_utils.process_logger import ProcessLogger
 from lamp_py.aws.s3 import dt_from_obj_path
+from lamp_py.utils.filter_bank import SERVICE_DATE_END_HOUR
 
 # TO BE ADDRESSED:
 # pytz local timezone introduces some weird offsets - should not be used anymore with proper
@@ -30,6 +34,47 @@ BOSTON_TZ = pytz.timezone("EST5EDT")
 BOSTON_TZ_ZONEINFO = ZoneInfo("US/Eastern")
 
 
+class StaticScheduleCache:
+    """
+    process wide cache of static schedule lookups
+
+    static schedule versions do not change once they are loaded, but a newly
+    loaded version can become the schedule for a service date. the cache must
+    be cleared whenever static schedule data is loaded into the database.
+    """
+
+    def __init__(self) -> None:
+        # service_date -> static_version_key
+        self.version_keys: Dict[int, int] = {}
+        # static_version_key -> static_version_key, stop_id, parent_station records
+        self.parent_stations: Dict[int, pandas.DataFrame] = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def clear(self) -> None:
+        """drop all cached lookups, keeping hit and miss counts"""
+        with self.lock:
+            self.version_keys = {}
+            self.parent_stations = {}
+
+    def count(self, hits: int = 0, misses: int = 0) -> None:
+        """add to hit and miss counts"""
+        with self.lock:
+            self.hits += hits
+            self.misses += misses
+
+    def metadata(self) -> Dict[str, int]:
+        """hit and miss counts for process logging"""
+        return {
+            "static_cache_hits": self.hits,
+            "static_cache_misses": self.misses,
+        }
+
+
+STATIC_SCHEDULE_CACHE = StaticScheduleCache()
+
+
 @lru_cache
 def start_time_to_seconds(
     time: Optional[str],
@@ -49,6 +94,24 @@ def start_time_to_seconds(
         return int(time)
 
 
+def start_time_seconds_expr(start_time: pl.Expr) -> pl.Expr:
+    """
+    polars expression transforming HH:MM:SS time strings to seconds, see
+    start_time_to_seconds. strings already formatted as seconds after midnight
+    are passed through. unparsable strings become null.
+    """
+    parts = start_time.str.split(":")
+    return (
+        pl.when(parts.list.len() == 3)
+        .then(
+            parts.list.get(0, null_on_oob=True).cast(pl.Int64, strict=False) * 3600
+            + parts.list.get(1, null_on_oob=True).cast(pl.Int64, strict=False) * 60
+            + parts.list.get(2, null_on_oob=True).cast(pl.Int64, strict=False)
+        )
+        .otherwise(start_time.cast(pl.Int64, strict=False))
+    )
+
+
 def start_timestamp_to_seconds(start_timestamp: int) -> int:
     """
     convert a start timestamp into seconds after midnight of its service date.
@@ -65,13 +128,13 @@ def start_timestamp_to_seconds(start_timestamp: int) -> int:
 def service_date_from_timestamp(timestamp: int) -> int:
     """
     generate the service date from a timestamp. if the timestamp is from before
-    4am, it belongs to the previous days service. otherwise, it belongs to its
-    days service. use the EST timezone when interpreting the timestamp to ensure
-    proper handling of daylight savings time.
+    SERVICE_DATE_END_HOUR, it belongs to the previous days service. otherwise,
+    it belongs to its days service. use the EST timezone when interpreting the
+    timestamp to ensure proper handling of daylight savings time.
     """
     date_and_time = datetime.datetime.fromtimestamp(timestamp, tz=BOSTON_TZ)
 
-    if date_and_time.hour < 4:  # changed from 3 -> 4 ahead of 2025 Fall Rating
+    if date_and_time.hour < SERVICE_DATE_END_HOUR:
         service_date = date_and_time.date() - datetime.timedelta(days=1)
     else:
         service_date = date_and_time.date()
@@ -79,13 +142,76 @@ def service_date_from_timestamp(timestamp: int) -> int:
     return int(f"{service_date.year:04}{service_date.month:02}{service_date.day:02}")
 
 
+def service_date_expr(timestamp: pl.Expr) -> pl.Expr:
+    """
+    polars expression generating YYYYMMDD service dates from a utc datetime
+    expression, see service_date_from_timestamp.
+
+    the hour offset is applied to the boston wall clock time, so that service
+    days stay aligned to local midnight across daylight savings transitions.
+    """
+    service_date = (
+        timestamp.dt.convert_time_zone(BOSTON_TZ_ZONEINFO.key)
+        .dt.replace_time_zone(None)
+        .dt.offset_by(f"-{SERVICE_DATE_END_HOUR}h")
+        .dt.date()
+    )
+    return (
+        service_date.dt.year().cast(pl.Int64) * 10000
+        + service_date.dt.month().cast(pl.Int64) * 100
+        + service_date.dt.day().cast(pl.Int64)
+    )
+
+
+def service_dates_from_timestamps(
+    timestamps: Union[pandas.Series, pl.Series, pyarrow.Array, pyarrow.ChunkedArray],
+) -> Union[pandas.Series, pl.Series, pyarrow.Array]:
+    """
+    vectorized service_date_from_timestamp for pandas, polars and pyarrow
+    columns of unix timestamps in seconds or datetimes. naive datetimes are
+    interpreted as utc. null timestamps have null service dates.
+
+    :return YYYYMMDD service dates in the container type of timestamps
+    """
+    if isinstance(timestamps, pandas.Series):
+        timestamp_series = pl.from_pandas(timestamps)
+    elif isinstance(timestamps, (pyarrow.Array, pyarrow.ChunkedArray)):
+        timestamp_series = pl.Series(pl.from_arrow(timestamps))
+    else:
+        timestamp_series = timestamps
+
+    if isinstance(timestamp_series.dtype, pl.Datetime):
+        if timestamp_series.dtype.time_zone is None:
+            timestamp_series = timestamp_series.dt.replace_time_zone("UTC")
+    else:
+        timestamp_series = pl.from_epoch(timestamp_series.cast(pl.Int64), time_unit="s").dt.replace_time_zone("UTC")
+
+    service_dates = (
+        timestamp_series.to_frame("timestamp")
+        .select(service_date_expr(pl.col("timestamp")))
+        .to_series()
+        .alias(timestamp_series.name)
+    )
+
+    if isinstance(timestamps, pandas.Series):
+        return pandas.Series(
+            service_dates.to_pandas(use_pyarrow_extension_array=True).array,
+            index=timestamps.index,
+            name=timestamps.name,
+            dtype="Int64",
+        )
+    if isinstance(timestamps, (pyarrow.Array, pyarrow.ChunkedArray)):
+        return service_dates.to_arrow()
+    return service_dates
+
+
 def add_missing_service_dates(events_dataframe: pandas.DataFrame, timestamp_key: str) -> pandas.DataFrame:
     """
     # generate the service date from the vehicle timestamp if null
     """
     events_dataframe["service_date"] = events_dataframe["service_date"].where(
         events_dataframe["service_date"].notna(),
-        events_dataframe[timestamp_key].apply(service_date_from_timestamp),
+        service_dates_from_timestamps(events_dataframe[timestamp_key]),
     )
 
     return events_dataframe
@@ -106,7 +232,15 @@ def unique_trip_stop_columns() -> List[str]:
 def static_version_key_from_service_date(service_date: int, db_manager: DatabaseManager) -> int:
     """
     for a given service date, determine the correct static schedule to use
+
+    results are held in STATIC_SCHEDULE_CACHE
     """
+    static_version_key = STATIC_SCHEDULE_CACHE.version_keys.get(service_date)
+    if static_version_key is not None:
+        STATIC_SCHEDULE_CACHE.count(hits=1)
+        return static_version_key
+
+    STATIC_SCHEDULE_CACHE.count(misses=1)
     # the service date must:
     # * be between "feed_start_date" and "feed_end_date" in StaticFeedInfo
     # * be less than or equal to "feed_active_date" in StaticFeedInfo
@@ -156,7 +290,11 @@ def static_version_key_from_service_date(service_date: int, db_manager: Database
     if len(result) == 0:
         raise IndexError(f"StaticFeedInfo table has no matching schedule for service_date={service_date}")
 
-    return int(result[0]["static_version_key"])
+    static_version_key = int(result[0]["static_version_key"])
+    with STATIC_SCHEDULE_CACHE.lock:
+        STATIC_SCHEDULE_CACHE.version_keys[service_date] = static_version_key
+
+    return static_version_key
 
 
 def add_static_version_key_column(
@@ -194,6 +332,7 @@ def add_static_version_key_column(
         service_date_mask = events_dataframe["service_date"] == service_date
         events_dataframe.loc[service_date_mask, "static_version_key"] = static_version_key
 
+    process_logger.add_metadata(**STATIC_SCHEDULE_CACHE.metadata())
     process_logger.log_complete()
 
     return events_dataframe
@@ -225,14 +364,29 @@ def add_parent_station_column(
 
     # unique list of "static_version_key" values for pulling parent stations
     lookup_v_keys = [int(s_v_key) for s_v_key in events_dataframe["static_version_key"].unique()]
-
-    # pull parent station data for joining to events dataframe
-    parent_station_query = sa.select(
-        StaticStops.static_version_key,
-        StaticStops.stop_id,
-        StaticStops.parent_station,
-    ).where(StaticStops.static_version_key.in_(lookup_v_keys))
-    parent_stations = db_manager.select_as_dataframe(parent_station_query)
+    missing_v_keys = [s_v_key for s_v_key in lookup_v_keys if s_v_key not in STATIC_SCHEDULE_CACHE.parent_stations]
+    STATIC_SCHEDULE_CACHE.count(hits=len(lookup_v_keys) - len(missing_v_keys), misses=len(missing_v_keys))
+
+    # pull parent station data for static versions that have not been cached
+    if len(missing_v_keys) > 0:
+        parent_station_query = sa.select(
+            StaticStops.static_version_key,
+            StaticStops.stop_id,
+            StaticStops.parent_station,
+        ).where(StaticStops.static_version_key.in_(missing_v_keys))
+        missing_stations = db_manager.select_as_dataframe(parent_station_query)
+
+        with STATIC_SCHEDULE_CACHE.lock:
+            for s_v_key in missing_v_keys:
+                STATIC_SCHEDULE_CACHE.parent_stations[s_v_key] = missing_stations[
+                    missing_stations["static_version_key"] == s_v_key
+                ]
+
+    parent_stations = pandas.concat(
+        [STATIC_SCHEDULE_CACHE.parent_stations[s_v_key] for s_v_key in lookup_v_keys],
+        ignore_index=True,
+    )
+    process_logger.add_metadata(**STATIC_SCHEDULE_CACHE.metadata())
 
     # join parent stations to events on "stop_id" and "static_version_key" foreign key
     events_dataframe = events_dataframe.merge(parent_stations, how="left", on=["static_version_key", "stop_id"])
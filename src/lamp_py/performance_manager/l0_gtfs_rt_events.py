@@ -1,7 +1,7 @@
 from typing import Dict, List, Tuple
 
-import numpy
 import pandas
+import polars as pl
 import sqlalchemy as sa
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.sql.functions import count
@@ -108,33 +108,17 @@ def combine_events(vp_events: pandas.DataFrame, tu_events: pandas.DataFrame) ->
 
     trip_stop_columns = unique_trip_stop_columns()
 
-    # merge together the trip_stop_columns and the timestamps
-    events = pandas.merge(
-        vp_events[trip_stop_columns + ["vp_stop_timestamp", "vp_move_timestamp"]],
-        tu_events[
-            trip_stop_columns
-            + [
-                "tu_stop_timestamp",
-            ]
-        ],
-        how="outer",
-        on=trip_stop_columns,
-        validate="one_to_one",
-    )
-
-    # concat all of the details that went into each trip event, dropping
-    # duplicates.
     # DRAGONS
     # selection of unique `details_columns` records could have non-deterministic behavior
     #
     # many vehicle position and trip update events have to be aggregated together
     # for each unique trip-stop event record. `details_columns` columns that are
-    # not a part of `trip_stop_columns` are semi-randomly dropped, with the first
-    # column being kept based on a sort-order.
+    # not a part of `trip_stop_columns` are dropped, with the first record being
+    # kept based on a sort-order.
     #
     # currently, the sort-order only takes into account NA values in a few
     # columns to priortize the selection of records from vehicle positions over
-    # trip updates. beyond that, records are essentially dropped at randmon
+    # trip updates. beyond that, the first record in vp then tu order is kept.
     details_columns = [
         "service_date",
         "start_time",
@@ -151,27 +135,53 @@ def combine_events(vp_events: pandas.DataFrame, tu_events: pandas.DataFrame) ->
         "static_version_key",
     ]
 
-    event_details = pandas.concat([vp_events[details_columns], tu_events[details_columns]])
+    vp_frame = pl.from_pandas(vp_events[details_columns + ["vp_stop_timestamp", "vp_move_timestamp"]])
+    tu_frame = pl.from_pandas(tu_events[details_columns + ["tu_stop_timestamp"]])
 
-    # create sort column to indicate which records have null values for select columns
-    # we want to drop these null value records whenever possible
-    # to prioritize records from vehicle_positions
-    event_details["na_sort"] = event_details[["stop_sequence", "vehicle_label", "vehicle_consist"]].isna().sum(axis=1)
+    # timestamps from both sources for each unique trip stop
+    timestamps = vp_frame.select(trip_stop_columns + ["vp_stop_timestamp", "vp_move_timestamp"]).join(
+        tu_frame.select(trip_stop_columns + ["tu_stop_timestamp"]),
+        on=trip_stop_columns,
+        how="full",
+        coalesce=True,
+        nulls_equal=True,
+        validate="1:1",
+    )
 
+    # keep the details record with the fewest null values in select columns,
+    # preferring vehicle positions records
     event_details = (
-        event_details.sort_values(
-            by=trip_stop_columns
-            + [
-                "na_sort",
-            ],
-            ascending=True,
+        pl.concat([vp_frame.select(details_columns), tu_frame.select(details_columns)], how="vertical_relaxed")
+        .with_columns(
+            pl.sum_horizontal(
+                pl.col("stop_sequence", "vehicle_label", "vehicle_consist").is_null().cast(pl.UInt8)
+            ).alias("na_sort")
         )
-        .drop_duplicates(subset=trip_stop_columns, keep="first")
-        .drop(columns="na_sort")
+        .sort("na_sort", maintain_order=True)
+        .unique(subset=trip_stop_columns, keep="first", maintain_order=True)
+        .drop("na_sort")
     )
 
     # join `details_columns` to df with timestamps
-    events = events.merge(event_details, how="left", on=trip_stop_columns, validate="one_to_one")
+    events_frame = timestamps.join(
+        event_details,
+        on=trip_stop_columns,
+        how="left",
+        nulls_equal=True,
+        validate="1:1",
+    )
+    events = events_frame.to_pandas()
+
+    # restore nullable integer columns that pandas would otherwise hold as
+    # floats, and those that were nullable integers in the source events
+    nullable_columns = {
+        column
+        for column, dtype in list(vp_events.dtypes.items()) + list(tu_events.dtypes.items())
+        if isinstance(dtype, pandas.Int64Dtype)
+    }
+    for column, dtype in events_frame.schema.items():
+        if dtype.is_integer() and (column in nullable_columns or events_frame[column].null_count() > 0):
+            events[column] = events[column].astype("Int64")
 
     process_logger.add_metadata(total_event_count=events.shape[0])
     process_logger.log_complete()
@@ -179,6 +189,69 @@ def combine_events(vp_events: pandas.DataFrame, tu_events: pandas.DataFrame) ->
     return events
 
 
+class TripEventState:
+    """
+    hashes of the combined events of each trip from the last successful
+    processing cycle
+
+    consecutive cycles reprocess overlapping hours of gtfs-rt files, so most
+    trips have the same combined events as in the previous cycle. those trips
+    are already up to date in the database and are dropped before loading
+    temp_event_compare. trips are kept or dropped as a whole, so trip and
+    metrics updates always see all of the events of a changed trip.
+    """
+
+    trip_columns = ["service_date", "route_id", "trip_id"]
+
+    def __init__(self) -> None:
+        self.trip_hashes = pl.DataFrame()
+
+    def clear(self) -> None:
+        """forget all trips, the next cycle will load all events"""
+        self.trip_hashes = pl.DataFrame()
+
+    def changed_trip_events(self, events: pandas.DataFrame) -> Tuple[pandas.DataFrame, pl.DataFrame]:
+        """
+        drop the events of trips that are unchanged since the last cycle
+
+        :return events of new and changed trips, and the trip hashes of all
+            events to pass to update once the events have been processed
+        """
+        events_frame = pl.from_pandas(events).select(
+            pl.col(self.trip_columns),
+            pl.struct(pl.all()).hash(seed=0).sum().over(self.trip_columns, mapping_strategy="join").alias("trip_hash"),
+        )
+        trip_hashes = events_frame.unique(subset=self.trip_columns)
+
+        if self.trip_hashes.height == 0:
+            return (events, trip_hashes)
+
+        changed = (
+            events_frame.join(
+                self.trip_hashes.rename({"trip_hash": "previous_hash"}),
+                on=self.trip_columns,
+                how="left",
+                nulls_equal=True,
+                maintain_order="left",
+            )
+            .select((pl.col("previous_hash").is_null() | (pl.col("previous_hash") != pl.col("trip_hash"))))
+            .to_series()
+            .to_numpy()
+        )
+
+        return (events[changed], trip_hashes)
+
+    def update(self, trip_hashes: pl.DataFrame) -> None:
+        """
+        record trip hashes from changed_trip_events once the events have been
+        written to the database
+        """
+        self.trip_hashes = trip_hashes
+
+
+TRIP_EVENT_STATE = TripEventState()
+
+
 def flag_insert_update_events(db_manager: DatabaseManager) -> Tuple[int, int]:
     """
     update do_update and do_insert flag columns in temp_event_compare table
@@ -278,11 +351,10 @@ def build_temp_events(events: pandas.DataFrame, db_manager: DatabaseManager) ->
     events["vp_move_timestamp"] = events["vp_move_timestamp"].astype("Int64")
     events["vp_stop_timestamp"] = events["vp_stop_timestamp"].astype("Int64")
     events["tu_stop_timestamp"] = events["tu_stop_timestamp"].astype("Int64")
-    events = events.fillna(numpy.nan).replace([numpy.nan], [None])
 
-    # truncate temp_event_compare table and insert all event records
+    # truncate temp_event_compare table and bulk load all event records
     db_manager.truncate_table(TempEventCompare, restart_identity=True)
-    db_manager.execute_with_data(sa.insert(TempEventCompare.__table__), events, disable_trip_tigger=False)
+    db_manager.copy_dataframe(events, TempEventCompare)
 
     # make sure vehicle_trips has trips for all events in temp_event_compare
     load_new_trip_data(db_manager=db_manager)
@@ -492,6 +564,12 @@ def process_gtfs_rt_files(
             events["vp_move_timestamp"] = None
             events["vp_stop_timestamp"] = None
 
+        # only load events of trips that changed since the last cycle
+        trip_hashes = pl.DataFrame()
+        if events.shape[0] > 0:
+            events, trip_hashes = TRIP_EVENT_STATE.changed_trip_events(events)
+            process_logger.add_metadata(changed_event_count=events.shape[0])
+
         # continue events processing if records exist
         if events.shape[0] > 0:
             change_count = build_temp_events(events, rpm_db_manager)
@@ -499,9 +577,11 @@ def process_gtfs_rt_files(
             if change_count > 0:
                 update_events_from_temp(rpm_db_manager)
                 # update trips data in vehicle_trips table
-                process_trips(rpm_db_manager)
-                # update event metrics columns
-                update_metrics_from_temp_events(rpm_db_manager)
+                full_service_dates = process_trips(rpm_db_manager)
+                # update event metrics columns of changed trips
+                update_metrics_from_temp_events(rpm_db_manager, full_service_dates)
+
+        TRIP_EVENT_STATE.update(trip_hashes)
 
         md_db_manager.execute(
             sa.update(MetadataLog.__table__).where(MetadataLog.pk_id.in_(files["ids"])).values(rail_pm_processed=True)
@@ -516,5 +596,5 @@ def process_gtfs_rt_files(
         )
         process_logger.log_failure(error)
 
-    rpm_db_manager.vacuum_analyze(VehicleEvents)
-    rpm_db_manager.vacuum_analyze(VehicleTrips)
+    rpm_db_manager.maintain_table(VehicleEvents)
+    rpm_db_manager.maintain_table(VehicleTrips)
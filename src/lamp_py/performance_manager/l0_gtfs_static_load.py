@@ -28,7 +28,7 @@ from lamp_py.runtime_utils.process_logger import ProcessLogger
 from lamp_py.runtime_utils.infinite_wait import infinite_wait
 from lamp_py.runtime_utils.remote_files import S3_SPRINGBOARD
 
-from .gtfs_utils import start_time_to_seconds
+from .gtfs_utils import STATIC_SCHEDULE_CACHE, start_time_to_seconds
 
 from .l0_gtfs_static_mod import modify_static_tables
 
@@ -452,6 +452,9 @@ def process_static_tables(
             insert_data_tables(static_tables, static_version_key, rpm_db_manager)
             modify_static_tables(static_version_key, rpm_db_manager)
 
+            # a new static version can change lookups for loaded service dates
+            STATIC_SCHEDULE_CACHE.clear()
+
             update_md_log = (
                 sa.update(MetadataLog.__table__).where(MetadataLog.pk_id.in_(ids)).values(rail_pm_processed=True)
             )
@@ -1,10 +1,10 @@
-from typing import Iterator, List, Union
+from typing import List, Union
 import time
 
-import numpy
 import pandas
+import polars as pl
 import pyarrow.compute as pc
-from lamp_py.aws.s3 import read_parquet_chunks
+from lamp_py.aws.s3 import scan_parquet
 from lamp_py.postgres.postgres_utils import DatabaseManager
 from lamp_py.runtime_utils.process_logger import ProcessLogger
 
@@ -13,15 +13,15 @@ from .gtfs_utils import (
     add_parent_station_column,
     add_static_version_key_column,
     rail_routes_from_filepath,
-    start_time_to_seconds,
+    start_time_seconds_expr,
     unique_trip_stop_columns,
 )
 
 
-def get_tu_dataframe_chunks(to_load: Union[str, List[str]], route_ids: List[str]) -> Iterator[pandas.DataFrame]:
+def get_tu_lazyframe(to_load: Union[str, List[str]], route_ids: List[str]) -> pl.LazyFrame:
     """
-    return interator of dataframe chunks from a trip updates parquet file
-    (or list of files)
+    return lazy frame of trip update records from a trip updates parquet file
+    (or list of files), with rail route filters pushed down to the parquet scan
     """
     trip_update_columns = [
         "feed_timestamp",
@@ -43,14 +43,7 @@ def get_tu_dataframe_chunks(to_load: Union[str, List[str]], route_ids: List[str]
         & (pc.field("trip_update.stop_time_update.arrival.time") > 0)
     )
 
-    # 100_000 batch size should result in ~5-6 GB of memory use per batch
-    # of trip update records
-    return read_parquet_chunks(
-        to_load,
-        max_rows=1_000_000,
-        columns=trip_update_columns,
-        filters=trip_update_filters,
-    )
+    return scan_parquet(to_load, filters=trip_update_filters).select(trip_update_columns)
 
 
 def get_and_unwrap_tu_dataframe(paths: Union[str, List[str]], route_ids: List[str]) -> pandas.DataFrame:
@@ -61,55 +54,41 @@ def get_and_unwrap_tu_dataframe(paths: Union[str, List[str]], route_ids: List[st
     process_logger = ProcessLogger("tu.get_and_unwrap_dataframe")
     process_logger.log_start()
 
-    trip_updates = pandas.DataFrame()
-
-    rename_mapper = {
-        "trip_update.timestamp": "timestamp",
-        "trip_update.stop_time_update.stop_id": "stop_id",
-        "trip_update.stop_time_update.arrival.time": "tu_stop_timestamp",
-        "trip_update.trip.direction_id": "direction_id",
-        "trip_update.trip.route_id": "route_id",
-        "trip_update.trip.start_date": "start_date",
-        "trip_update.trip.start_time": "start_time",
-        "trip_update.vehicle.id": "vehicle_id",
-        "trip_update.trip.trip_id": "trip_id",
-    }
+    # use feed_timestamp if timestamp value is null
+    timestamp = pl.coalesce(
+        pl.col("trip_update.timestamp").cast(pl.Int64),
+        pl.col("feed_timestamp").cast(pl.Int64),
+    )
+    tu_stop_timestamp = pl.col("trip_update.stop_time_update.arrival.time").cast(pl.Int64)
 
     retry_attempts = 2
     for retry_attempt in range(retry_attempts + 1):
         try:
             process_logger.add_metadata(retry_attempts=retry_attempt)
-            for batch_events in get_tu_dataframe_chunks(paths, route_ids):
-                # rename columns from trip update parquet schema
-                batch_events = batch_events.rename(columns=rename_mapper)
-                # use feed_timestamp if timestamp value is null
-                batch_events["timestamp"] = batch_events["timestamp"].where(
-                    batch_events["timestamp"].notna(),
-                    batch_events["feed_timestamp"],
-                )
-                batch_events = batch_events.drop(columns=["feed_timestamp"])
-
-                # store start_date as int64 and rename to service_date
-                batch_events.rename(columns={"start_date": "service_date"}, inplace=True)
-                batch_events["service_date"] = pandas.to_numeric(batch_events["service_date"]).astype("Int64")
-
-                # store direction_id as bool
-                batch_events["direction_id"] = pandas.to_numeric(batch_events["direction_id"]).astype(numpy.bool_)
-
-                # store start_time as seconds from start of day int64
-                batch_events["start_time"] = batch_events["start_time"].apply(start_time_to_seconds).astype("Int64")
-
-                batch_events["tu_stop_timestamp"] = pandas.to_numeric(batch_events["tu_stop_timestamp"]).astype("Int64")
-
+            trip_updates = (
+                get_tu_lazyframe(paths, route_ids)
                 # filter out stop event predictions that are too far into the future
                 # and are unlikely to be used as a final stop event prediction
                 # (2 minutes) or predictions that go into the past (negative values)
-                batch_events = batch_events[
-                    (batch_events["tu_stop_timestamp"] - batch_events["timestamp"] >= 0)
-                    & (batch_events["tu_stop_timestamp"] - batch_events["timestamp"] < 120)
-                ]
-
-                trip_updates = pandas.concat([trip_updates, batch_events])
+                .filter(
+                    (tu_stop_timestamp - timestamp >= 0) & (tu_stop_timestamp - timestamp < 120),
+                )
+                .select(
+                    timestamp.alias("timestamp"),
+                    pl.col("trip_update.stop_time_update.stop_id").alias("stop_id"),
+                    tu_stop_timestamp.alias("tu_stop_timestamp"),
+                    # store direction_id as bool
+                    pl.col("trip_update.trip.direction_id").cast(pl.Boolean).alias("direction_id"),
+                    pl.col("trip_update.trip.route_id").alias("route_id"),
+                    # store start_date as int64 and rename to service_date
+                    pl.col("trip_update.trip.start_date").cast(pl.Int64).alias("service_date"),
+                    # store start_time as seconds from start of day int64
+                    start_time_seconds_expr(pl.col("trip_update.trip.start_time")).alias("start_time"),
+                    pl.col("trip_update.vehicle.id").alias("vehicle_id"),
+                    pl.col("trip_update.trip.trip_id").alias("trip_id"),
+                )
+                .collect()
+            )
             break
         except Exception as exception:
             if retry_attempt == retry_attempts:
@@ -117,10 +96,15 @@ def get_and_unwrap_tu_dataframe(paths: Union[str, List[str]], route_ids: List[st
                 raise exception
             time.sleep(1)
 
-    process_logger.add_metadata(row_count=trip_updates.shape[0])
+    process_logger.add_metadata(row_count=trip_updates.height)
+
+    trip_updates_df = trip_updates.to_pandas()
+    for column in ("service_date", "start_time", "tu_stop_timestamp"):
+        trip_updates_df[column] = trip_updates_df[column].astype("Int64")
+
     process_logger.log_complete()
 
-    return trip_updates
+    return trip_updates_df
 
 
 def reduce_trip_updates(trip_updates: pandas.DataFrame) -> pandas.DataFrame:
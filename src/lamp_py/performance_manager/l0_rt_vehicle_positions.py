@@ -1,9 +1,10 @@
-from typing import List, Union, Dict, Tuple
+from typing import List, Union
 
 import numpy
 import pandas
+import polars as pl
 import pyarrow.compute as pc
-from lamp_py.aws.s3 import read_parquet
+from lamp_py.aws.s3 import scan_parquet
 from lamp_py.postgres.postgres_utils import DatabaseManager
 from lamp_py.runtime_utils.process_logger import ProcessLogger
 
@@ -17,6 +18,19 @@ from .gtfs_utils import (
 )
 
 
+def consist_labels_expr(column: str, dtype: pl.DataType) -> pl.Expr:
+    """
+    polars expression changing a list of carriage structs column into a pipe
+    delimited string of carriage labels
+    """
+    if isinstance(dtype, pl.List):
+        return pl.col(column).list.eval(pl.element().struct.field("label").cast(pl.String)).list.join("|")
+
+    # column is already a string, or is all null, e.g. files from before
+    # multi_carriage_details was added
+    return pl.col(column).cast(pl.String)
+
+
 def get_vp_dataframe(to_load: Union[str, List[str]], route_ids: List[str]) -> pandas.DataFrame:
     """
     return a dataframe from a vehicle position parquet file (or list of files)
@@ -71,13 +85,23 @@ def get_vp_dataframe(to_load: Union[str, List[str]], route_ids: List[str]) -> pa
         "vehicle.multi_carriage_details": "multi_carriage_details",
     }
 
-    result = read_parquet(
-        to_load,
-        columns=vehicle_position_cols,
-        filters=vehicle_position_filters,
-    )
+    vehicle_positions = scan_parquet(to_load, filters=vehicle_position_filters)
+    schema = vehicle_positions.collect_schema()
+
+    # change vehicle_consist and multi_carriage_details to pipe delimited
+    # strings while reading, so carriage lists are never held as python objects.
+    # columns missing from the parquet files are added as all nulls, e.g.
+    # vehicle.trip.revenue from VehiclePosition files starting december 2023
+    select_columns = []
+    for column in vehicle_position_cols:
+        if column not in schema:
+            select_columns.append(pl.lit(None).alias(rename_mapper[column]))
+        elif column in ("vehicle.vehicle.consist", "vehicle.multi_carriage_details"):
+            select_columns.append(consist_labels_expr(column, schema[column]).alias(rename_mapper[column]))
+        else:
+            select_columns.append(pl.col(column).alias(rename_mapper[column]))
 
-    result = result.rename(columns=rename_mapper)
+    result = vehicle_positions.select(select_columns).collect().to_pandas()
 
     process_logger.add_metadata(row_count=result.shape[0])
     process_logger.log_complete()
@@ -140,67 +164,49 @@ def transform_vp_timestamps(
 
     trip_stop_columns = unique_trip_stop_columns()
 
-    # create a pivot table on unique trip-stop events, finding the earliest time
-    # that each vehicle/stop pair is and is not moving. rename the vehicle
-    # timestamps to vp_stop_timestamp and vp_move_timestamp, the names used
-    # in the database
-    vp_timestamps = pandas.pivot_table(
-        vehicle_positions,
-        index=trip_stop_columns,
-        columns="is_moving",
-        aggfunc={"vehicle_timestamp": "min"},
-    ).reset_index(drop=False)
-
-    rename_mapper: Dict[Tuple[str, Union[str, bool]], str] = {(column, ""): column for column in trip_stop_columns}
-    rename_mapper.update({("vehicle_timestamp", True): "vp_move_timestamp"})
-    rename_mapper.update({("vehicle_timestamp", False): "vp_stop_timestamp"})
-
-    vp_timestamps.columns = vp_timestamps.columns.to_flat_index()
-    vp_timestamps = vp_timestamps.rename(columns=rename_mapper)
-    # verify timestamp columns were created
-    for column in ("vp_stop_timestamp", "vp_move_timestamp"):
-        if column not in vp_timestamps.columns:
-            vp_timestamps[column] = None
+    # records missing a trip-stop column can not be assigned to an event
+    vp_frame = pl.from_pandas(vehicle_positions).drop_nulls(subset=trip_stop_columns)
+
+    # find the earliest time that each vehicle/stop pair is and is not moving.
+    # name the vehicle timestamps vp_stop_timestamp and vp_move_timestamp, the
+    # names used in the database
+    vp_timestamps = vp_frame.group_by(trip_stop_columns).agg(
+        pl.col("vehicle_timestamp").filter(~pl.col("is_moving")).min().cast(pl.Int64).alias("vp_stop_timestamp"),
+        pl.col("vehicle_timestamp").filter(pl.col("is_moving")).min().cast(pl.Int64).alias("vp_move_timestamp"),
+    )
 
     # we no longer need is moving or vehicle timestamp as those are all
     # stored in the vp_timestamps dataframe. drop duplicated trip-stop events
-    vehicle_positions = vehicle_positions.drop(columns=["is_moving", "vehicle_timestamp"]).drop_duplicates(
-        subset=trip_stop_columns
+    vp_details = vp_frame.drop("is_moving", "vehicle_timestamp").unique(
+        subset=trip_stop_columns, keep="first", maintain_order=True
     )
 
     # join the timestamps to trip-stop details, leaving us with vp move and
-    # stop times
-    vehicle_positions = pandas.merge(
-        vp_timestamps,
-        vehicle_positions,
-        how="left",
-        on=trip_stop_columns,
-        validate="one_to_one",
-    )
-
-    vehicle_positions["vp_move_timestamp"] = vehicle_positions["vp_move_timestamp"].astype("Int64")
-    vehicle_positions["vp_stop_timestamp"] = vehicle_positions["vp_stop_timestamp"].astype("Int64")
-
-    # change vehicle_consist to pipe delimited string
-    vehicle_positions["vehicle_consist"] = vehicle_positions["vehicle_consist"].map(
-        lambda vc: "|".join(str(vc_val["label"]) for vc_val in vc),
-        na_action="ignore",
+    # stop times. coalesce vehicle_consist with multi_carriage_details, as pipe
+    # delimited strings.
+    # vehicle_consist dropped from RT_VEHICLE_POSITIONS feed on 2024-03-05
+    vp_events = (
+        vp_timestamps.sort(trip_stop_columns)
+        .join(vp_details, on=trip_stop_columns, how="left", validate="1:1")
+        .with_columns(
+            pl.coalesce(
+                consist_labels_expr("vehicle_consist", vp_details.schema["vehicle_consist"]),
+                consist_labels_expr("multi_carriage_details", vp_details.schema["multi_carriage_details"]),
+            ).alias("vehicle_consist"),
+        )
+        .drop("multi_carriage_details")
     )
 
-    # change multi_carriage_details to pipe delimited string
-    vehicle_positions["multi_carriage_details"] = vehicle_positions["multi_carriage_details"].map(
-        lambda vc: "|".join(str(vc_val["label"]) for vc_val in vc),
-        na_action="ignore",
-    )
+    # restore nullable integer columns that pandas would otherwise hold as
+    # floats, and those that were nullable integers in the source positions
+    nullable_columns = {"vp_move_timestamp", "vp_stop_timestamp"} | {
+        str(column) for column, dtype in vehicle_positions.dtypes.items() if isinstance(dtype, pandas.Int64Dtype)
+    }
 
-    # coalesce vehicle_consist with multi_carriage_details.
-    # vehicle_consist dropped from RT_VEHICLE_POSITIONS feed on 2024-03-05
-    vehicle_positions["vehicle_consist"] = numpy.where(
-        vehicle_positions["vehicle_consist"].isnull(),
-        vehicle_positions["multi_carriage_details"],
-        vehicle_positions["vehicle_consist"],
-    )
-    vehicle_positions = vehicle_positions.drop(columns=["multi_carriage_details"])
+    vehicle_positions = vp_events.to_pandas()
+    for column, dtype in vp_events.schema.items():
+        if dtype.is_integer() and (column in nullable_columns or vp_events[column].null_count() > 0):
+            vehicle_positions[column] = vehicle_positions[column].astype("Int64")
 
     process_logger.add_metadata(after_row_count=vehicle_positions.shape[0])
     process_logger.log_complete()
@@ -1,5 +1,7 @@
 from datetime import datetime
 import os
+from typing import Optional
+
 import sqlalchemy as sa
 import polars as pl
 from sqlalchemy.sql.functions import rank
@@ -11,6 +13,7 @@ from lamp_py.postgres.rail_performance_manager_schema import (
     VehicleEvents,
     VehicleTrips,
     StaticRoutes,
+    TempEventCompare,
 )
 
 GTFS_ARCHIVE = "s3://mbta-performance/lamp/gtfs_archive"
@@ -112,8 +115,8 @@ def static_trips_subquery_pl(service_date: int) -> pl.DataFrame:
     #
     # static_trips columns are set to the same datatypes/schema as the database
     # representation for these columns this is not strictly necessary, as the call
-    # to execute_with_data_pl() calls polars.to_dicts(), which converts everything
-    # to native python types (Int16, Int32 --> Int) before updating the database.
+    # to update_dataframe() loads everything as csv text into a staging table with
+    # the database column types before updating the database.
     # We choose to maintain the correct types here to ensure overflows or other
     # dtype issues can be discovered in the python processing
 
@@ -262,7 +265,58 @@ def static_trips_subquery(static_version_key: int, service_date: int) -> sa.sql.
     )
 
 
-def rt_trips_subquery(service_date: int) -> sa.sql.selectable.Subquery:
+def dirty_trips_filter(service_date: int) -> sa.sql.ColumnElement:
+    """
+    return filter limiting VehicleTrips to trips with events in temp_event_compare
+    on a given service date
+
+    these are the only trips with vehicle_events or vehicle_trips records changed
+    during an event loop
+    """
+    dirty_trips = (
+        sa.select(TempEventCompare.pm_trip_id)
+        .distinct()
+        .where(
+            TempEventCompare.service_date == int(service_date),
+            TempEventCompare.pm_trip_id.is_not(None),
+        )
+    )
+    return VehicleTrips.pm_trip_id.in_(dirty_trips)
+
+
+def dirty_route_directions_filter(service_date: int) -> sa.sql.ColumnElement:
+    """
+    return filter limiting VehicleTrips to trunk route and direction combinations
+    of trips with events in temp_event_compare on a given service date
+
+    headways are calculated across trips, so a changed trip can change the headways
+    of neighboring trips on the same trunk or branch route and direction
+
+    combinations are those of the trips after process_trips. route_id and
+    direction_id of a trip do not change, service dates with trips moved to a
+    new trunk_route_id are recomputed in full instead
+    """
+    dirty_route_directions = (
+        sa.select(
+            sa.func.coalesce(VehicleTrips.trunk_route_id, VehicleTrips.route_id),
+            VehicleTrips.direction_id,
+        )
+        .distinct()
+        .where(
+            VehicleTrips.service_date == int(service_date),
+            dirty_trips_filter(service_date),
+        )
+    )
+    return sa.tuple_(
+        sa.func.coalesce(VehicleTrips.trunk_route_id, VehicleTrips.route_id),
+        VehicleTrips.direction_id,
+    ).in_(dirty_route_directions)
+
+
+def rt_trips_subquery(
+    service_date: int,
+    trip_filter: Optional[sa.sql.ColumnElement] = None,
+) -> sa.sql.selectable.Subquery:
     """
     return Selectable representing all RT trips on a given service date
 
@@ -270,9 +324,11 @@ def rt_trips_subquery(service_date: int) -> sa.sql.selectable.Subquery:
         - rt_trip_first_stop_flag (bool indicating first stop of trip by trip_hash)
         - rt_trip_last_stop_flag (bool indicating last stop of trip by trip_hash)
         - static_stop_rank (rank field counting from 1 to N number of stops on trip by trip_hash)
+
+    :param trip_filter optional VehicleTrips filter, e.g. dirty_trips_filter, to limit returned trips
     """
 
-    return (
+    rt_trips = (
         sa.select(
             VehicleTrips.static_version_key,
             VehicleTrips.direction_id,
@@ -327,10 +383,19 @@ def rt_trips_subquery(service_date: int) -> sa.sql.selectable.Subquery:
                 VehicleEvents.vp_stop_timestamp.is_not(None),
             ),
         )
-    ).subquery(name="rt_trips_sub")
+    )
+
+    if trip_filter is not None:
+        rt_trips = rt_trips.where(trip_filter)
+
+    return rt_trips.subquery(name="rt_trips_sub")
 
 
-def trips_for_metrics_subquery(static_version_key: int, service_date: int) -> sa.sql.selectable.Subquery:
+def trips_for_metrics_subquery(
+    static_version_key: int,
+    service_date: int,
+    trip_filter: Optional[sa.sql.ColumnElement] = None,
+) -> sa.sql.selectable.Subquery:
     """
     return Selectable named "trips_for_metrics" with fields needed to develop metrics tables
 
@@ -341,10 +406,12 @@ def trips_for_metrics_subquery(static_version_key: int, service_date: int) -> sa
     the join with static_stop_rank is required for routes that may visit the same
     parent station more than once on the same route, I think this only occurs on
     bus routes, so we may be able to drop this for performance_manager
+
+    :param trip_filter optional VehicleTrips filter passed to rt_trips_subquery
     """
 
     static_trips_sub = static_trips_subquery(static_version_key, service_date)
-    rt_trips_sub = rt_trips_subquery(service_date)
+    rt_trips_sub = rt_trips_subquery(service_date, trip_filter)
 
     return (
         sa.select(
@@ -405,14 +472,17 @@ def trips_for_metrics_subquery(static_version_key: int, service_date: int) -> sa
 
 def trips_for_headways_subquery(
     service_date: int,
+    trip_filter: Optional[sa.sql.ColumnElement] = None,
 ) -> sa.sql.selectable.Subquery:
     """
     return Selectable named "trip_for_headways" with fields needed to develop headways values
 
     will return one record for every unique trip-stop on 'service_date'
+
+    :param trip_filter optional VehicleTrips filter passed to rt_trips_subquery
     """
 
-    rt_trips_sub = rt_trips_subquery(service_date)
+    rt_trips_sub = rt_trips_subquery(service_date, trip_filter)
 
     return (
         sa.select(
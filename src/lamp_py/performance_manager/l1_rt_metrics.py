@@ -1,3 +1,5 @@
+from typing import Optional, Set
+
 import sqlalchemy as sa
 
 from lamp_py.postgres.postgres_utils import DatabaseManager
@@ -7,6 +9,8 @@ from lamp_py.postgres.rail_performance_manager_schema import (
 )
 from lamp_py.runtime_utils.process_logger import ProcessLogger
 from .l1_cte_statements import (
+    dirty_route_directions_filter,
+    dirty_trips_filter,
     trips_for_metrics_subquery,
     trips_for_headways_subquery,
 )
@@ -18,18 +22,34 @@ def update_metrics_columns(
     db_manager: DatabaseManager,
     seed_service_date: int,
     static_version_key: int,
+    full_recompute: bool = True,
 ) -> None:
     """
     update metrics columns in vehicle_events table for seed_service_date, static_version_key combination
 
+    :param full_recompute if False, travel and dwell times are only calculated for trips
+    in temp_event_compare and headways are only calculated for the route and direction
+    combinations of those trips
     """
 
-    process_logger = ProcessLogger("l1_rt_metrics_table_loader")
+    process_logger = ProcessLogger(
+        "l1_rt_metrics_table_loader",
+        service_date=seed_service_date,
+        static_version_key=static_version_key,
+        full_recompute=full_recompute,
+    )
     process_logger.log_start()
 
-    trips_for_metrics = trips_for_metrics_subquery(static_version_key, seed_service_date)
+    metrics_filter = None
+    headways_filter = None
+    if not full_recompute:
+        metrics_filter = dirty_trips_filter(seed_service_date)
+        headways_filter = dirty_route_directions_filter(seed_service_date)
+
+    trips_for_metrics = trips_for_metrics_subquery(static_version_key, seed_service_date, metrics_filter)
     trips_for_headways = trips_for_headways_subquery(
         service_date=seed_service_date,
+        trip_filter=headways_filter,
     )
 
     # travel_times calculation:
@@ -46,6 +66,9 @@ def update_metrics_columns(
             trips_for_metrics.c.stop_timestamp.is_not(None),
             trips_for_metrics.c.move_timestamp.is_not(None),
             trips_for_metrics.c.stop_timestamp > trips_for_metrics.c.move_timestamp,
+            VehicleEvents.travel_time_seconds.is_distinct_from(
+                trips_for_metrics.c.stop_timestamp - trips_for_metrics.c.move_timestamp
+            ),
         )
     )
 
@@ -99,10 +122,15 @@ def update_metrics_columns(
             VehicleEvents.parent_station == t_dwell_times_sub.c.parent_station,
             t_dwell_times_sub.c.dwell_time_seconds.is_not(None),
             t_dwell_times_sub.c.dwell_time_seconds > 0,
+            VehicleEvents.dwell_time_seconds.is_distinct_from(t_dwell_times_sub.c.dwell_time_seconds),
         )
     )
     db_manager.execute(update_dwell_times)
 
+    # only rows with changed values are written, so when limited to the route
+    # and direction combinations of changed trips, headways are only written
+    # for the changed trips and their neighbors
+    #
     # this headways calculation is incomplete
     #
     # trunk and branch headways are the same except for one is partitioned on
@@ -147,6 +175,7 @@ def update_metrics_columns(
             VehicleEvents.parent_station == t_headways_branch_sub.c.parent_station,
             t_headways_branch_sub.c.headway_branch_seconds.is_not(None),
             t_headways_branch_sub.c.headway_branch_seconds > 0,
+            VehicleEvents.headway_branch_seconds.is_distinct_from(t_headways_branch_sub.c.headway_branch_seconds),
         )
     )
     db_manager.execute(update_branch_headways)
@@ -188,6 +217,7 @@ def update_metrics_columns(
             VehicleEvents.parent_station == t_headways_trunk_sub.c.parent_station,
             t_headways_trunk_sub.c.headway_trunk_seconds.is_not(None),
             t_headways_trunk_sub.c.headway_trunk_seconds > 0,
+            VehicleEvents.headway_trunk_seconds.is_distinct_from(t_headways_trunk_sub.c.headway_trunk_seconds),
         )
     )
     db_manager.execute(update_trunk_headways)
@@ -198,11 +228,23 @@ def update_metrics_columns(
 # pylint: enable=R0914
 
 
-def update_metrics_from_temp_events(db_manager: DatabaseManager) -> None:
+def update_metrics_from_temp_events(
+    db_manager: DatabaseManager,
+    full_service_dates: Optional[Set[int]] = None,
+) -> None:
     """
     update daily metrics values for service_date, static_version_key combos in
     temp_event_compare table
+
+    metrics are only recalculated for trips changed in temp_event_compare, and
+    their neighbors, unless the service date is in full_service_dates
+
+    :param full_service_dates service dates where all trips have changed, e.g. a
+    new static_version_key was applied to the service date
     """
+    if full_service_dates is None:
+        full_service_dates = set()
+
     service_date_query = sa.select(
         TempEventCompare.service_date,
         TempEventCompare.static_version_key,
@@ -215,4 +257,5 @@ def update_metrics_from_temp_events(db_manager: DatabaseManager) -> None:
             db_manager=db_manager,
             seed_service_date=service_date,
             static_version_key=static_version_key,
+            full_recompute=service_date in full_service_dates,
         )
@@ -1,10 +1,11 @@
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Set
 
 import pandas
 import sqlalchemy as sa
 import polars as pl
 from sqlalchemy.dialects import postgresql
-from sqlalchemy.sql.expression import bindparam
 from sqlalchemy.sql.functions import count
 
 
@@ -196,9 +197,11 @@ def load_new_trip_data(db_manager: DatabaseManager) -> None:
     process_logger.log_complete()
 
 
-def update_static_version_key(db_manager: DatabaseManager) -> None:
+def update_static_version_key(db_manager: DatabaseManager) -> Set[int]:
     """
     Update static_version_key so each day only uses one key
+
+    :return service dates with trips that were assigned a new static_version_key
     """
     version_key_sub = (
         sa.select(
@@ -211,6 +214,18 @@ def update_static_version_key(db_manager: DatabaseManager) -> None:
         .subquery("update_version_key")
     )
 
+    changed_dates_query = (
+        sa.select(VehicleTrips.service_date)
+        .distinct()
+        .join(
+            version_key_sub,
+            VehicleTrips.service_date == version_key_sub.c.service_date,
+        )
+        .where(
+            VehicleTrips.static_version_key != version_key_sub.c.max_version_key,
+        )
+    )
+
     update_query = (
         sa.update(VehicleTrips.__table__)
         .values(
@@ -218,14 +233,20 @@ def update_static_version_key(db_manager: DatabaseManager) -> None:
         )
         .where(
             VehicleTrips.service_date == version_key_sub.c.service_date,
+            VehicleTrips.static_version_key != version_key_sub.c.max_version_key,
         )
     )
 
     process_logger = ProcessLogger("l1_trips.update_static_version_key")
     process_logger.log_start()
-    db_manager.execute(update_query, disable_trip_tigger=True)
+    changed_dates = {int(record["service_date"]) for record in db_manager.select_as_list(changed_dates_query)}
+    if changed_dates:
+        db_manager.execute(update_query, disable_trip_tigger=True)
+    process_logger.add_metadata(changed_service_dates=len(changed_dates))
     process_logger.log_complete()
 
+    return changed_dates
+
 
 def update_start_times(db_manager: DatabaseManager) -> None:
     """
@@ -289,7 +310,7 @@ def update_start_times(db_manager: DatabaseManager) -> None:
     # a binding.
     unscheduled_start_times = db_manager.select_as_dataframe(
         sa.select(
-            VehicleEvents.pm_trip_id.label("b_pm_trip_id"),
+            VehicleEvents.pm_trip_id,
             # we are choosing to define added trip start times as the time when
             # the train departs the first station. on occasion, a trip will not
             # have a move time. in those cases, use the earliest stop time.
@@ -297,7 +318,7 @@ def update_start_times(db_manager: DatabaseManager) -> None:
                 sa.func.min(VehicleEvents.vp_move_timestamp),
                 sa.func.min(VehicleEvents.vp_stop_timestamp),
                 sa.func.min(VehicleEvents.tu_stop_timestamp),
-            ).label("b_start_time"),
+            ).label("start_time"),
         )
         .select_from(VehicleEvents)
         .join(
@@ -310,25 +331,18 @@ def update_start_times(db_manager: DatabaseManager) -> None:
     )
 
     if unscheduled_start_times.shape[0] > 0:
-        unscheduled_start_times["b_start_time"] = (
-            unscheduled_start_times["b_start_time"].apply(start_timestamp_to_seconds).astype("int64")
-        )
-
-        start_times_update_query = (
-            sa.update(VehicleTrips.__table__)
-            .where(VehicleTrips.pm_trip_id == bindparam("b_pm_trip_id"))
-            .values(start_time=bindparam("b_start_time"))
+        unscheduled_start_times["start_time"] = (
+            unscheduled_start_times["start_time"].apply(start_timestamp_to_seconds).astype("int64")
         )
 
-        db_manager.execute_with_data(
-            start_times_update_query,
-            unscheduled_start_times,
-        )
+        db_manager.update_dataframe(unscheduled_start_times, VehicleTrips, key_columns=["pm_trip_id"])
 
 
-def update_branch_trunk_route_id(db_manager: DatabaseManager) -> None:
+def update_branch_trunk_route_id(db_manager: DatabaseManager) -> Set[int]:
     """
     update `branch_route_id` and `trunk_route_id` fields in trips table
+
+    :return service dates with trips that were moved to a new trunk_route_id
     """
     distinct_t_trips = (
         sa.select(TempEventCompare.service_date, TempEventCompare.pm_trip_id).distinct().subquery("distinct_trips")
@@ -336,6 +350,7 @@ def update_branch_trunk_route_id(db_manager: DatabaseManager) -> None:
 
     distinct_trips = (
         sa.select(
+            VehicleTrips.service_date,
             VehicleTrips.pm_trip_id,
             VehicleTrips.route_id,
             VehicleTrips.branch_route_id,
@@ -427,35 +442,29 @@ def update_branch_trunk_route_id(db_manager: DatabaseManager) -> None:
             return get_red_branch(record["pm_trip_id"])
         return None
 
+    previous_trunk_route_id = trips_df["trunk_route_id"]
     trips_df["trunk_route_id"] = trips_df["route_id"].map(map_trunk_route_id)
     trips_df["branch_route_id"] = trips_df.apply(apply_branch_route_id, axis=1)
 
+    # headways of the previous trunk route of moved trips are only updated if
+    # their service dates are recomputed in full
+    moved_trips = previous_trunk_route_id.notna() & (previous_trunk_route_id != trips_df["trunk_route_id"])
+    moved_dates = {int(service_date) for service_date in trips_df.loc[moved_trips, "service_date"]}
+
     trips_df = trips_df[
         [
             "pm_trip_id",
             "branch_route_id",
             "trunk_route_id",
         ]
-    ].rename(
-        columns={
-            "pm_trip_id": "b_pm_trip_id",
-            "branch_route_id": "b_branch_route_id",
-            "trunk_route_id": "b_trunk_route_id",
-        }
-    )
-
-    start_times_update_query = (
-        sa.update(VehicleTrips.__table__)
-        .where(VehicleTrips.pm_trip_id == bindparam("b_pm_trip_id"))
-        .values(
-            branch_route_id=bindparam("b_branch_route_id"),
-            trunk_route_id=bindparam("b_trunk_route_id"),
-        )
-    )
+    ]
 
-    db_manager.execute_with_data(start_times_update_query, trips_df)
+    db_manager.update_dataframe(trips_df, VehicleTrips, key_columns=["pm_trip_id"])
+    process_logger.add_metadata(moved_service_dates=len(moved_dates))
     process_logger.log_complete()
 
+    return moved_dates
+
 
 def update_trip_stop_counts(db_manager: DatabaseManager) -> None:
     """
@@ -627,295 +636,287 @@ def update_directions(db_manager: DatabaseManager) -> None:
     process_logger.log_complete()
 
 
-def update_stop_sequence(db_manager: DatabaseManager) -> None:
+def update_stop_sequence(db_manager: DatabaseManager, service_date: int, static_version_key: int) -> None:
     """
-    Update canonical_stop_sequence  and sync_stop_sequence from static_route_patterns
+    Update canonical_stop_sequence and sync_stop_sequence from static_route_patterns
+    for events of a service_date
     """
     # select canonical trip_id for each trip_pattern and direction combination
     # this will first select any representative_trip_id where the route_pattern_typicality = 5
     # and then fall back to where the route_pattern_typicality = 1
-    distinct_query = (
-        sa.select(VehicleTrips.service_date, VehicleTrips.static_version_key)
-        .distinct()
+    canon_trips = (
+        sa.select(
+            StaticRoutePatterns.direction_id,
+            StaticRoutePatterns.representative_trip_id,
+            StaticTrips.trunk_route_id,
+            sa.func.coalesce(StaticTrips.branch_route_id, StaticTrips.trunk_route_id).label("route_id"),
+            StaticRoutePatterns.static_version_key,
+        )
+        .distinct(
+            sa.func.coalesce(StaticTrips.branch_route_id, StaticTrips.trunk_route_id),
+            StaticRoutePatterns.direction_id,
+            StaticRoutePatterns.static_version_key,
+        )
+        .select_from(StaticRoutePatterns)
         .join(
-            TempEventCompare,
-            VehicleTrips.pm_trip_id == TempEventCompare.pm_trip_id,
+            StaticTrips,
+            sa.and_(
+                StaticRoutePatterns.representative_trip_id == StaticTrips.trip_id,
+                StaticRoutePatterns.static_version_key == StaticTrips.static_version_key,
+            ),
+        )
+        .where(
+            StaticRoutePatterns.static_version_key == static_version_key,
+            sa.or_(
+                StaticRoutePatterns.route_pattern_typicality == 1,
+                StaticRoutePatterns.route_pattern_typicality == 5,
+            ),
+        )
+        .order_by(
+            sa.func.coalesce(StaticTrips.branch_route_id, StaticTrips.trunk_route_id),
+            StaticRoutePatterns.direction_id,
+            StaticRoutePatterns.static_version_key,
+            StaticRoutePatterns.route_pattern_typicality.desc(),
         )
+        .subquery("canon_trips")
     )
-    for record in db_manager.select_as_list(distinct_query):
-        canon_trips = (
-            sa.select(
-                StaticRoutePatterns.direction_id,
-                StaticRoutePatterns.representative_trip_id,
-                StaticTrips.trunk_route_id,
-                sa.func.coalesce(StaticTrips.branch_route_id, StaticTrips.trunk_route_id).label("route_id"),
-                StaticRoutePatterns.static_version_key,
-            )
-            .distinct(
-                sa.func.coalesce(StaticTrips.branch_route_id, StaticTrips.trunk_route_id),
-                StaticRoutePatterns.direction_id,
-                StaticRoutePatterns.static_version_key,
-            )
-            .select_from(StaticRoutePatterns)
-            .join(
-                StaticTrips,
-                sa.and_(
-                    StaticRoutePatterns.representative_trip_id == StaticTrips.trip_id,
-                    StaticRoutePatterns.static_version_key == StaticTrips.static_version_key,
-                ),
-            )
-            .where(
-                StaticRoutePatterns.static_version_key == record["static_version_key"],
-                sa.or_(
-                    StaticRoutePatterns.route_pattern_typicality == 1,
-                    StaticRoutePatterns.route_pattern_typicality == 5,
-                ),
-            )
-            .order_by(
-                sa.func.coalesce(StaticTrips.branch_route_id, StaticTrips.trunk_route_id),
-                StaticRoutePatterns.direction_id,
-                StaticRoutePatterns.static_version_key,
-                StaticRoutePatterns.route_pattern_typicality.desc(),
-            )
-            .subquery("canon_trips")
-        )
-        # using the representative_trip_id's from the canon_trips query, create
-        # stop_sequence values for each parent_station on each route in each direction.
-        # stop_sequence's are created using the row_number function so that they
-        # always start at 1 and increment according to the
-        # StaticStopTimes.stop_sequence order
-        static_canon = (
-            sa.select(
-                canon_trips.c.direction_id,
-                canon_trips.c.trunk_route_id,
-                canon_trips.c.route_id,
-                StaticStops.parent_station,
-                sa.over(
-                    sa.func.row_number(),
-                    partition_by=(
-                        canon_trips.c.static_version_key,
-                        canon_trips.c.direction_id,
-                        canon_trips.c.route_id,
-                    ),
-                    order_by=StaticStopTimes.stop_sequence,
-                ).label("stop_sequence"),
-                canon_trips.c.static_version_key,
-            )
-            .select_from(canon_trips)
-            .join(
-                StaticStopTimes,
-                sa.and_(
-                    canon_trips.c.representative_trip_id == StaticStopTimes.trip_id,
-                    canon_trips.c.static_version_key == StaticStopTimes.static_version_key,
-                ),
-            )
-            .join(
-                StaticStops,
-                sa.and_(
-                    StaticStopTimes.stop_id == StaticStops.stop_id,
-                    StaticStopTimes.static_version_key == StaticStops.static_version_key,
+    # using the representative_trip_id's from the canon_trips query, create
+    # stop_sequence values for each parent_station on each route in each direction.
+    # stop_sequence's are created using the row_number function so that they
+    # always start at 1 and increment according to the
+    # StaticStopTimes.stop_sequence order
+    static_canon = (
+        sa.select(
+            canon_trips.c.direction_id,
+            canon_trips.c.trunk_route_id,
+            canon_trips.c.route_id,
+            StaticStops.parent_station,
+            sa.over(
+                sa.func.row_number(),
+                partition_by=(
+                    canon_trips.c.static_version_key,
+                    canon_trips.c.direction_id,
+                    canon_trips.c.route_id,
                 ),
-            )
-            .subquery("static_canon")
+                order_by=StaticStopTimes.stop_sequence,
+            ).label("stop_sequence"),
+            canon_trips.c.static_version_key,
         )
+        .select_from(canon_trips)
+        .join(
+            StaticStopTimes,
+            sa.and_(
+                canon_trips.c.representative_trip_id == StaticStopTimes.trip_id,
+                canon_trips.c.static_version_key == StaticStopTimes.static_version_key,
+            ),
+        )
+        .join(
+            StaticStops,
+            sa.and_(
+                StaticStopTimes.stop_id == StaticStops.stop_id,
+                StaticStopTimes.static_version_key == StaticStops.static_version_key,
+            ),
+        )
+        .subquery("static_canon")
+    )
 
-        # subquery to join static_canon results to vehicle_events records
-        rt_canon = (
-            sa.select(
-                VehicleEvents.pm_event_id,
-                static_canon.c.stop_sequence,
-            )
-            .select_from(VehicleEvents)
-            .join(
-                VehicleTrips,
-                VehicleEvents.pm_trip_id == VehicleTrips.pm_trip_id,
-            )
-            .join(
-                static_canon,
-                sa.and_(
-                    VehicleTrips.direction_id == static_canon.c.direction_id,
-                    sa.func.coalesce(
-                        VehicleTrips.branch_route_id,
-                        VehicleTrips.trunk_route_id,
-                    )
-                    == static_canon.c.route_id,
-                    VehicleTrips.static_version_key == static_canon.c.static_version_key,
-                    VehicleEvents.parent_station == static_canon.c.parent_station,
-                ),
-            )
-            .where(
-                VehicleEvents.service_date == record["service_date"],
-            )
-            .subquery("rt_canon")
+    # subquery to join static_canon results to vehicle_events records
+    rt_canon = (
+        sa.select(
+            VehicleEvents.pm_event_id,
+            static_canon.c.stop_sequence,
+        )
+        .select_from(VehicleEvents)
+        .join(
+            VehicleTrips,
+            VehicleEvents.pm_trip_id == VehicleTrips.pm_trip_id,
+        )
+        .join(
+            static_canon,
+            sa.and_(
+                VehicleTrips.direction_id == static_canon.c.direction_id,
+                sa.func.coalesce(
+                    VehicleTrips.branch_route_id,
+                    VehicleTrips.trunk_route_id,
+                )
+                == static_canon.c.route_id,
+                VehicleTrips.static_version_key == static_canon.c.static_version_key,
+                VehicleEvents.parent_station == static_canon.c.parent_station,
+            ),
         )
+        .where(
+            VehicleEvents.service_date == service_date,
+        )
+        .subquery("rt_canon")
+    )
 
-        update_rt_canon = (
-            sa.update(VehicleEvents.__table__)
-            .values(
-                canonical_stop_sequence=rt_canon.c.stop_sequence,
-            )
-            .where(
-                VehicleEvents.pm_event_id == rt_canon.c.pm_event_id,
-            )
+    update_rt_canon = (
+        sa.update(VehicleEvents.__table__)
+        .values(
+            canonical_stop_sequence=rt_canon.c.stop_sequence,
         )
+        .where(
+            VehicleEvents.pm_event_id == rt_canon.c.pm_event_id,
+        )
+    )
+
+    process_logger = ProcessLogger(
+        "l1_events.update_canonical_stop_sequence",
+        service_date=service_date,
+        static_version_key=static_version_key,
+    )
+    process_logger.log_start()
+    db_manager.execute(update_rt_canon)
+    process_logger.log_complete()
 
-        process_logger = ProcessLogger(
-            "l1_events.update_canonical_stop_sequence",
-            service_date=record["service_date"],
-            static_version_key=record["static_version_key"],
+    # select "zero_point" parent_stations
+    # this query will produce one parent_station for each trunk_route_id that
+    # is the most likey to have all branch_routes passing through them
+    zero_point_stop = (
+        sa.select(
+            static_canon.c.trunk_route_id,
+            static_canon.c.parent_station,
+            sa.literal(0).label("sync_start"),
         )
-        process_logger.log_start()
-        db_manager.execute(update_rt_canon)
-        process_logger.log_complete()
+        .distinct(
+            static_canon.c.trunk_route_id,
+        )
+        .group_by(
+            static_canon.c.trunk_route_id,
+            static_canon.c.parent_station,
+        )
+        .order_by(
+            static_canon.c.trunk_route_id,
+            count(
+                static_canon.c.stop_sequence,
+            ).desc(),
+            (sa.func.max(static_canon.c.stop_sequence) - sa.func.min(static_canon.c.stop_sequence)).desc(),
+        )
+        .subquery("zero_points")
+    )
 
-        # select "zero_point" parent_stations
-        # this query will produce one parent_station for each trunk_route_id that
-        # is the most likey to have all branch_routes passing through them
-        zero_point_stop = (
-            sa.select(
-                static_canon.c.trunk_route_id,
-                static_canon.c.parent_station,
-                sa.literal(0).label("sync_start"),
-            )
-            .distinct(
-                static_canon.c.trunk_route_id,
-            )
-            .group_by(
-                static_canon.c.trunk_route_id,
-                static_canon.c.parent_station,
-            )
-            .order_by(
-                static_canon.c.trunk_route_id,
-                count(
-                    static_canon.c.stop_sequence,
-                ).desc(),
-                (sa.func.max(static_canon.c.stop_sequence) - sa.func.min(static_canon.c.stop_sequence)).desc(),
-            )
-            .subquery("zero_points")
+    # select stop_sequence number for the zero_point parent_station of each route-branch,
+    # consider this value the stop_sequence "adjustment" value
+    zero_seq_vals = (
+        sa.select(
+            static_canon.c.direction_id,
+            static_canon.c.route_id,
+            static_canon.c.stop_sequence.label("seq_adjust"),
+        )
+        .select_from(static_canon)
+        .join(
+            zero_point_stop,
+            sa.and_(
+                zero_point_stop.c.trunk_route_id == static_canon.c.trunk_route_id,
+                zero_point_stop.c.parent_station == static_canon.c.parent_station,
+            ),
         )
+        .subquery("zero_seq_vals")
+    )
 
-        # select stop_sequence number for the zero_point parent_station of each route-branch,
-        # consider this value the stop_sequence "adjustment" value
-        zero_seq_vals = (
-            sa.select(
-                static_canon.c.direction_id,
-                static_canon.c.route_id,
-                static_canon.c.stop_sequence.label("seq_adjust"),
-            )
-            .select_from(static_canon)
-            .join(
-                zero_point_stop,
-                sa.and_(
-                    zero_point_stop.c.trunk_route_id == static_canon.c.trunk_route_id,
-                    zero_point_stop.c.parent_station == static_canon.c.parent_station,
-                ),
-            )
-            .subquery("zero_seq_vals")
-        )
-
-        # select the minimum stop_sequence value and minimum difference
-        # between a stop_sequence and stop_sequence "adjustment" for each branch-route
-        # these values will be used to normalize canonical stop_sequence values across a trunk
-        sync_adjust_vals = (
-            sa.select(
-                static_canon.c.direction_id,
-                static_canon.c.trunk_route_id,
-                sa.func.min(static_canon.c.stop_sequence).label("min_seq"),
-                sa.func.min(static_canon.c.stop_sequence - zero_seq_vals.c.seq_adjust).label("min_sync"),
-            )
-            .select_from(static_canon)
-            .join(
-                zero_seq_vals,
-                sa.and_(
-                    zero_seq_vals.c.direction_id == static_canon.c.direction_id,
-                    zero_seq_vals.c.route_id == static_canon.c.route_id,
-                ),
-            )
-            .group_by(
-                static_canon.c.direction_id,
-                static_canon.c.trunk_route_id,
-            )
-            .subquery("sync_adjust_vals")
-        )
-
-        # create sync_stop_sequence
-        # sync_stop_sequence = canonical_stop_sequence - zero_parent_stop_sequence - minimum_sync_sequence_adjustment(for trunk) + minimum_canonical_stop_sequence(for trunk)
-        # one sync_stop_sequence value is created for each trunk_route_id, direction_id, parent_station, static_version_key pair
-        sync_values = (
-            sa.select(
-                static_canon.c.direction_id,
-                static_canon.c.trunk_route_id,
-                static_canon.c.parent_station,
-                static_canon.c.static_version_key,
-                (
-                    static_canon.c.stop_sequence
-                    - zero_seq_vals.c.seq_adjust
-                    - sync_adjust_vals.c.min_sync
-                    + sync_adjust_vals.c.min_seq
-                ).label("sync_stop_sequence"),
-            )
-            .distinct()
-            .select_from(static_canon)
-            .join(
-                zero_seq_vals,
-                sa.and_(
-                    zero_seq_vals.c.direction_id == static_canon.c.direction_id,
-                    zero_seq_vals.c.route_id == static_canon.c.route_id,
-                ),
-            )
-            .join(
-                sync_adjust_vals,
-                sa.and_(
-                    sync_adjust_vals.c.direction_id == static_canon.c.direction_id,
-                    sync_adjust_vals.c.trunk_route_id == static_canon.c.trunk_route_id,
-                ),
-            )
-            .subquery(("sync_values"))
+    # select the minimum stop_sequence value and minimum difference
+    # between a stop_sequence and stop_sequence "adjustment" for each branch-route
+    # these values will be used to normalize canonical stop_sequence values across a trunk
+    sync_adjust_vals = (
+        sa.select(
+            static_canon.c.direction_id,
+            static_canon.c.trunk_route_id,
+            sa.func.min(static_canon.c.stop_sequence).label("min_seq"),
+            sa.func.min(static_canon.c.stop_sequence - zero_seq_vals.c.seq_adjust).label("min_sync"),
+        )
+        .select_from(static_canon)
+        .join(
+            zero_seq_vals,
+            sa.and_(
+                zero_seq_vals.c.direction_id == static_canon.c.direction_id,
+                zero_seq_vals.c.route_id == static_canon.c.route_id,
+            ),
+        )
+        .group_by(
+            static_canon.c.direction_id,
+            static_canon.c.trunk_route_id,
         )
+        .subquery("sync_adjust_vals")
+    )
 
-        rt_sync = (
-            sa.select(
-                VehicleEvents.pm_event_id,
-                sync_values.c.sync_stop_sequence,
-            )
-            .select_from(VehicleEvents)
-            .join(
-                VehicleTrips,
-                VehicleEvents.pm_trip_id == VehicleTrips.pm_trip_id,
-            )
-            .join(
-                sync_values,
-                sa.and_(
-                    VehicleTrips.direction_id == sync_values.c.direction_id,
-                    VehicleTrips.trunk_route_id == sync_values.c.trunk_route_id,
-                    VehicleTrips.static_version_key == sync_values.c.static_version_key,
-                    VehicleEvents.parent_station == sync_values.c.parent_station,
-                ),
-            )
-            .where(
-                VehicleEvents.service_date == record["service_date"],
-            )
-            .subquery("rt_sync")
+    # create sync_stop_sequence
+    # sync_stop_sequence = canonical_stop_sequence - zero_parent_stop_sequence - minimum_sync_sequence_adjustment(for trunk) + minimum_canonical_stop_sequence(for trunk)
+    # one sync_stop_sequence value is created for each trunk_route_id, direction_id, parent_station, static_version_key pair
+    sync_values = (
+        sa.select(
+            static_canon.c.direction_id,
+            static_canon.c.trunk_route_id,
+            static_canon.c.parent_station,
+            static_canon.c.static_version_key,
+            (
+                static_canon.c.stop_sequence
+                - zero_seq_vals.c.seq_adjust
+                - sync_adjust_vals.c.min_sync
+                + sync_adjust_vals.c.min_seq
+            ).label("sync_stop_sequence"),
         )
+        .distinct()
+        .select_from(static_canon)
+        .join(
+            zero_seq_vals,
+            sa.and_(
+                zero_seq_vals.c.direction_id == static_canon.c.direction_id,
+                zero_seq_vals.c.route_id == static_canon.c.route_id,
+            ),
+        )
+        .join(
+            sync_adjust_vals,
+            sa.and_(
+                sync_adjust_vals.c.direction_id == static_canon.c.direction_id,
+                sync_adjust_vals.c.trunk_route_id == static_canon.c.trunk_route_id,
+            ),
+        )
+        .subquery(("sync_values"))
+    )
 
-        update_rt_sync = (
-            sa.update(VehicleEvents.__table__)
-            .values(
-                sync_stop_sequence=rt_sync.c.sync_stop_sequence,
-            )
-            .where(
-                VehicleEvents.pm_event_id == rt_sync.c.pm_event_id,
-            )
+    rt_sync = (
+        sa.select(
+            VehicleEvents.pm_event_id,
+            sync_values.c.sync_stop_sequence,
         )
+        .select_from(VehicleEvents)
+        .join(
+            VehicleTrips,
+            VehicleEvents.pm_trip_id == VehicleTrips.pm_trip_id,
+        )
+        .join(
+            sync_values,
+            sa.and_(
+                VehicleTrips.direction_id == sync_values.c.direction_id,
+                VehicleTrips.trunk_route_id == sync_values.c.trunk_route_id,
+                VehicleTrips.static_version_key == sync_values.c.static_version_key,
+                VehicleEvents.parent_station == sync_values.c.parent_station,
+            ),
+        )
+        .where(
+            VehicleEvents.service_date == service_date,
+        )
+        .subquery("rt_sync")
+    )
 
-        process_logger = ProcessLogger(
-            "l1_events.update_sync_stop_sequence",
-            service_date=record["service_date"],
-            static_version_key=record["static_version_key"],
+    update_rt_sync = (
+        sa.update(VehicleEvents.__table__)
+        .values(
+            sync_stop_sequence=rt_sync.c.sync_stop_sequence,
+        )
+        .where(
+            VehicleEvents.pm_event_id == rt_sync.c.pm_event_id,
         )
-        process_logger.log_start()
-        db_manager.execute(update_rt_sync)
-        process_logger.log_complete()
+    )
+
+    process_logger = ProcessLogger(
+        "l1_events.update_sync_stop_sequence",
+        service_date=service_date,
+        static_version_key=static_version_key,
+    )
+    process_logger.log_start()
+    db_manager.execute(update_rt_sync)
+    process_logger.log_complete()
 
 
 def backup_trips_match_pl(rt_backup_trips: pl.DataFrame, static_trips: pl.DataFrame) -> pl.DataFrame:
@@ -945,12 +946,15 @@ def backup_rt_static_trip_match(
     db_manager: DatabaseManager,
     seed_service_date: int,
     static_version_key: int,
+    disable_trip_tigger: bool = True,
 ) -> None:
     """
     perform "backup" match of RT trips to Static schedule trip
 
     this matches an RT trip to a static trip with the same branch_route_id or trunk_route_id if branch is null
     and direction with the closest start_time
+
+    :param disable_trip_tigger if False, caller is responsible for disabling the vehicle_trips trigger
     """
 
     logger = ProcessLogger("backup_rt_static_trip_match_pl")
@@ -985,13 +989,6 @@ def backup_rt_static_trip_match(
     )
 
     rt_schema = {"pm_trip_id": pl.Int32, "direction_id": pl.Boolean, "route_id": pl.String, "start_time": pl.Int32}
-    rt_rename_dict = {
-        "pm_trip_id": "b_pm_trip_id",
-        "static_trip_id": "b_static_trip_id",
-        "static_start_time": "b_static_start_time",
-        "static_stop_count": "b_static_stop_count",
-        "first_last_station_match": "b_first_last_station_match",
-    }
 
     rt_trips_summary_df = pl.DataFrame(db_manager.select_as_list(rt_trips_summary), schema=rt_schema)
 
@@ -1000,59 +997,145 @@ def backup_rt_static_trip_match(
     if rt_trips_summary_df.height == 0:
         return
 
-    backup_trips_match_df = backup_trips_match_pl(rt_trips_summary_df, static_trips_df).rename(rt_rename_dict)
-
-    update_query = (
-        sa.update(VehicleTrips.__table__)
-        .where(VehicleTrips.pm_trip_id == bindparam("b_pm_trip_id"))
-        .values(
-            static_trip_id_guess=bindparam("b_static_trip_id"),
-            static_start_time=bindparam("b_static_start_time"),
-            static_stop_count=bindparam("b_static_stop_count"),
-            first_last_station_match=bindparam("b_first_last_station_match"),
-        )
+    backup_trips_match_df = backup_trips_match_pl(rt_trips_summary_df, static_trips_df).rename(
+        {"static_trip_id": "static_trip_id_guess"}
     )
 
-    db_manager.execute_with_data_pl(update_query, backup_trips_match_df)
+    db_manager.update_dataframe(
+        backup_trips_match_df,
+        VehicleTrips,
+        key_columns=["pm_trip_id"],
+        disable_trip_tigger=disable_trip_tigger,
+    )
     logger.log_complete()
 
 
-def update_backup_static_trip_id(db_manager: DatabaseManager) -> None:
+# service dates are processed concurrently, each worker holds one connection
+# from the DatabaseManager pool (pool_size=5)
+SERVICE_DATE_WORKERS = 4
+
+
+@dataclass
+class ServiceDateWork:
     """
-    perform backup static_trip_id matching on events_trips table
+    static version keys touched for a single service date in an event loop
+    """
+
+    service_date: int
+    stop_sequence_keys: List[int] = field(default_factory=list)
+    backup_match_keys: List[int] = field(default_factory=list)
+
+
+def plan_service_dates(
+    stop_sequence_pairs: Iterable[Mapping[str, int]],
+    backup_match_pairs: Iterable[Mapping[str, int]],
+) -> List[ServiceDateWork]:
+    """
+    group service_date / static_version_key records into per service date work
+
+    service dates do not share rows in vehicle_events or vehicle_trips, so the
+    work for separate service dates can run concurrently
+    """
+    work: Dict[int, ServiceDateWork] = {}
+    for record in stop_sequence_pairs:
+        service_date = int(record["service_date"])
+        work.setdefault(service_date, ServiceDateWork(service_date)).stop_sequence_keys.append(
+            int(record["static_version_key"])
+        )
+    for record in backup_match_pairs:
+        service_date = int(record["service_date"])
+        work.setdefault(service_date, ServiceDateWork(service_date)).backup_match_keys.append(
+            int(record["static_version_key"])
+        )
+
+    return [work[service_date] for service_date in sorted(work)]
+
 
+def process_service_date(db_manager: DatabaseManager, work: ServiceDateWork) -> None:
     """
-    process_logger = ProcessLogger("l1_trips.update_backup_trip_matches")
+    run per service date trip steps, in order, for a single service date
+
+    vehicle_trips trigger must already be disabled by the caller
+    """
+    process_logger = ProcessLogger(
+        "l1_trips.process_service_date",
+        service_date=work.service_date,
+        stop_sequence_keys=len(work.stop_sequence_keys),
+        backup_match_keys=len(work.backup_match_keys),
+    )
     process_logger.log_start()
 
-    service_date_query = sa.select(
-        TempEventCompare.service_date,
-        TempEventCompare.static_version_key,
-    ).distinct()
+    for static_version_key in work.stop_sequence_keys:
+        update_stop_sequence(db_manager, work.service_date, static_version_key)
 
-    for result in db_manager.select_as_list(service_date_query):
-        service_date = int(result["service_date"])
-        static_version_key = int(result["static_version_key"])
+    for static_version_key in work.backup_match_keys:
         backup_rt_static_trip_match(
             db_manager=db_manager,
-            seed_service_date=service_date,
+            seed_service_date=work.service_date,
             static_version_key=static_version_key,
+            disable_trip_tigger=False,
         )
 
     process_logger.log_complete()
 
 
-def process_trips(db_manager: DatabaseManager) -> None:
+def update_service_dates(db_manager: DatabaseManager, max_workers: int = SERVICE_DATE_WORKERS) -> None:
+    """
+    perform stop sequence updates and backup static_trip_id matching for each
+    service date found in temp_event_compare
+
+    steps for a service date run in order, separate service dates run concurrently
+    """
+    process_logger = ProcessLogger("l1_trips.update_service_dates", max_workers=max_workers)
+    process_logger.log_start()
+
+    stop_sequence_query = (
+        sa.select(VehicleTrips.service_date, VehicleTrips.static_version_key)
+        .distinct()
+        .join(
+            TempEventCompare,
+            VehicleTrips.pm_trip_id == TempEventCompare.pm_trip_id,
+        )
+    )
+    backup_match_query = sa.select(
+        TempEventCompare.service_date,
+        TempEventCompare.static_version_key,
+    ).distinct()
+
+    plan = plan_service_dates(
+        db_manager.select_as_list(stop_sequence_query),
+        db_manager.select_as_list(backup_match_query),
+    )
+    process_logger.add_metadata(service_date_count=len(plan))
+
+    if len(plan) > 0:
+        with db_manager.trip_trigger_disabled():
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(plan)))) as pool:
+                futures = [pool.submit(process_service_date, db_manager, work) for work in plan]
+                # re-raise the first worker exception, after all workers finish
+                for future in futures:
+                    future.result()
+
+    process_logger.log_complete()
+
+
+def process_trips(db_manager: DatabaseManager) -> Set[int]:
     """
     update vehicle_trips table based on new events in temp_event_compare
 
+    static_version_key updates apply to whole service dates, all other updates
+    are limited to trips in temp_event_compare
+
+    :return service dates where every trip may have changed, because of a new
+        static_version_key, or where trips were moved to a new trunk_route_id
     """
-    update_static_version_key(db_manager)
-    update_branch_trunk_route_id(db_manager)
+    full_service_dates = update_static_version_key(db_manager)
+    full_service_dates |= update_branch_trunk_route_id(db_manager)
     update_trip_stop_counts(db_manager)
     update_prev_next_trip_stop(db_manager)
     update_static_trip_id_guess_exact(db_manager)
     update_start_times(db_manager)
     update_directions(db_manager)
-    update_stop_sequence(db_manager)
-    update_backup_static_trip_id(db_manager)
+    update_service_dates(db_manager)
+
+    return full_service_dates
@@ -1,12 +1,15 @@
+import io
 import os
+import tempfile
 import time
 import urllib.parse as urlparse
+from contextlib import contextmanager
+from dataclasses import dataclass
 from enum import Enum, auto
-from queue import Queue
+from queue import Empty, Queue
 from multiprocessing import Manager, Process
-from typing import Any, Dict, List, Optional, Tuple, Union, Callable
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple, Union, Callable
 
-import boto3
 import pandas
 import sqlalchemy as sa
 import polars as pl
@@ -14,8 +17,10 @@ from sqlalchemy.sql.functions import now
 from sqlalchemy.dialects import postgresql
 from sqlalchemy.orm import sessionmaker
 import pyarrow
+import pyarrow.csv as pv
 import pyarrow.parquet as pq
 
+from lamp_py.aws.client_pool import get_client
 from lamp_py.aws.s3 import dt_from_obj_path
 from lamp_py.runtime_utils.process_logger import ProcessLogger
 
@@ -98,7 +103,7 @@ class PsqlArgs:
         region = os.environ.get("DB_REGION", None)
 
         # generate ws db auth token if in rds
-        client = boto3.client("rds")
+        client = get_client("rds")
         return client.generate_db_auth_token(
             DBHostname=self.host,
             Port=self.port,
@@ -234,6 +239,144 @@ def generate_update_db_password_func(psql_args: PsqlArgs) -> Callable:
     return postgres_event_update_db_password
 
 
+# rows per COPY statement when bulk loading dataframes, limits the size of the
+# csv buffer held in memory at once
+COPY_BATCH_SIZE = 100_000
+
+FrameType = Union[pl.DataFrame, pyarrow.Table, pandas.DataFrame]
+
+
+def frame_for_copy(data: FrameType, table: sa.sql.schema.Table) -> pl.DataFrame:
+    """
+    convert a pandas dataframe or pyarrow table to a polars dataframe for
+    bulk loading into table
+
+    NaN float values are loaded as NULL and float columns loaded into
+    integer table columns are cast to integers, as COPY does not accept
+    values like "5.0" for integer columns.
+    """
+    if isinstance(data, pandas.DataFrame):
+        data = pl.from_pandas(data)
+    elif isinstance(data, pyarrow.Table):
+        data = pl.from_arrow(data)
+
+    assert isinstance(data, pl.DataFrame)
+    data = data.with_columns(pl.col(pl.Float32, pl.Float64).fill_nan(None))
+
+    integer_columns = [
+        column
+        for column, dtype in data.schema.items()
+        if dtype.is_float() and column in table.columns and isinstance(table.columns[column].type, sa.Integer)
+    ]
+    return data.with_columns(pl.col(integer_columns).cast(pl.Int64))
+
+
+def frame_to_csv_batches(data: pl.DataFrame, batch_size: int = COPY_BATCH_SIZE) -> Iterator[io.BytesIO]:
+    """
+    serialize a dataframe into headerless csv buffers of at most batch_size
+    rows for postgres COPY ... WITH (FORMAT csv)
+
+    NULL values are written as unquoted empty fields and empty strings as
+    quoted empty fields, matching how COPY tells them apart.
+    """
+    for batch in data.iter_slices(n_rows=batch_size):
+        buffer = io.BytesIO()
+        batch.write_csv(buffer, include_header=False, null_value="")
+        buffer.seek(0)
+        yield buffer
+
+
+# arrow types for postgres type oids of query result columns, queries with
+# columns of other types are fetched row by row instead of with COPY
+POSTGRES_ARROW_TYPES: Dict[int, pyarrow.DataType] = {
+    16: pyarrow.bool_(),  # boolean
+    19: pyarrow.string(),  # name
+    20: pyarrow.int64(),  # bigint
+    21: pyarrow.int16(),  # smallint
+    23: pyarrow.int32(),  # integer
+    25: pyarrow.string(),  # text
+    700: pyarrow.float32(),  # real
+    701: pyarrow.float64(),  # double precision
+    1042: pyarrow.string(),  # char
+    1043: pyarrow.string(),  # varchar
+    1082: pyarrow.date32(),  # date
+    1114: pyarrow.timestamp("us"),  # timestamp
+    1184: pyarrow.timestamp("us", tz="UTC"),  # timestamptz
+    1700: pyarrow.float64(),  # numeric
+}
+
+
+def csv_read_options(
+    schema: pyarrow.Schema, block_size: int = 1 << 24
+) -> Tuple[pv.ReadOptions, pv.ParseOptions, pv.ConvertOptions]:
+    """
+    read, parse and convert options for parsing the output of postgres
+    COPY ... TO STDOUT WITH (FORMAT csv, HEADER) into schema
+
+    NULL values are written by COPY as unquoted empty fields and empty strings
+    as quoted empty fields. values containing newlines are quoted, so rows may
+    span multiple lines.
+    """
+    read_options = pv.ReadOptions(block_size=block_size)
+    parse_options = pv.ParseOptions(newlines_in_values=True)
+    convert_options = pv.ConvertOptions(
+        column_types=schema,
+        null_values=[""],
+        true_values=["t"],
+        false_values=["f"],
+        strings_can_be_null=True,
+        quoted_strings_can_be_null=False,
+    )
+    return (read_options, parse_options, convert_options)
+
+
+@dataclass
+class MaintenanceThresholds:
+    """
+    thresholds for running VACUUM (ANALYZE) or ANALYZE on a table, modeled on
+    the postgres autovacuum settings of the same names.
+
+    a table is vacuumed when its dead tuples exceed
+    vacuum_threshold + vacuum_scale_factor * live tuples, and analyzed when
+    rows modified since the last analyze exceed
+    analyze_threshold + analyze_scale_factor * live tuples, or when it has
+    not been analyzed for max_analyze_age_seconds.
+    """
+
+    vacuum_threshold: int = 5_000
+    vacuum_scale_factor: float = 0.05
+    analyze_threshold: int = 1_000
+    analyze_scale_factor: float = 0.01
+    max_analyze_age_seconds: int = 15 * 60
+
+
+def maintenance_command(stats: Dict[str, Any], thresholds: MaintenanceThresholds) -> Optional[str]:
+    """
+    choose the maintenance command to run on a table from its
+    pg_stat_user_tables counters
+
+    :param stats: n_live_tup, n_dead_tup, n_mod_since_analyze and
+        analyze_age_seconds (None if never analyzed) of a table
+    :return "VACUUM (ANALYZE)", "ANALYZE" or None if the table does not
+        need maintenance
+    """
+    live_tuples = int(stats["n_live_tup"] or 0)
+
+    if int(stats["n_dead_tup"] or 0) > thresholds.vacuum_threshold + thresholds.vacuum_scale_factor * live_tuples:
+        return "VACUUM (ANALYZE)"
+
+    if int(stats["n_mod_since_analyze"] or 0) > (
+        thresholds.analyze_threshold + thresholds.analyze_scale_factor * live_tuples
+    ):
+        return "ANALYZE"
+
+    analyze_age = stats["analyze_age_seconds"]
+    if analyze_age is None or float(analyze_age) > thresholds.max_analyze_age_seconds:
+        return "ANALYZE"
+
+    return None
+
+
 # Setup the base class that all of the SQL objects will inherit from.
 #
 # Note that the typing hint is required to be set at Any for mypy to be cool
@@ -313,78 +456,197 @@ class DatabaseManager:
 
         return result  # type: ignore
 
-    def execute_with_data_pl(
+    def insert_dataframe(self, dataframe: FrameType, insert_table: Any) -> None:
+        """
+        insert data into db table from dataframe, using COPY
+        """
+        self.copy_dataframe(dataframe, insert_table)
+
+    def _copy_to_table(
         self,
-        statement: Union[
-            sa.sql.selectable.Select,
-            sa.sql.dml.Update,
-            sa.sql.dml.Delete,
-            sa.sql.dml.Insert,
-        ],
+        cursor: sa.orm.Session,
         data: pl.DataFrame,
-        disable_trip_tigger: bool = True,
-    ) -> sa.engine.CursorResult:
+        table_name: str,
+    ) -> None:
         """
-        execute db action WITH data as polars dataframe
+        stream dataframe into table_name with COPY on the connection of
+        cursor, columns are matched to the table by name
+        """
+        preparer = self.engine.dialect.identifier_preparer
+        columns = ", ".join(preparer.quote(column) for column in data.columns)
+        copy_query = f"COPY {table_name} ({columns}) FROM STDIN WITH (FORMAT csv)"
 
+        dbapi_cursor = cursor.connection().connection.cursor()
+        try:
+            for buffer in frame_to_csv_batches(data):
+                dbapi_cursor.copy_expert(copy_query, buffer)
+        finally:
+            dbapi_cursor.close()
+
+    def copy_dataframe(
+        self,
+        data: FrameType,
+        insert_table: Any,
+        disable_trip_tigger: bool = False,
+    ) -> None:
+        """
+        bulk insert dataframe into db table with COPY
+
+        data is streamed to the database as csv without creating a python
+        object per row. dataframe columns must match table column names.
+
+        :param data: polars dataframe, pandas dataframe or pyarrow table
+        :param insert_table: table to insert into
         :param disable_trip_trigger if True, will disable rt_trips_update_branch_trunk TRIGGER on vehicle_trips table
         """
+        insert_as = self._get_schema_table(insert_table)
+        data = frame_for_copy(data, insert_as)
+
         if disable_trip_tigger:
             self._disable_trip_trigger()
 
         with self.session.begin() as cursor:
-            result = cursor.execute(statement, data.to_dicts())
+            table_name = self.engine.dialect.identifier_preparer.format_table(insert_as)
+            self._copy_to_table(cursor, data, table_name)
 
         if disable_trip_tigger:
             self._enable_trip_trigger()
 
-        return result  # type: ignore
+    def _copy_to_staging_table(
+        self,
+        cursor: sa.orm.Session,
+        data: pl.DataFrame,
+        table: sa.sql.schema.Table,
+    ) -> sa.sql.expression.TableClause:
+        """
+        stream dataframe with COPY into a temporary staging table, with the
+        column types of table, that is dropped when the transaction of cursor
+        is committed
+        """
+        preparer = self.engine.dialect.identifier_preparer
+        staging_name = f"staging_{table.name}"
+        staging_columns = ", ".join(preparer.quote(column) for column in data.columns)
+        cursor.execute(
+            sa.text(
+                f"CREATE TEMPORARY TABLE {preparer.quote(staging_name)} ON COMMIT DROP AS "
+                f"SELECT {staging_columns} FROM {preparer.format_table(table)} WITH NO DATA;"
+            )
+        )
+        self._copy_to_table(cursor, data, preparer.quote(staging_name))
 
-    def execute_with_data(
+        return sa.table(staging_name, *[sa.column(column) for column in data.columns])
+
+    def update_dataframe(
         self,
-        statement: Union[
-            sa.sql.selectable.Select,
-            sa.sql.dml.Update,
-            sa.sql.dml.Delete,
-            sa.sql.dml.Insert,
-        ],
-        data: pandas.DataFrame,
+        data: FrameType,
+        update_table: Any,
+        key_columns: List[str],
         disable_trip_tigger: bool = True,
-    ) -> sa.engine.CursorResult:
+    ) -> None:
         """
-        execute db action WITH data as pandas dataframe
+        bulk update db table rows from dataframe through a staging table
 
+        data is loaded with COPY into a temporary staging table and applied to
+        update_table with a single UPDATE ... FROM statement, instead of an
+        UPDATE per row. dataframe columns must match table column names.
+
+        :param data: polars dataframe, pandas dataframe or pyarrow table
+        :param update_table: table to update
+        :param key_columns: columns matching dataframe rows to table rows, all
+            other dataframe columns are updated
         :param disable_trip_trigger if True, will disable rt_trips_update_branch_trunk TRIGGER on vehicle_trips table
         """
+        update_as = self._get_schema_table(update_table)
+        data = frame_for_copy(data, update_as)
+        if data.height == 0:
+            return
+
         if disable_trip_tigger:
             self._disable_trip_trigger()
 
         with self.session.begin() as cursor:
-            result = cursor.execute(statement, data.to_dict(orient="records"))
+            staging_table = self._copy_to_staging_table(cursor, data, update_as)
+            update_query = (
+                sa.update(update_as)
+                .where(*[update_as.c[column] == staging_table.c[column] for column in key_columns])
+                .values({column: staging_table.c[column] for column in data.columns if column not in key_columns})
+            )
+            cursor.execute(update_query)
 
         if disable_trip_tigger:
             self._enable_trip_trigger()
 
-        return result  # type: ignore
+    def _copy_query_to_file(
+        self,
+        cursor: sa.orm.Session,
+        select_query: Union[sa.sql.expression.Select, sa.sql.expression.TextClause],
+        csv_file: IO[bytes],
+    ) -> Optional[pyarrow.Schema]:
+        """
+        write the results of select_query to csv_file with COPY
 
-    def insert_dataframe(self, dataframe: pandas.DataFrame, insert_table: Any) -> None:
+        :return arrow schema of the csv written to csv_file, or None if the
+            query returns columns that can not be read from csv by arrow, in
+            which case nothing is written
         """
-        insert data into db table from pandas dataframe
+        dbapi_cursor = cursor.connection().connection.cursor()
+        try:
+            compiled = select_query.compile(dialect=self.engine.dialect, compile_kwargs={"render_postcompile": True})
+            query_string = dbapi_cursor.mogrify(str(compiled), compiled.params).decode().strip().rstrip(";")
+
+            # get result column types without running the query
+            dbapi_cursor.execute(f"SELECT * FROM ({query_string}) AS copy_query LIMIT 0")
+            fields = []
+            for column_name, type_code, *_ in dbapi_cursor.description:
+                if type_code not in POSTGRES_ARROW_TYPES:
+                    return None
+                fields.append(pyarrow.field(column_name, POSTGRES_ARROW_TYPES[type_code]))
+
+            dbapi_cursor.copy_expert(f"COPY ({query_string}) TO STDOUT WITH (FORMAT csv, HEADER)", csv_file)
+        finally:
+            dbapi_cursor.close()
+
+        csv_file.seek(0)
+        return pyarrow.schema(fields)
+
+    def select_as_arrow(
+        self, select_query: Union[sa.sql.expression.Select, sa.sql.expression.TextClause]
+    ) -> pyarrow.Table:
         """
-        insert_as = self._get_schema_table(insert_table)
+        select data from db table and return pyarrow table
 
-        with self.session.begin() as cursor:
-            cursor.execute(
-                sa.insert(insert_as),
-                dataframe.to_dict(orient="records"),
+        results are fetched with COPY and parsed by arrow, without creating a
+        python object per row
+        """
+        with tempfile.TemporaryFile() as csv_file:
+            with self.session.begin() as cursor:
+                schema = self._copy_query_to_file(cursor, select_query, csv_file)
+                if schema is None:
+                    return pyarrow.Table.from_pylist([row._asdict() for row in cursor.execute(select_query)])
+
+            read_options, parse_options, convert_options = csv_read_options(schema)
+            return pv.read_csv(
+                csv_file,
+                read_options=read_options,
+                parse_options=parse_options,
+                convert_options=convert_options,
             )
 
-    def select_as_dataframe(self, select_query: sa.sql.selectable.Select) -> pandas.DataFrame:
+    def select_as_polars(
+        self, select_query: Union[sa.sql.expression.Select, sa.sql.expression.TextClause]
+    ) -> pl.DataFrame:
+        """
+        select data from db table and return polars dataframe
+        """
+        return pl.from_arrow(self.select_as_arrow(select_query))  # type: ignore[return-value]
+
+    def select_as_dataframe(
+        self, select_query: Union[sa.sql.expression.Select, sa.sql.expression.TextClause]
+    ) -> pandas.DataFrame:
         """
         select data from db table and return pandas dataframe
         """
-        with self.session.begin() as cursor:
-            return pandas.DataFrame([row._asdict() for row in cursor.execute(select_query)])
+        return self.select_as_arrow(select_query).to_pandas()
 
     def select_as_list(
         self, select_query: Union[sa.sql.expression.Select, sa.sql.expression.TextClause]
@@ -395,6 +657,8 @@ class DatabaseManager:
         with self.session.begin() as cursor:
             return [row._asdict() for row in cursor.execute(select_query)]
 
+    # pylint: disable=R0914
+    # pylint too many local variables (more than 15)
     def write_to_parquet(
         self,
         select_query: Union[sa.sql.expression.Select, sa.sql.expression.TextClause],
@@ -406,7 +670,9 @@ class DatabaseManager:
         stream db query results to parquet file in batches
 
         this function is meant to limit memory usage when creating very large
-        parquet files from db SELECT
+        parquet files from db SELECT. results are written to a temporary csv
+        file with COPY and read back by arrow in batches, without creating a
+        python object per row.
 
         default batch_size of 1024*1024 is based on "row_group_size" parameter
         of ParquetWriter.write_batch(): row group size will be the minimum of
@@ -417,7 +683,7 @@ class DatabaseManager:
         :param select_query: query to execute
         :param write_path: local file path for resulting parquet file
         :param schema: schema of parquet file from select query
-        :param batch_size: number of records to stream from db per batch
+        :param batch_size: number of records per parquet row group
         """
         process_logger = ProcessLogger(
             "postgres_write_to_parquet",
@@ -426,19 +692,55 @@ class DatabaseManager:
         )
         process_logger.log_start()
 
-        part_stmt = select_query.execution_options(
-            stream_results=True,
-            max_row_buffer=batch_size,
-        )
-        with self.session.begin() as cursor:
-            with pq.ParquetWriter(write_path, schema=schema) as pq_writer:
-                for part in cursor.execute(part_stmt).partitions(batch_size):
-                    pq_writer.write_batch(
-                        pyarrow.RecordBatch.from_pylist([row._asdict() for row in part], schema=schema)
+        with tempfile.TemporaryFile() as csv_file:
+            with self.session.begin() as cursor:
+                csv_schema = self._copy_query_to_file(cursor, select_query, csv_file)
+
+                if csv_schema is None:
+                    process_logger.add_metadata(copy_query=False)
+                    part_stmt = select_query.execution_options(
+                        stream_results=True,
+                        max_row_buffer=batch_size,
                     )
+                    with pq.ParquetWriter(write_path, schema=schema) as pq_writer:
+                        for part in cursor.execute(part_stmt).partitions(batch_size):
+                            pq_writer.write_batch(
+                                pyarrow.RecordBatch.from_pylist([row._asdict() for row in part], schema=schema)
+                            )
+                    process_logger.log_complete()
+                    return
+
+            read_options, parse_options, convert_options = csv_read_options(csv_schema)
+            csv_reader = pv.open_csv(
+                csv_file,
+                read_options=read_options,
+                parse_options=parse_options,
+                convert_options=convert_options,
+            )
 
+            # csv batches are sized in bytes, collect them into row groups
+            # of batch_size records
+            with pq.ParquetWriter(write_path, schema=schema) as pq_writer:
+                batches: List[pyarrow.RecordBatch] = []
+                batch_rows = 0
+                for batch in csv_reader:
+                    batches.append(batch)
+                    batch_rows += batch.num_rows
+                    if batch_rows >= batch_size:
+                        table = pyarrow.Table.from_batches(batches).select(schema.names).cast(schema)
+                        pq_writer.write_table(table, row_group_size=batch_size)
+                        batches = []
+                        batch_rows = 0
+
+                if batch_rows > 0:
+                    table = pyarrow.Table.from_batches(batches).select(schema.names).cast(schema)
+                    pq_writer.write_table(table, row_group_size=batch_size)
+
+        process_logger.add_metadata(copy_query=True)
         process_logger.log_complete()
 
+    # pylint: enable=R0914
+
     def truncate_table(
         self,
         table_to_truncate: Any,
@@ -474,6 +776,66 @@ class DatabaseManager:
             cursor.execute(sa.text("END TRANSACTION;"))
             cursor.execute(sa.text(f"VACUUM (ANALYZE) {table_as};"))
 
+    def maintain_table(
+        self,
+        table: Any,
+        thresholds: MaintenanceThresholds = MaintenanceThresholds(),
+    ) -> Optional[str]:
+        """
+        run VACUUM (ANALYZE) or ANALYZE on table only when its
+        pg_stat_user_tables counters are past thresholds
+
+        :return maintenance command that was run, None if nothing was run
+        """
+        table_as = self._get_schema_table(table)
+        process_logger = ProcessLogger("maintain_table", table=str(table_as))
+        process_logger.log_start()
+
+        stats_query = sa.text(
+            """
+            SELECT
+                n_live_tup
+                , n_dead_tup
+                , n_mod_since_analyze
+                , EXTRACT(EPOCH FROM now() - GREATEST(last_analyze, last_autoanalyze)) AS analyze_age_seconds
+            FROM pg_stat_user_tables
+            WHERE schemaname = COALESCE(:schema, current_schema())
+                AND relname = :table_name
+            """
+        ).bindparams(schema=table_as.schema, table_name=table_as.name)
+        stats = self.select_as_list(stats_query)
+
+        if len(stats) == 0:
+            command: Optional[str] = "VACUUM (ANALYZE)"
+        else:
+            process_logger.add_metadata(**stats[0])
+            command = maintenance_command(stats[0], thresholds)
+
+        if command is not None:
+            with self.session.begin() as cursor:
+                cursor.execute(sa.text("END TRANSACTION;"))
+                cursor.execute(sa.text(f"{command} {table_as};"))
+
+        process_logger.add_metadata(command=command)
+        process_logger.log_complete()
+
+        return command
+
+    @contextmanager
+    def trip_trigger_disabled(self) -> Iterator[None]:
+        """
+        keep rt_trips_update_branch_trunk TRIGGER disabled on vehicle_trips table
+        for the duration of the context
+
+        used when several workers update vehicle_trips concurrently, so that
+        each statement does not have to ALTER the table on its own
+        """
+        self._disable_trip_trigger()
+        try:
+            yield
+        finally:
+            self._enable_trip_trigger()
+
     def _disable_trip_trigger(self) -> None:
         """
         DISABLE rt_trips_update_branch_trunk TRIGGER on vehicle_trips table
@@ -561,11 +923,89 @@ def get_unprocessed_files(
     return [paths_to_load[timestamp] for timestamp in sorted(paths_to_load.keys())][:file_limit]
 
 
+# metadata paths are written in batches of up to this many paths, collected
+# for up to this many seconds after the first path of a batch is received
+METADATA_BATCH_SIZE = 1000
+METADATA_BATCH_SECONDS = 1.0
+
+
+def _drain_metadata_queue(
+    metadata_queue: Queue[Optional[str]],
+    max_size: int = METADATA_BATCH_SIZE,
+    max_seconds: float = METADATA_BATCH_SECONDS,
+) -> Tuple[List[str], bool]:
+    """
+    wait for the next metadata path and collect the paths that follow it
+    into a batch, until the batch is full or max_seconds have passed
+
+    :return batch of unique paths in the order they were received, and True
+        if None was received from the queue
+    """
+    batch: Dict[str, None] = {}
+    metadata_path = metadata_queue.get()
+    deadline = time.monotonic() + max_seconds
+
+    while metadata_path is not None:
+        batch[metadata_path] = None
+        remaining = deadline - time.monotonic()
+        if len(batch) >= max_size or remaining <= 0:
+            return list(batch), False
+        try:
+            metadata_path = metadata_queue.get(timeout=remaining)
+        except Empty:
+            return list(batch), False
+
+    return list(batch), True
+
+
+def _insert_metadata_paths(engine: sa.engine.Engine, metadata_paths: List[str]) -> None:
+    """
+    insert a batch of metadata paths with a single multi-row insert, paths
+    that already exist are reset to unprocessed
+
+    all batches must be written, keep attempting until success
+    """
+    insert_statement = (
+        postgresql.insert(MetadataLog.__table__)
+        .values([{"path": metadata_path} for metadata_path in metadata_paths])
+        .on_conflict_do_update(
+            index_elements=[MetadataLog.path],
+            set_={
+                "rail_pm_processed": sa.false(),
+                "rail_pm_process_fail": sa.false(),
+                "created_on": now(),
+            },
+        )
+    )
+    insert_logger = ProcessLogger("metadata_insert", path_count=len(metadata_paths))
+    insert_logger.log_start()
+    retry_attempt = 0
+
+    # All metatdata_insert attempts must succeed, keep attempting until success
+    while True:
+        try:
+            with engine.begin() as cursor:
+                cursor.execute(insert_statement)
+
+        except Exception as e:
+            insert_logger.log_failure(e)
+            insert_logger.add_metadata(retry_attempt=retry_attempt)
+            retry_attempt += 1
+            # wait for gremlins to disappear
+            time.sleep(min(15, 2**retry_attempt))
+
+        else:
+            insert_logger.add_metadata(retry_attempts=retry_attempt)
+            insert_logger.log_complete()
+            break
+
+
 def _rds_writer_process(metadata_queue: Queue[Optional[str]]) -> None:
     """
     process for writing matadata paths recieved from metadata_queue
 
-    if None recieved from queue, process will exit
+    paths are written in batches. if None recieved from queue, the current
+    batch is written and the process will exit
     """
     process_logger = ProcessLogger("rds_writer_process")
     process_logger.log_start()
@@ -581,44 +1021,13 @@ def _rds_writer_process(metadata_queue: Queue[Optional[str]]) -> None:
     )
 
     while True:
-        metadata_path = metadata_queue.get()
+        metadata_paths, stop_writer = _drain_metadata_queue(metadata_queue)
 
-        if metadata_path is None:
-            break
+        if len(metadata_paths) > 0:
+            _insert_metadata_paths(engine, metadata_paths)
 
-        insert_statement = (
-            postgresql.insert(MetadataLog.__table__)
-            .values(path=metadata_path)
-            .on_conflict_do_update(
-                index_elements=[MetadataLog.path],
-                set_={
-                    "rail_pm_processed": sa.false(),
-                    "rail_pm_process_fail": sa.false(),
-                    "created_on": now(),
-                },
-            )
-        )
-        insert_logger = ProcessLogger("metadata_insert", filepath=metadata_path)
-        insert_logger.log_start()
-        retry_attempt = 0
-
-        # All metatdata_insert attempts must succeed, keep attempting until success
-        while True:
-            try:
-                with engine.begin() as cursor:
-                    cursor.execute(insert_statement)
-
-            except Exception as e:
-                insert_logger.log_failure(e)
-                insert_logger.add_metadata(retry_attempt=retry_attempt)
-                retry_attempt += 1
-                # wait for gremlins to disappear
-                time.sleep(15)
-
-            else:
-                insert_logger.add_metadata(retry_attempts=retry_attempt)
-                insert_logger.log_complete()
-                break
+        if stop_writer:
+            break
 
     process_logger.log_complete()
 
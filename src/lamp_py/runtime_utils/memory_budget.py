@@ -0,0 +1,16 @@
+import os
+
+import psutil
+
+
+def memory_budget(env_var: str) -> int:
+    """
+    memory in bytes that all worker processes of a job may use together
+
+    :param env_var: environment variable with the budget in megabytes,
+        defaults to 80% of system memory when unset
+    """
+    budget_mb = os.environ.get(env_var)
+    if budget_mb is not None:
+        return int(budget_mb) * 1024 * 1024
+    return int(psutil.virtual_memory().total * 0.8)
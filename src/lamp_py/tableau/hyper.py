@@ -20,6 +20,7 @@ from tableauhyperapi import (
 
 from lamp_py.postgres.postgres_utils import DatabaseManager
 from lamp_py.runtime_utils.process_logger import ProcessLogger
+from lamp_py.aws.client_pool import get_s3_filesystem
 from lamp_py.aws.s3 import (
     download_file,
     upload_file,
@@ -57,11 +58,20 @@ class HyperJob(ABC):  # pylint: disable=R0902
         self.project_name = project_name
         self.local_parquet_path = "/tmp/local.parquet"
         self.local_hyper_path = f"/tmp/{hyper_file_name}"
-        self.remote_fs = fs.LocalFileSystem()
-        if remote_parquet_path.startswith("s3://"):
-            self.remote_fs = fs.S3FileSystem()
+        self.remote_is_s3 = remote_parquet_path.startswith("s3://")
+        if self.remote_is_s3:
             self.remote_parquet_path = self.remote_parquet_path.replace("s3://", "")
 
+    @property
+    def remote_fs(self) -> fs.FileSystem:
+        """
+        filesystem of the remote parquet path, s3 filesystems are shared
+        through the aws client pool
+        """
+        if self.remote_is_s3:
+            return get_s3_filesystem()
+        return fs.LocalFileSystem()
+
     @property
     @abstractmethod
     def output_processed_schema(self) -> pyarrow.schema:
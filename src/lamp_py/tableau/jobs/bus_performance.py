@@ -4,7 +4,6 @@ from datetime import timezone
 import pyarrow
 import pyarrow.parquet as pq
 import pyarrow.dataset as pd
-from pyarrow.fs import S3FileSystem
 
 import polars as pl
 
@@ -15,6 +14,7 @@ from lamp_py.tableau.conversions.convert_bus_performance_data import apply_bus_a
 from lamp_py.runtime_utils.remote_files import bus_events
 from lamp_py.runtime_utils.remote_files import tableau_bus_all
 from lamp_py.runtime_utils.remote_files import tableau_bus_recent
+from lamp_py.aws.client_pool import get_s3_filesystem
 from lamp_py.aws.s3 import file_list_from_s3
 from lamp_py.aws.s3 import file_list_from_s3_with_details
 from lamp_py.aws.s3 import object_exists
@@ -105,7 +105,7 @@ def create_bus_parquet(job: HyperJob, num_files: Optional[int]) -> None:
     ds = pd.dataset(
         ds_paths,
         format="parquet",
-        filesystem=S3FileSystem(),
+        filesystem=get_s3_filesystem(),
     )
 
     with pq.ParquetWriter(job.local_parquet_path, schema=job.output_processed_schema) as writer:
@@ -4,7 +4,6 @@ import pyarrow
 import pyarrow.parquet as pq
 import pyarrow.dataset as pd
 import pyarrow.compute as pc
-from pyarrow.fs import S3FileSystem
 
 import polars as pl
 
@@ -13,6 +12,7 @@ from lamp_py.tableau.hyper import HyperJob
 from lamp_py.postgres.postgres_utils import DatabaseManager
 from lamp_py.runtime_utils.remote_files import S3Location
 
+from lamp_py.aws.client_pool import get_s3_filesystem
 from lamp_py.aws.s3 import file_list_from_s3, file_list_from_s3_date_range
 
 
@@ -133,7 +133,7 @@ class FilteredHyperJob(HyperJob):
         ds = pd.dataset(
             ds_paths,
             format="parquet",
-            filesystem=S3FileSystem(),
+            filesystem=get_s3_filesystem(),
         )
         process_logger.log_start()
         if len(ds_paths) == 0:
@@ -3,6 +3,7 @@ import pyarrow.dataset as pd
 
 import polars as pl
 
+from lamp_py.aws.client_pool import get_s3_filesystem
 from lamp_py.aws.s3 import file_list_from_s3
 from lamp_py.runtime_utils.remote_files import S3Location
 from typing import List
@@ -85,7 +86,7 @@ def default_converter_from_s3(input_location: S3Location) -> pyarrow.Schema:
         ds = pd.dataset(
             ds_paths,
             format="parquet",
-            filesystem=pyarrow.fs.S3FileSystem(),
+            filesystem=get_s3_filesystem(),
         )
         first_batch = next(ds.to_batches(batch_size=10, batch_readahead=0, fragment_readahead=0))
         table = PolarsDataFrameConverter(pl.from_arrow(first_batch)).convert_to_tableau_flat_schema()
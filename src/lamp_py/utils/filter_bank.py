@@ -2,7 +2,9 @@ import itertools
 import pyarrow.compute as pc
 import pyarrow as pa
 
-SERVICE_DATE_END_HOUR = 3
+# hour of the day in boston local time before which timestamps belong to the
+# previous days service. changed from 3 -> 4 ahead of 2025 Fall Rating
+SERVICE_DATE_END_HOUR = 4
 
 
 class LightRailFilter:
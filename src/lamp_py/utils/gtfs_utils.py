@@ -1,17 +1,39 @@
+import os
 from datetime import date
-from typing import List
+from typing import List, Optional
 import polars as pl
 
-from lamp_py.aws.s3 import object_exists
+from lamp_py.aws.s3 import cached_download, object_exists
 from lamp_py.runtime_utils.process_logger import ProcessLogger
 from lamp_py.runtime_utils.remote_files import compressed_gtfs
 
+# local copies of s3 gtfs archive files, see cached_download
+GTFS_CACHE_DIR = os.path.join(os.getenv("TEMP_DIR", default="/tmp"), "gtfs_archive_cache")
+
+
+def cached_gtfs_file(gtfs_file: str) -> Optional[str]:
+    """
+    Get path to read a GTFS archive file from
+
+    s3 objects are downloaded to GTFS_CACHE_DIR and only downloaded again when
+    they are replaced, other paths are returned as is.
+
+    :param gtfs_file: s3 uri (or local path) of GTFS archive parquet file
+
+    :return path of file to read, None if the file does not exist
+    """
+    if not gtfs_file.startswith("s3://"):
+        return gtfs_file if object_exists(gtfs_file) else None
+
+    return cached_download(gtfs_file, GTFS_CACHE_DIR)
+
 
 def gtfs_from_parquet(file: str, service_date: date) -> pl.DataFrame:
     """
     Get GTFS data from specified file and service date
 
-    This will read from s3_uri of file
+    This will read from a local copy of the s3_uri of file, see cached_gtfs_file,
+    only reading row groups active on service_date
 
     :param file: gtfs file to acces (i.e. "feed_info")
     :param service_date: service date of requested GTFS data
@@ -25,11 +47,10 @@ def gtfs_from_parquet(file: str, service_date: date) -> pl.DataFrame:
     gtfs_year = service_date.year
     service_date_int = int(service_date.strftime("%Y%m%d"))
 
-    gtfs_file = compressed_gtfs.parquet_path(gtfs_year, file).s3_uri
-
-    if not object_exists(gtfs_file):
-        gtfs_file = compressed_gtfs.parquet_path(gtfs_year - 1, file).s3_uri
-        if not object_exists(gtfs_file):
+    gtfs_file = cached_gtfs_file(compressed_gtfs.parquet_path(gtfs_year, file).s3_uri)
+    if gtfs_file is None:
+        gtfs_file = cached_gtfs_file(compressed_gtfs.parquet_path(gtfs_year - 1, file).s3_uri)
+        if gtfs_file is None:
             exception = FileNotFoundError(f"No GTFS archive files available for {service_date}")
             logger.log_failure(exception)
             raise exception
@@ -37,12 +58,13 @@ def gtfs_from_parquet(file: str, service_date: date) -> pl.DataFrame:
     logger.add_metadata(gtfs_file=gtfs_file)
 
     gtfs_df = (
-        pl.read_parquet(gtfs_file)
+        pl.scan_parquet(gtfs_file)
         .filter(
             (pl.col("gtfs_active_date") <= service_date_int),
             (pl.col("gtfs_end_date") >= service_date_int),
         )
         .drop(["gtfs_active_date", "gtfs_end_date"])
+        .collect()
     )
     logger.add_metadata(gtfs_row_count=gtfs_df.shape[0])
     logger.log_complete()
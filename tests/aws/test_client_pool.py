@@ -0,0 +1,46 @@
+import os
+from multiprocessing import get_context
+from queue import Queue
+
+import pytest
+
+from lamp_py.aws.client_pool import POOL, get_client, get_s3_filesystem
+
+
+def test_pooled_clients_are_reused(monkeypatch: pytest.MonkeyPatch) -> None:
+    """It reuses clients until they have been idle for too long."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    monkeypatch.setenv("AWS_MAX_ATTEMPTS", "7")
+
+    s3_client = get_client("s3")
+    assert get_client("s3") is s3_client
+    assert get_client("rds") is not s3_client
+    assert s3_client.meta.config.retries["total_max_attempts"] == 7
+
+    s3_filesystem = get_s3_filesystem()
+    assert get_s3_filesystem() is s3_filesystem
+
+    monkeypatch.setattr("lamp_py.aws.client_pool.IDLE_SECONDS", -1)
+    assert get_client("s3") is not s3_client
+    assert get_s3_filesystem() is not s3_filesystem
+
+
+def pooled_client_id(result_queue: Queue) -> None:
+    """Report the id of the pooled s3 client from a forked process."""
+    result_queue.put(id(POOL.clients["client_s3"].value) if "client_s3" in POOL.clients else None)
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="fork start method is not available")
+def test_pool_resets_in_forked_process(monkeypatch: pytest.MonkeyPatch) -> None:
+    """It does not share pooled clients with forked processes."""
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+    get_client("s3")
+
+    context = get_context("fork")
+    result_queue = context.Queue()
+    process = context.Process(target=pooled_client_id, args=(result_queue,))
+    process.start()
+    process.join()
+
+    assert result_queue.get() is None
+    assert "client_s3" in POOL.clients
@@ -7,6 +7,7 @@ import logging
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Iterator
 from unittest.mock import patch
 
 import boto3
@@ -16,7 +17,14 @@ from botocore.stub import ANY, Stubber
 from polars.testing import assert_frame_equal
 from pyarrow.fs import LocalFileSystem
 
-from lamp_py.aws.s3 import file_list_from_s3, file_list_from_s3_date_range, move_s3_objects, replace_remote_parquet
+from lamp_py.aws.s3 import (
+    file_list_from_s3,
+    file_list_from_s3_date_range,
+    file_list_from_s3_strict,
+    file_list_from_s3_with_details,
+    move_s3_objects,
+    replace_remote_parquet,
+)
 from lamp_py.runtime_utils.remote_files import S3_SPRINGBOARD
 
 from ..test_resources import incoming_dir
@@ -128,6 +136,138 @@ def test_file_list_s3(s3_stub):  # type: ignore
     assert files == should_files
 
 
+class FakeListClient:
+    """In-memory stand-in for the list_objects_v2 calls of an s3 client."""
+
+    def __init__(self, keys: list[str], page_size: int = 3) -> None:
+        self.keys = sorted(keys)
+        self.page_size = page_size
+        self.list_calls = 0
+
+    def list_objects_v2(self, **kwargs) -> dict:  # type: ignore
+        """List one page of keys, grouping keys into common prefixes if a delimiter is passed."""
+        self.list_calls += 1
+        prefix = kwargs["Prefix"]
+        start = kwargs.get("ContinuationToken", kwargs.get("StartAfter", ""))
+        entries: list[tuple[str, bool]] = []
+        for key in self.keys:
+            if not key.startswith(prefix) or key <= start:
+                continue
+            if "Delimiter" in kwargs and "/" in key[len(prefix) :]:
+                common_prefix = key[: key.index("/", len(prefix)) + 1]
+                if common_prefix > start and (common_prefix, True) not in entries:
+                    entries.append((common_prefix, True))
+                continue
+            entries.append((key, False))
+
+        page = entries[: self.page_size]
+        response: dict = {
+            "KeyCount": len(page),
+            "IsTruncated": len(entries) > self.page_size,
+            "Contents": [
+                {"Key": key, "Size": 1, "LastModified": datetime(2024, 1, 1)}
+                for key, is_prefix in page
+                if not is_prefix
+            ],
+            "CommonPrefixes": [{"Prefix": key} for key, is_prefix in page if is_prefix],
+        }
+        if response["IsTruncated"]:
+            response["NextContinuationToken"] = page[-1][0]
+        return response
+
+    def get_paginator(self, _: str) -> "FakeListClient":
+        """The fake client is its own paginator."""
+        return self
+
+    def paginate(self, **kwargs) -> Iterator[dict]:  # type: ignore
+        """Yield pages until the listing is not truncated."""
+        while True:
+            page = self.list_objects_v2(**kwargs)
+            yield page
+            if not page["IsTruncated"]:
+                return
+            kwargs["ContinuationToken"] = page["NextContinuationToken"]
+
+
+def test_file_list_s3_fan_out() -> None:
+    """
+    Test that prefixes with more than a page of objects are listed by
+    sub-prefix and returned in key order
+    """
+    keys = [
+        f"lamp/RT_VEHICLE_POSITIONS/year=2024/month={month}/day={day}/{hour:02d}.parquet"
+        for month in (1, 2, 10)
+        for day in (1, 2, 15)
+        for hour in range(4)
+    ]
+    keys += ["lamp/RT_VEHICLE_POSITIONS/manifest.json", "lamp/other/file.parquet"]
+    client = FakeListClient(keys)
+    expected = [f"s3://bucket/{key}" for key in sorted(keys) if key.startswith("lamp/RT_VEHICLE_POSITIONS/")]
+
+    with patch("lamp_py.aws.s3.get_s3_client", return_value=client):
+        # few workers stop discovering sub-prefixes early and list whole partitions
+        for list_workers in (2, 16):
+            with patch("lamp_py.aws.s3.S3_LIST_WORKERS", list_workers):
+                assert file_list_from_s3("bucket", "lamp/RT_VEHICLE_POSITIONS/") == expected
+                assert file_list_from_s3("bucket", "lamp/RT_VEHICLE_POSITIONS") == expected
+                assert file_list_from_s3("bucket", "lamp/RT_VEHICLE_POSITIONS/", max_list_size=10) == expected[:11]
+                assert file_list_from_s3("bucket", "lamp/RT_VEHICLE_POSITIONS/", in_filter="day=15") == [
+                    path for path in expected if "day=15" in path
+                ]
+
+                start_after = "lamp/RT_VEHICLE_POSITIONS/year=2024/month=10/day=1/02.parquet"
+                assert [
+                    obj["s3_obj_path"]
+                    for obj in file_list_from_s3_with_details(
+                        "bucket", "lamp/RT_VEHICLE_POSITIONS/", start_after=start_after
+                    )
+                ] == [path for path in expected if path > f"s3://bucket/{start_after}"]
+
+        assert file_list_from_s3_date_range(
+            bucket_name="bucket",
+            file_prefix="lamp/RT_VEHICLE_POSITIONS/",
+            path_template="year={yy}/month={mm}/day={dd}/",
+            start_date=datetime(2024, 1, 2),
+            end_date=datetime(2024, 2, 1),
+        ) == [
+            path for day in ("month=1/day=2/", "month=1/day=15/", "month=2/day=1/") for path in expected if day in path
+        ]
+
+
+def test_file_list_s3_fan_out_flat() -> None:
+    """
+    Test that listing a prefix of mostly direct objects stops at max_list_size
+    """
+    keys = [f"lamp/flat/{index:03d}.parquet" for index in range(300)] + ["lamp/flat/050/file.parquet"]
+    client = FakeListClient(keys)
+    expected = [f"s3://bucket/{key}" for key in sorted(keys)]
+
+    with patch("lamp_py.aws.s3.get_s3_client", return_value=client):
+        assert file_list_from_s3("bucket", "lamp/flat/", max_list_size=10) == expected[:11]
+        assert client.list_calls < 10
+
+        assert file_list_from_s3("bucket", "lamp/flat/", max_list_size=60) == expected[:61]
+        assert file_list_from_s3("bucket", "lamp/flat/") == expected
+
+
+def test_file_list_s3_strict() -> None:
+    """
+    Test that strict listings return the same paths, and raise listing errors
+    """
+    keys = [f"lamp/flat/{index:03d}.parquet" for index in range(10)]
+    with patch("lamp_py.aws.s3.get_s3_client", return_value=FakeListClient(keys)):
+        assert file_list_from_s3_strict("bucket", "lamp/flat/") == file_list_from_s3("bucket", "lamp/flat/")
+
+    failing_client = FakeListClient(keys)
+    with (
+        patch.object(failing_client, "list_objects_v2", side_effect=ConnectionError("SlowDown")),
+        patch("lamp_py.aws.s3.get_s3_client", return_value=failing_client),
+    ):
+        assert not file_list_from_s3("bucket", "lamp/flat/")
+        with pytest.raises(ConnectionError):
+            file_list_from_s3_strict("bucket", "lamp/flat/")
+
+
 def test_move_bad_objects(s3_stub, caplog):  # type: ignore
     """
     Test that unsuccesful moves are correctly logged
@@ -155,6 +295,39 @@ def test_move_bad_objects(s3_stub, caplog):  # type: ignore
     assert found_error
 
 
+def test_move_objects_batched_delete(s3_stub):  # type: ignore
+    """
+    Test that copied objects are deleted in batches and objects that could not
+    be deleted are moved again
+    """
+    files = ["s3://incoming/lamp/a.json.gz", "s3://incoming/lamp/b.json.gz"]
+
+    for _ in files:
+        s3_stub.add_response("copy_object", {}, {"CopySource": ANY, "Bucket": "archive", "Key": ANY})
+    s3_stub.add_response(
+        "delete_objects",
+        {"Errors": [{"Key": "lamp/b.json.gz", "Code": "InternalError"}]},
+        {
+            "Bucket": "incoming",
+            "Delete": {"Objects": ANY, "Quiet": True},
+        },
+    )
+    s3_stub.add_response(
+        "copy_object",
+        {},
+        {"CopySource": {"Bucket": "incoming", "Key": "lamp/b.json.gz"}, "Bucket": "archive", "Key": "lamp/b.json.gz"},
+    )
+    s3_stub.add_response(
+        "delete_objects",
+        {},
+        {"Bucket": "incoming", "Delete": {"Objects": [{"Key": "lamp/b.json.gz"}], "Quiet": True}},
+    )
+
+    with s3_stub, patch("lamp_py.aws.s3.time.sleep") as sleep:
+        assert not move_s3_objects(files, "archive/lamp")
+    sleep.assert_called_once()
+
+
 @pytest.mark.parametrize(
     ["remote_file_path", "local_records", "upload_succeeds", "log_text", "expected_result"],
     [
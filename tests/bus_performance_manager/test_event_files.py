@@ -0,0 +1,108 @@
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+from unittest import mock
+
+import polars as pl
+
+from lamp_py.aws.s3 import dt_from_obj_path
+from lamp_py.bus_performance_manager.event_files import (
+    filename_date_expr,
+    partition_date_expr,
+    refresh_file_manifest,
+    service_date_from_filename,
+)
+from lamp_py.runtime_utils.remote_files import S3Location
+
+
+class FakeBucket:
+    """
+    stand in for file_list_from_s3_with_details, recording listed prefixes
+    """
+
+    def __init__(self, keys: List[str]) -> None:
+        self.keys = keys
+        self.listings: List[Dict[str, Optional[str]]] = []
+
+    def __call__(self, bucket_name: str, file_prefix: str, start_after: Optional[str] = None) -> List[Dict]:
+        """list objects in key order"""
+        self.listings.append({"file_prefix": file_prefix, "start_after": start_after})
+        return [
+            {
+                "s3_obj_path": f"s3://{bucket_name}/{key}",
+                "size_bytes": 1,
+                "last_modified": datetime(2024, 1, 1, tzinfo=timezone.utc),
+            }
+            for key in sorted(self.keys)
+            if key.startswith(file_prefix) and (start_after is None or key > start_after)
+        ]
+
+
+def test_file_date_exprs() -> None:
+    """
+    test that vectorized file dates match the per path functions
+    """
+    vp_paths = [
+        "s3://springboard/lamp/RT_VEHICLE_POSITIONS/year=2024/month=1/day=2/hour=3/file-0.parquet",
+        "s3://springboard/lamp/RT_VEHICLE_POSITIONS/year=2024/month=10/day=31/2024-10-31T00:00:00.parquet",
+    ]
+    vp_dates = pl.DataFrame({"s3_obj_path": vp_paths}).select(partition_date_expr()).to_series().to_list()
+    assert vp_dates == [dt_from_obj_path(path).date() for path in vp_paths]
+
+    tm_paths = [
+        "s3://springboard/TM/STOP_CROSSING/120240811.parquet",
+        "s3://springboard/TM/STOP_CROSSING/lamp_version.json",
+    ]
+    tm_dates = pl.DataFrame({"s3_obj_path": tm_paths}).select(filename_date_expr()).to_series().to_list()
+    assert tm_dates == [service_date_from_filename(path) for path in tm_paths]
+
+
+def test_refresh_file_manifest(tmp_path: Path) -> None:
+    """
+    test that the first refresh lists all files, and later refreshes only
+    list files from the day before the latest file date onward
+    """
+    location = S3Location(bucket="springboard", prefix="TM/STOP_CROSSING")
+    vp_location = S3Location(bucket="springboard", prefix="lamp/RT_VEHICLE_POSITIONS")
+    fake_bucket = FakeBucket(
+        [f"TM/STOP_CROSSING/1202401{day:02d}.parquet" for day in range(1, 11)]
+        + ["TM/STOP_CROSSING/lamp_version.json"]
+        + [f"lamp/RT_VEHICLE_POSITIONS/year=2024/month=1/day={day}/hour=1/file.parquet" for day in range(1, 11)]
+    )
+
+    with (
+        mock.patch("lamp_py.bus_performance_manager.event_files.MANIFEST_DIR", tmp_path),
+        mock.patch("lamp_py.bus_performance_manager.event_files.file_list_from_s3_with_details", fake_bucket),
+    ):
+        manifest = refresh_file_manifest("tm", location, filename_date_expr())
+        assert manifest.shape[0] == 10
+        assert fake_bucket.listings == [{"file_prefix": "TM/STOP_CROSSING", "start_after": None}]
+
+        # new file, listed after the last key before the lookback
+        fake_bucket.keys.append("TM/STOP_CROSSING/120240111.parquet")
+        fake_bucket.listings.clear()
+        manifest = refresh_file_manifest("tm", location, filename_date_expr())
+        assert manifest.get_column("file_date").to_list() == [date(2024, 1, day) for day in range(1, 12)]
+        assert fake_bucket.listings == [
+            {"file_prefix": "TM/STOP_CROSSING", "start_after": "TM/STOP_CROSSING/120240108.parquet"}
+        ]
+
+        # removed files in the lookback are dropped from the manifest
+        fake_bucket.keys.remove("TM/STOP_CROSSING/120240111.parquet")
+        manifest = refresh_file_manifest("tm", location, filename_date_expr())
+        assert manifest.shape[0] == 10
+
+        # partitioned files are listed by day
+        fake_bucket.listings.clear()
+        day_prefix = "year={yy}/month={mm}/day={dd}/"
+        refresh_file_manifest("vp", vp_location, partition_date_expr(), day_prefix=day_prefix)
+        with mock.patch("lamp_py.bus_performance_manager.event_files.datetime") as datetime_patch:
+            datetime_patch.now.return_value = datetime(2024, 1, 11, 5, tzinfo=timezone.utc)
+            manifest = refresh_file_manifest("vp", vp_location, partition_date_expr(), day_prefix=day_prefix)
+        assert manifest.shape[0] == 10
+        assert [listing["file_prefix"] for listing in fake_bucket.listings] == [
+            "lamp/RT_VEHICLE_POSITIONS",
+            "lamp/RT_VEHICLE_POSITIONS/year=2024/month=1/day=9/",
+            "lamp/RT_VEHICLE_POSITIONS/year=2024/month=1/day=10/",
+            "lamp/RT_VEHICLE_POSITIONS/year=2024/month=1/day=11/",
+        ]
@@ -1,4 +1,5 @@
 import os
+from pathlib import Path
 from unittest import mock
 from datetime import datetime, timedelta, date, timezone
 from random import randint
@@ -173,6 +174,75 @@ def test_read_vehicle_positions(exists_patch: mock.MagicMock) -> None:
         assert VP_SCHEMA[col] == data_type
 
 
+def test_read_vehicle_positions_schema_drift(tmp_path: Path) -> None:
+    """
+    test that vehicle positions are read from files with missing, all null and
+    differently typed columns, with a single schema
+    """
+    service_date = date(2024, 6, 1)
+
+    def vehicle_position(route_id: str, start_date: str = "20240601", stop_id: str | None = "1") -> dict:
+        return {
+            "vehicle.trip.route_id": route_id,
+            "vehicle.trip.trip_id": "trip",
+            "vehicle.trip.direction_id": 1,
+            "vehicle.trip.start_time": "08:00:00",
+            "vehicle.trip.start_date": start_date,
+            "vehicle.stop_id": stop_id,
+            "vehicle.current_stop_sequence": 2,
+            "vehicle.current_status": "INCOMING_AT",
+            "vehicle.timestamp": 1717243200,
+            "vehicle.vehicle.id": "y1234",
+            "vehicle.vehicle.label": "1234",
+            "vehicle.position.latitude": 42.35,
+            "vehicle.position.longitude": -71.06,
+        }
+
+    positions = pl.DataFrame(
+        [
+            vehicle_position("1"),
+            vehicle_position("Red"),
+            vehicle_position("1", start_date="20240531"),
+            vehicle_position("1", stop_id=None),
+        ]
+    )
+    drifted_files = {
+        # unsigned and float columns
+        "unsigned.parquet": positions.with_columns(
+            pl.col("vehicle.trip.direction_id").cast(pl.UInt8),
+            pl.col("vehicle.timestamp").cast(pl.UInt64),
+            pl.col("vehicle.current_stop_sequence").cast(pl.Float64),
+        ),
+        # missing optional columns and an extra column
+        "missing.parquet": positions.drop(
+            "vehicle.vehicle.label", "vehicle.position.latitude", "vehicle.position.longitude"
+        ).with_columns(pl.lit(None).alias("vehicle.occupancy_status")),
+        # all null required column, no bus vehicle positions
+        "null.parquet": positions.with_columns(pl.lit(None).alias("vehicle.trip.start_date")),
+    }
+    for filename, drifted_positions in drifted_files.items():
+        drifted_positions.write_parquet(tmp_path.joinpath(filename))
+
+    with mock.patch(
+        "lamp_py.bus_performance_manager.events_gtfs_rt.bus_route_ids_for_service_date", return_value=["1"]
+    ):
+        vehicle_positions = read_vehicle_positions(
+            service_date=service_date,
+            gtfs_rt_files=[str(tmp_path.joinpath(filename)) for filename in drifted_files],
+        )
+        empty_positions = read_vehicle_positions(service_date=service_date, gtfs_rt_files=[])
+
+    assert dict(vehicle_positions.schema) == VP_SCHEMA
+    assert dict(empty_positions.schema) == VP_SCHEMA
+    assert empty_positions.shape[0] == 0
+
+    # one bus vehicle position on the service date from each readable file
+    assert vehicle_positions.shape[0] == 2
+    assert vehicle_positions["current_status"].to_list() == ["IN_TRANSIT_TO", "IN_TRANSIT_TO"]
+    assert vehicle_positions["vehicle_label"].to_list() == ["1234", None]
+    assert vehicle_positions["vehicle_timestamp"].to_list() == [datetime(2024, 6, 1, 12)] * 2
+
+
 def route_one() -> pl.DataFrame:
     """
     straight forward vehicle positions dataframe
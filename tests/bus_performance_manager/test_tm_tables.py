@@ -0,0 +1,21 @@
+from unittest import mock
+
+from lamp_py.bus_performance_manager.tm_tables import scan_tm_table, TM_TABLE_CACHE_DIR
+from lamp_py.runtime_utils.remote_files import S3Location
+
+from ..test_resources import tm_geo_node_file
+
+
+def test_scan_tm_table() -> None:
+    """
+    test that s3 TransitMaster exports are scanned from their local cached copy
+    """
+    local_geo_nodes = scan_tm_table(tm_geo_node_file).collect()
+    assert local_geo_nodes.shape[0] > 0
+
+    s3_geo_node_file = S3Location(bucket="springboard", prefix="TM/TMMAIN_GEO_NODE.parquet")
+    with mock.patch(
+        "lamp_py.bus_performance_manager.tm_tables.cached_download", return_value=tm_geo_node_file.s3_uri
+    ) as cached_patch:
+        assert scan_tm_table(s3_geo_node_file).collect().equals(local_geo_nodes)
+    cached_patch.assert_called_once_with("s3://springboard/TM/TMMAIN_GEO_NODE.parquet", TM_TABLE_CACHE_DIR)
@@ -0,0 +1,89 @@
+import os
+from datetime import date
+from typing import Dict, List
+from unittest import mock
+
+import pytest
+
+from lamp_py.bus_performance_manager.write_events import (
+    bus_metrics_filename,
+    operator_mapping_filename,
+    regenerate_bus_metrics_recent,
+    service_date_workers,
+)
+
+
+def test_service_date_workers() -> None:
+    """
+    test that service date workers are limited by dates, cpus and memory budget
+    """
+    with mock.patch.dict(os.environ, {"BUS_METRICS_MEMORY_BUDGET_MB": str(3 * 4 * 1024)}):
+        with mock.patch("os.cpu_count", return_value=8):
+            assert service_date_workers(1) == 1
+            assert service_date_workers(2) == 2
+            assert service_date_workers(10) == 3
+
+        with mock.patch("os.cpu_count", return_value=2):
+            assert service_date_workers(10) == 2
+
+    # always process at least one service date
+    with mock.patch.dict(os.environ, {"BUS_METRICS_MEMORY_BUDGET_MB": "1"}):
+        assert service_date_workers(10) == 1
+
+
+def test_regenerate_bus_metrics_recent_missing_days() -> None:
+    """
+    test that days missing bus events or operator mappings are found from a
+    single listing of each and regenerated together
+    """
+    expected_dates = [date(2024, 1, day) for day in range(7, 11)]
+
+    def list_files(bucket_name: str, file_prefix: str) -> List[str]:
+        if "operator_mapping" in file_prefix:
+            filenames = [operator_mapping_filename(day) for day in expected_dates if day != date(2024, 1, 8)]
+        else:
+            filenames = [bus_metrics_filename(day) for day in expected_dates if day != date(2024, 1, 9)]
+        return [f"s3://{bucket_name}/{file_prefix}/{filename}" for filename in filenames]
+
+    event_files: Dict[date, Dict[str, List[str]]] = {
+        day: {"gtfs_rt": [], "transit_master_stop_crossing": [], "transit_master_daily_work_piece": []}
+        for day in expected_dates
+    }
+
+    with (
+        mock.patch(
+            "lamp_py.bus_performance_manager.write_events.get_last_modified_object",
+            return_value={"s3_obj_path": "s3://public/lamp/bus_vehicle_events/20240110.parquet"},
+        ),
+        mock.patch("lamp_py.bus_performance_manager.write_events.pq.read_schema", return_value=None),
+        mock.patch(
+            "lamp_py.bus_performance_manager.write_events.file_list_from_s3_strict", side_effect=list_files
+        ) as list_patch,
+        mock.patch(
+            "lamp_py.bus_performance_manager.write_events.event_files_to_load", return_value=event_files
+        ) as load_patch,
+        mock.patch("lamp_py.bus_performance_manager.write_events.write_bus_metrics_for_dates") as write_patch,
+    ):
+        regenerate_bus_metrics_recent(num_days=3)
+
+    assert list_patch.call_count == 2
+    load_patch.assert_called_once_with(start_date=date(2024, 1, 8), end_date=date(2024, 1, 9))
+    write_patch.assert_called_once()
+    assert list(write_patch.call_args.args[0].keys()) == [date(2024, 1, 8), date(2024, 1, 9)]
+
+    # failed listings are raised instead of regenerating every day
+    with (
+        mock.patch(
+            "lamp_py.bus_performance_manager.write_events.get_last_modified_object",
+            return_value={"s3_obj_path": "s3://public/lamp/bus_vehicle_events/20240110.parquet"},
+        ),
+        mock.patch("lamp_py.bus_performance_manager.write_events.pq.read_schema", return_value=None),
+        mock.patch(
+            "lamp_py.bus_performance_manager.write_events.file_list_from_s3_strict",
+            side_effect=ConnectionError("SlowDown"),
+        ),
+        mock.patch("lamp_py.bus_performance_manager.write_events.write_bus_metrics_for_dates") as write_patch,
+        pytest.raises(ConnectionError),
+    ):
+        regenerate_bus_metrics_recent(num_days=3)
+    write_patch.assert_not_called()
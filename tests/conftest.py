@@ -16,6 +16,10 @@ from _pytest.monkeypatch import MonkeyPatch
 from pyarrow import fs
 import pyarrow.dataset as pd
 
+from lamp_py.aws.client_pool import POOL
+from lamp_py.performance_manager.gtfs_utils import STATIC_SCHEDULE_CACHE
+from lamp_py.performance_manager.l0_gtfs_rt_events import TRIP_EVENT_STATE
+
 from .test_resources import LocalS3Location
 
 
@@ -70,7 +74,32 @@ def fixture_remote_file_locations_patch(
     yield
 
 
+@pytest.fixture(autouse=True, name="client_pool_reset")
+def fixture_client_pool_reset() -> Iterator[None]:
+    """
+    aws clients and filesystems are pooled for the life of a process. start
+    each test with an empty pool, so patched clients do not leak between tests.
+    """
+    POOL.reset()
+    yield
+    POOL.reset()
+
+
 @pytest.fixture(name="dy_gen", scope="session")
 def fixture_dataframely_random_generator() -> Iterator:
     "Fixture wrapper around dataframely random data generator."
     yield dy.random.Generator()
+
+
+@pytest.fixture(autouse=True, name="static_schedule_cache_clear")
+def fixture_static_schedule_cache_clear() -> Iterator[None]:
+    """
+    static schedule lookups and processed trip events are cached for the life
+    of a process. start each test with empty caches, so state from another
+    test database does not leak.
+    """
+    STATIC_SCHEDULE_CACHE.clear()
+    TRIP_EVENT_STATE.clear()
+    yield
+    STATIC_SCHEDULE_CACHE.clear()
+    TRIP_EVENT_STATE.clear()
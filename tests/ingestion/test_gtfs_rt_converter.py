@@ -1,11 +1,14 @@
 # pylint: disable=[R0913, R0917]
+import gzip
+import json
 import os
 from datetime import datetime
 from pathlib import Path
 from queue import Queue
-from shutil import copy2
+from shutil import copy2, rmtree
 from typing import (
     Callable,
+    List,
     Optional,
 )
 from unittest.mock import patch
@@ -14,6 +17,7 @@ from zoneinfo import ZoneInfo
 import dataframely as dy
 import pandas
 import polars as pl
+import pyarrow
 import pytest
 from polars.testing import assert_frame_equal
 from pyarrow import fs
@@ -23,7 +27,7 @@ from lamp_py.ingestion.config_busloc_vehicle import BusLocVehicleRecord
 from lamp_py.ingestion.config_rt_alerts import AlertsRecord, ProposedAlertsRecord
 from lamp_py.ingestion.convert_gtfs_rt import GtfsRtConverter
 from lamp_py.ingestion.converter import ConfigType
-from lamp_py.ingestion.utils import flatten_table_schema
+from lamp_py.ingestion.utils import flatten_table_schema, gtfs_rt_json_to_table
 from lamp_py.runtime_utils.remote_files import LAMP, S3_SPRINGBOARD
 
 from tests.test_resources import (
@@ -402,6 +406,8 @@ def test_convert(
         df.write_ndjson(incoming_file, compression="gzip")
 
         monkeypatch.setattr(converter, "tmp_folder", tmp_path.as_posix())
+        # upload the full day file on every conversion
+        monkeypatch.setattr(converter, "compaction_interval", 0)
         converter.add_files([str(incoming_file)])
         converter.convert()
         dfs.append(df)
@@ -433,3 +439,202 @@ def test_convert(
 
     assert_frame_equal(converted_records, expected_records, check_row_order=False, check_column_order=False)
     converter.detail.table_schema.validate(converted_records)
+
+
+@pytest.mark.parametrize(
+    ["filename", "config_type"],
+    [
+        (
+            "2022-07-05T12:35:16Z_https_cdn.mbta.com_realtime_VehiclePositions_enhanced.json.gz",
+            ConfigType.RT_VEHICLE_POSITIONS,
+        ),
+        (
+            "2022-05-08T06:04:57Z_https_cdn.mbta.com_realtime_TripUpdates_enhanced.json.gz",
+            ConfigType.RT_TRIP_UPDATES,
+        ),
+        (
+            "2022-06-28T10_03_18Z_https_mbta_busloc_s3.s3.amazonaws.com_prod_TripUpdates_enhanced.json.gz",
+            ConfigType.BUS_TRIP_UPDATES,
+        ),
+        ("one_blank_record.json.gz", ConfigType.RT_ALERTS),
+    ],
+)
+def test_gtfs_rt_json_to_table(filename: str, config_type: ConfigType) -> None:
+    """It decodes feed messages to the same values as building the table from python objects."""
+    detail = GtfsRtConverter(config_type, metadata_queue=Queue()).detail
+
+    with gzip.open(os.path.join(incoming_dir, filename), "rb") as file:
+        raw = file.read()
+
+    feed_timestamp, table = gtfs_rt_json_to_table(pyarrow.py_buffer(raw), detail.import_schema)
+
+    json_data = json.loads(raw)
+    expected = pyarrow.Table.from_pylist(json_data["entity"], schema=detail.import_schema)
+
+    assert feed_timestamp == json_data["header"]["timestamp"]
+    assert table.column_names == expected.column_names
+    assert table.to_pylist() == expected.to_pylist()
+
+
+def test_partition_columns() -> None:
+    """It appends typed header timestamp columns holding a single value."""
+    converter = GtfsRtConverter(ConfigType.RT_VEHICLE_POSITIONS, metadata_queue=Queue())
+    converter.thread_init()
+
+    gtfs_rt_file = os.path.join(
+        incoming_dir,
+        "2022-07-05T12:35:16Z_https_cdn.mbta.com_realtime_VehiclePositions_enhanced.json.gz",
+    )
+    timestamp, _, table = converter.gz_to_pyarrow(gtfs_rt_file)
+
+    expected = {
+        "year": (pyarrow.uint16(), timestamp.year),
+        "month": (pyarrow.uint8(), timestamp.month),
+        "day": (pyarrow.uint8(), timestamp.day),
+        "feed_timestamp": (pyarrow.uint64(), int(timestamp.timestamp())),
+    }
+    assert table.column_names[-4:] == list(expected)
+    for column, (dtype, value) in expected.items():
+        assert table.schema.field(column).type == dtype
+        assert table.column(column).unique().to_pylist() == [value]
+
+
+def test_write_local_pq_trip_updates(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """It deduplicates recent records per partition and writes all recent rail records to the full set."""
+    monkeypatch.setattr("lamp_py.ingestion.convert_gtfs_rt.upload_file", create_mock_upload_file(tmp_path))
+    monkeypatch.setattr("lamp_py.ingestion.convert_gtfs_rt.file_list_from_s3", lambda *_, **__: [])
+
+    converter = GtfsRtConverter(ConfigType.RT_TRIP_UPDATES, metadata_queue=Queue())
+    monkeypatch.setattr(converter, "tmp_folder", tmp_path.as_posix())
+
+    table = (
+        pl.read_parquet(
+            os.path.join(
+                test_files_dir,
+                "SPRINGBOARD/RT_TRIP_UPDATES/year=2023/month=5/day=8/hour=12/8e2c182968e24ecea3d37f03d6bae84d-0.parquet",
+            )
+        )
+        .head(50_000)
+        .to_arrow()
+    )
+    local_path = tmp_path.joinpath(LAMP, "RT_TRIP_UPDATES", "2023-05-08T00:00:00.parquet").as_posix()
+    os.makedirs(os.path.dirname(local_path))
+
+    # write the same records twice, duplicates are dropped from the hash and upload files
+    converter.write_local_pq(pyarrow.concat_tables([table, table]), local_path)
+
+    local_records = pl.read_parquet(local_path)
+    assert local_records.height == pl.DataFrame(table).drop("feed_timestamp").unique().height
+    assert local_records.get_column("lamp_record_hash").is_unique().all()
+
+    # records are grouped by partition column
+    route_ids = local_records.get_column("trip_update.trip.route_id")
+    assert route_ids.rle_id().n_unique() == route_ids.n_unique()
+
+    upload_records = pl.read_parquet(local_path.replace(tmp_path.as_posix(), (tmp_path / S3_SPRINGBOARD).as_posix()))
+    assert_frame_equal(upload_records, local_records.drop("lamp_record_hash"))
+
+    rail_records = pl.read_parquet(
+        local_path.replace(tmp_path.as_posix(), (tmp_path / S3_SPRINGBOARD).as_posix()).replace(
+            "RT_TRIP_UPDATES", "TERMINAL_PREDICTIONS_TRIP_UPDATES"
+        )
+    )
+    assert rail_records.height == 2 * table.num_rows
+
+
+def test_springboard_parts(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    """It uploads new records as part files between compactions and merges them when syncing."""
+    s3_path = tmp_path / "s3"
+
+    def mock_file_list_from_s3(bucket_name: str, file_prefix: str) -> List[str]:
+        return sorted(
+            f"s3://{path.relative_to(s3_path).as_posix()}"
+            for path in (s3_path / bucket_name).rglob("*")
+            if path.is_file() and path.relative_to(s3_path / bucket_name).as_posix().startswith(file_prefix)
+        )
+
+    def mock_download_file(object_path: str, file_name: str) -> bool:
+        copy2(s3_path / object_path, file_name)
+        return True
+
+    def mock_delete_object(del_obj: str) -> bool:
+        (s3_path / del_obj.replace("s3://", "")).unlink()
+        return True
+
+    monkeypatch.setattr("lamp_py.ingestion.convert_gtfs_rt.upload_file", create_mock_upload_file(s3_path))
+    monkeypatch.setattr("lamp_py.ingestion.convert_gtfs_rt.file_list_from_s3", mock_file_list_from_s3)
+    monkeypatch.setattr("lamp_py.ingestion.convert_gtfs_rt.download_file", mock_download_file)
+    monkeypatch.setattr("lamp_py.ingestion.convert_gtfs_rt.delete_object", mock_delete_object)
+
+    converter = GtfsRtConverter(ConfigType.RT_TRIP_UPDATES, metadata_queue=Queue())
+    monkeypatch.setattr(converter, "tmp_folder", (tmp_path / "local").as_posix())
+
+    table = (
+        pl.read_parquet(
+            os.path.join(
+                test_files_dir,
+                "SPRINGBOARD/RT_TRIP_UPDATES/year=2023/month=5/day=8/hour=12/8e2c182968e24ecea3d37f03d6bae84d-0.parquet",
+            )
+        )
+        .head(10_000)
+        .to_arrow()
+    )
+    local_path = os.path.join(
+        converter.tmp_folder, LAMP, "RT_TRIP_UPDATES", "year=2023", "month=5", "day=8", "2023-05-08T00:00:00.parquet"
+    )
+    springboard_path = local_path.replace(converter.tmp_folder, (s3_path / S3_SPRINGBOARD).as_posix())
+    parts_path = s3_path / S3_SPRINGBOARD / converter.springboard_parts_prefix(local_path)
+    os.makedirs(os.path.dirname(local_path))
+
+    # first write uploads the day file
+    assert converter.write_local_pq(table.slice(0, 6_000), local_path)
+    assert not parts_path.exists()
+
+    # later writes only upload new records as part files
+    assert not converter.write_local_pq(table.slice(4_000), local_path)
+    assert len(list(parts_path.iterdir())) == 1
+    assert_frame_equal(
+        pl.concat([pl.read_parquet(springboard_path), pl.read_parquet(list(parts_path.iterdir())[0])]),
+        pl.read_parquet(local_path).drop("lamp_record_hash"),
+        check_row_order=False,
+    )
+
+    # a fresh local folder merges the day file and part files
+    expected = pl.read_parquet(local_path)
+    rmtree(converter.tmp_folder)
+    assert converter.sync_with_s3(local_path)
+    assert_frame_equal(pl.read_parquet(local_path), expected, check_row_order=False)
+
+    # part files uploaded by another process are kept until they are merged
+    other_part = (
+        pl.read_parquet(
+            os.path.join(
+                test_files_dir,
+                "SPRINGBOARD/RT_TRIP_UPDATES/year=2023/month=5/day=8/hour=12/8e2c182968e24ecea3d37f03d6bae84d-0.parquet",
+            )
+        )
+        .slice(10_000, 1_000)
+        .with_columns(pl.col("feed_timestamp") + 1)
+    )
+    other_part.write_parquet(parts_path / "0.parquet")
+    for day in (9, 10):
+        other_day = os.path.join(converter.tmp_folder, LAMP, "RT_TRIP_UPDATES", "year=2023", "month=5", f"day={day}")
+        os.makedirs(other_day)
+        (Path(other_day) / "file.parquet").touch()
+
+    monkeypatch.setattr(converter, "compaction_interval", 0)
+    monkeypatch.setattr("lamp_py.ingestion.convert_gtfs_rt.download_file", lambda *args: False)
+    converter.compact_springboard_files()
+    converter.clean_local_folders()
+    assert len(list(parts_path.iterdir())) == 2
+    assert os.path.exists(converter.compaction_marker(local_path, "pending"))
+    assert_frame_equal(pl.read_parquet(local_path), expected, check_row_order=False)
+
+    # compaction merges new part files, uploads the day file and removes part files
+    monkeypatch.setattr("lamp_py.ingestion.convert_gtfs_rt.download_file", mock_download_file)
+    converter.compact_springboard_files()
+    assert len(list(parts_path.iterdir())) == 0
+    expected = pl.concat([expected.drop("lamp_record_hash"), other_part], how="diagonal_relaxed")
+    assert_frame_equal(pl.read_parquet(springboard_path), expected, check_row_order=False)
+    assert_frame_equal(pl.read_parquet(local_path).drop("lamp_record_hash"), expected, check_row_order=False)
+    assert converter.metadata_queue.qsize() == 1
@@ -1,8 +1,18 @@
 import io
 import hashlib
 import pickle
+from pathlib import Path
 from typing import Any
 import polars as pl
+import pytest
+
+from lamp_py.ingestion.utils import (
+    GTFS_RT_HASH_COL,
+    append_gtfs_rt_hash_index,
+    clear_gtfs_rt_hash_index,
+    gtfs_rt_hash_index_files,
+    read_gtfs_rt_hash_index,
+)
 
 
 def hash_gtfs_rt_row_marked_for_removal_wip(row: Any) -> bytes:
@@ -86,3 +96,41 @@ def test_polars_hashrows_works_for_all_trip_update_col_types() -> None:
 
     # both hash functions return the same set - so they are consistent, as expected
     assert table_hash3.select("hash_column", "hash_column_og").unique().height == 2
+
+
+def test_gtfs_rt_hash_index(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """It builds the hash index from the parquet file, filters by feed_timestamp and compacts parts."""
+    monkeypatch.setattr("lamp_py.ingestion.utils.GTFS_RT_HASH_INDEX_MAX_PARTS", 3)
+    path = (tmp_path / "2025-10-24T00:00:00.parquet").as_posix()
+
+    pl.DataFrame(
+        {
+            "id": ["a", "b", "c"],
+            "feed_timestamp": [100, 200, 300],
+        },
+        schema={"id": pl.String, "feed_timestamp": pl.UInt64},
+    ).write_parquet(path)
+
+    # index is built from the parquet file on first read
+    assert len(read_gtfs_rt_hash_index(path, 0)) == 3
+    assert len(gtfs_rt_hash_index_files(path)) == 1
+    assert GTFS_RT_HASH_COL in pl.read_parquet_schema(path)
+
+    hashes = read_gtfs_rt_hash_index(path, 200)
+    assert len(hashes) == 2
+
+    new_records = pl.DataFrame(
+        {GTFS_RT_HASH_COL: [1, 2], "feed_timestamp": [400, 500]},
+        schema={GTFS_RT_HASH_COL: pl.UInt64, "feed_timestamp": pl.UInt64},
+    )
+    append_gtfs_rt_hash_index(path, new_records.head(1))
+    assert len(gtfs_rt_hash_index_files(path)) == 2
+
+    # third part triggers compaction into a single part
+    append_gtfs_rt_hash_index(path, new_records.tail(1))
+    assert len(gtfs_rt_hash_index_files(path)) == 1
+    assert read_gtfs_rt_hash_index(path, 400).sort().to_list() == [1, 2]
+    assert len(read_gtfs_rt_hash_index(path, 0)) == 5
+
+    clear_gtfs_rt_hash_index(path)
+    assert len(gtfs_rt_hash_index_files(path)) == 0
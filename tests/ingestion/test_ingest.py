@@ -3,6 +3,7 @@
 # fixtures work. https://stackoverflow.com/q/59664605
 
 import os
+from pathlib import Path
 from queue import Queue
 import pytest
 
@@ -10,6 +11,14 @@ from lamp_py.ingestion.converter import ConfigType
 from lamp_py.runtime_utils.lamp_exception import NoImplException
 from lamp_py.runtime_utils.lamp_exception import IgnoreIngestion
 from lamp_py.ingestion.convert_gtfs_rt import GtfsRtConverter
+from lamp_py.ingestion.ingest_gtfs import (
+    WORKER_MEMORY_BYTES,
+    ConverterUnit,
+    NoImplConverter,
+    converter_units,
+    local_file_bytes,
+    schedule_converter_units,
+)
 
 
 TEST_FILE_DIR = os.path.join(os.path.dirname(__file__), "test_files")
@@ -43,3 +52,77 @@ def test_each_config_type() -> None:
 
     # with pytest.raises(IgnoreIngestion):
     #     converter = GtfsRtConverter(ConfigType.LIGHT_RAIL, Queue())
+
+
+def test_converter_units() -> None:
+    """
+    Test that incoming files are split into chronological units for each
+    config type and hour, and that unsupported files become one error unit.
+    """
+    file_names = [
+        "2024-01-01T01:00:05Z_https_cdn.mbta.com_realtime_TripUpdates_enhanced.json.gz",
+        "2024-01-01T00:59:55Z_https_cdn.mbta.com_realtime_TripUpdates_enhanced.json.gz",
+        "2024-01-01T00:59:50Z_concentrate_TripUpdates_enhanced.json.gz",
+        "2024-01-01T00:59:55Z_https_cdn.mbta.com_realtime_Alerts_enhanced.json.gz",
+        "2024-01-01T00:59:55Z_https_mbta_integration.mybluemix.net_vehicleCount.gz",
+        "2024-01-01T00:59:55Z_unknown_feed.json.gz",
+    ]
+    file_details = [{"s3_obj_path": f"s3://incoming/lamp/delta/{name}", "size_bytes": 1024} for name in file_names]
+
+    units = converter_units(file_details, Queue())
+
+    assert list(units) == [ConfigType.RT_ALERTS, ConfigType.RT_TRIP_UPDATES, ConfigType.ERROR]
+    assert [[os.path.basename(f) for f in unit.converter.files] for unit in units[ConfigType.RT_TRIP_UPDATES]] == [
+        [file_names[2], file_names[1]],
+        [file_names[0]],
+    ]
+    assert units[ConfigType.RT_ALERTS][0].memory_bytes > WORKER_MEMORY_BYTES
+    assert isinstance(units[ConfigType.ERROR][0].converter, NoImplConverter)
+    assert len(units[ConfigType.ERROR][0].converter.files) == 2
+
+
+def test_local_file_bytes(tmp_path: Path) -> None:
+    """
+    Test that the largest local day file of a config type is found in the
+    converter tmp folder.
+    """
+    assert local_file_bytes(str(tmp_path), ConfigType.RT_ALERTS) == 0
+
+    for day, size in ((1, 10), (2, 30)):
+        day_folder = tmp_path.joinpath("lamp", str(ConfigType.RT_ALERTS), f"year=2024/month=1/day={day}")
+        day_folder.mkdir(parents=True)
+        day_folder.joinpath(f"2024-01-0{day}T00:00:00.parquet").write_bytes(b"0" * size)
+
+    assert local_file_bytes(str(tmp_path), ConfigType.RT_ALERTS) == 30
+    assert local_file_bytes(str(tmp_path), ConfigType.RT_TRIP_UPDATES) == 0
+
+
+def test_schedule_converter_units() -> None:
+    """
+    Test that units are started largest first within the memory budget, one
+    at a time for each config type.
+    """
+
+    def unit(config_type: ConfigType, memory_bytes: int) -> ConverterUnit:
+        return ConverterUnit(GtfsRtConverter(config_type, Queue()), memory_bytes)
+
+    pending = {
+        ConfigType.RT_TRIP_UPDATES: [unit(ConfigType.RT_TRIP_UPDATES, 6), unit(ConfigType.RT_TRIP_UPDATES, 6)],
+        ConfigType.RT_VEHICLE_POSITIONS: [unit(ConfigType.RT_VEHICLE_POSITIONS, 3)],
+        ConfigType.RT_ALERTS: [unit(ConfigType.RT_ALERTS, 1)],
+    }
+
+    started = schedule_converter_units(pending, {}, budget_bytes=8, process_count=4)
+    assert [u.converter.config_type for u in started] == [ConfigType.RT_TRIP_UPDATES, ConfigType.RT_ALERTS]
+    assert len(pending[ConfigType.RT_TRIP_UPDATES]) == 1
+
+    # the next trip updates unit waits for the running one
+    started = schedule_converter_units(pending, {ConfigType.RT_TRIP_UPDATES: 6}, budget_bytes=8, process_count=4)
+    assert not started
+
+    # a unit larger than the budget still runs on its own
+    started = schedule_converter_units(pending, {}, budget_bytes=2, process_count=4)
+    assert [u.converter.config_type for u in started] == [ConfigType.RT_TRIP_UPDATES]
+
+    started = schedule_converter_units(pending, {}, budget_bytes=8, process_count=1)
+    assert [u.converter.config_type for u in started] == [ConfigType.RT_VEHICLE_POSITIONS]
@@ -0,0 +1,66 @@
+import pandas
+import polars as pl
+
+from lamp_py.performance_manager.gtfs_utils import (
+    STATIC_SCHEDULE_CACHE,
+    add_parent_station_column,
+    add_static_version_key_column,
+    start_time_seconds_expr,
+    start_time_to_seconds,
+)
+
+from ..test_resources import FakeDbManager
+
+
+def test_static_schedule_cache() -> None:
+    """
+    test that static schedule lookups are served from the cache until it is
+    cleared by a static schedule load
+    """
+    # every service date matches static version 1
+    parent_stations = pandas.DataFrame(
+        {
+            "static_version_key": [1, 1],
+            "stop_id": ["70061", "70063"],
+            "parent_station": ["place-alfcl", "place-davis"],
+        }
+    )
+    db_manager = FakeDbManager(selects=[[{"static_version_key": 1}], [{"static_version_key": 1}], parent_stations] * 2)
+    hits = STATIC_SCHEDULE_CACHE.hits
+    misses = STATIC_SCHEDULE_CACHE.misses
+
+    def add_static_columns() -> pandas.DataFrame:
+        events = pandas.DataFrame(
+            {
+                "service_date": [20240101, 20240101, 20240102],
+                "stop_id": ["70061", "70063", "70065"],
+            }
+        )
+        events = add_static_version_key_column(events, db_manager)
+        return add_parent_station_column(events, db_manager)
+
+    events = add_static_columns()
+    assert events["parent_station"].tolist() == ["place-alfcl", "place-davis", "70065"]
+    assert len(db_manager.queries) == 3
+    assert STATIC_SCHEDULE_CACHE.misses - misses == 3
+
+    # repeated lookups do not query the database
+    assert add_static_columns().equals(events)
+    assert len(db_manager.queries) == 3
+    assert STATIC_SCHEDULE_CACHE.hits - hits == 3
+
+    # lookups are queried again after the cache is cleared
+    STATIC_SCHEDULE_CACHE.clear()
+    assert add_static_columns().equals(events)
+    assert len(db_manager.queries) == 6
+
+
+def test_start_time_seconds_expr() -> None:
+    """
+    test that vectorized start time conversion matches start_time_to_seconds
+    """
+    start_times = ["00:00:00", "08:15:30", "25:01:02", "3600", None]
+    start_seconds = pl.DataFrame({"start_time": start_times}).select(start_time_seconds_expr(pl.col("start_time")))
+
+    assert start_seconds["start_time"].to_list() == [start_time_to_seconds(t) for t in start_times]
+    assert start_seconds["start_time"].dtype == pl.Int64
@@ -1,16 +1,27 @@
 import os
 import pathlib
+from typing import List, Optional
+
+import pandas
+import polars as pl
+import pyarrow
 
 from lamp_py.performance_manager.l0_rt_vehicle_positions import (
     get_vp_dataframe,
     transform_vp_datatypes,
+    transform_vp_timestamps,
 )
 from lamp_py.performance_manager.l0_rt_trip_updates import (
     get_and_unwrap_tu_dataframe,
 )
+from lamp_py.performance_manager.l0_gtfs_rt_events import (
+    TripEventState,
+    combine_events,
+)
 from lamp_py.performance_manager.gtfs_utils import (
     add_missing_service_dates,
     service_date_from_timestamp,
+    service_dates_from_timestamps,
 )
 
 from ..test_resources import test_files_dir, csv_to_vp_parquet
@@ -51,6 +62,29 @@ def test_service_date_from_timestamp() -> None:
         for timestamp in timestamps:
             assert service_date == service_date_from_timestamp(timestamp)
 
+    # vectorized service dates match for each supported column type
+    all_timestamps: List[Optional[int]] = []
+    expected: List[Optional[int]] = []
+    for service_date, timestamps in dst_expected.items():
+        all_timestamps.extend(timestamps)
+        expected.extend([service_date] * len(timestamps))
+    all_timestamps.append(None)
+    expected.append(None)
+
+    pandas_timestamps = pandas.Series(all_timestamps, index=range(10, 10 + len(all_timestamps)), dtype="Int64")
+    pandas_service_dates = service_dates_from_timestamps(pandas_timestamps)
+    assert pandas_service_dates.index.equals(pandas_timestamps.index)
+    assert pandas_service_dates.astype(object).where(pandas_service_dates.notna(), None).tolist() == expected
+
+    assert service_dates_from_timestamps(pl.Series(all_timestamps)).to_list() == expected
+    assert service_dates_from_timestamps(pyarrow.array(all_timestamps)).to_pylist() == expected
+    assert (
+        service_dates_from_timestamps(
+            pyarrow.array(all_timestamps, pyarrow.int64()).cast(pyarrow.timestamp("s"))
+        ).to_pylist()
+        == expected
+    )
+
 
 def test_vp_missing_service_date(tmp_path: pathlib.Path) -> None:
     """
@@ -95,3 +129,105 @@ def test_tu_missing_service_date() -> None:
     # check that all service dates exist and are the same
     assert not events["service_date"].hasnans
     assert len(events["service_date"].unique()) == 1
+
+
+def test_combine_events() -> None:
+    """
+    test that vehicle position and trip update events are combined into one
+    event per trip stop, preferring vehicle position details
+    """
+    details = {
+        "service_date": pandas.array([20240101, 20240101], dtype="Int64"),
+        "start_time": [100, 100],
+        "route_id": ["Red", "Red"],
+        "direction_id": [True, True],
+        "vehicle_id": ["R-1", "R-1"],
+        "revenue": [True, True],
+        "trip_id": ["t1", "t1"],
+        "static_version_key": [1, 1],
+    }
+    vp_events = pandas.DataFrame(
+        {
+            **details,
+            "parent_station": ["place-alfcl", "place-davis"],
+            "stop_id": ["70061", "70063"],
+            "stop_sequence": [1, 2],
+            "vehicle_label": ["1700", None],
+            "vehicle_consist": ["1700|1701", None],
+            "vp_stop_timestamp": pandas.array([None, 1704085300], dtype="Int64"),
+            "vp_move_timestamp": pandas.array([1704085000, 1704085200], dtype="Int64"),
+        }
+    )
+    tu_events = pandas.DataFrame(
+        {
+            **details,
+            "parent_station": ["place-davis", "place-portr"],
+            "stop_id": ["70063", "70065"],
+            "stop_sequence": [2, 3],
+            "vehicle_label": ["1700", "1700"],
+            "vehicle_consist": ["1700|1701", "1700|1701"],
+            "tu_stop_timestamp": pandas.array([1704085290, 1704085500], dtype="Int64"),
+        }
+    )
+
+    events = combine_events(vp_events, tu_events).sort_values("stop_sequence", ignore_index=True)
+
+    assert events["parent_station"].tolist() == ["place-alfcl", "place-davis", "place-portr"]
+    assert events["vp_move_timestamp"].tolist() == [1704085000, 1704085200, pandas.NA]
+    assert events["tu_stop_timestamp"].tolist() == [pandas.NA, 1704085290, 1704085500]
+    # trip update details fill in missing vehicle position details
+    assert events["vehicle_label"].tolist() == ["1700", "1700", "1700"]
+    assert events["service_date"].dtype == "Int64"
+
+    # unchanged trips are dropped on the next cycle, changed trips are kept whole
+    trip_state = TripEventState()
+    changed_events, trip_hashes = trip_state.changed_trip_events(events)
+    assert changed_events.shape[0] == 3
+    trip_state.update(trip_hashes)
+
+    changed_events, trip_hashes = trip_state.changed_trip_events(events)
+    assert changed_events.shape[0] == 0
+
+    events.loc[2, "tu_stop_timestamp"] = 1704085510
+    changed_events, trip_hashes = trip_state.changed_trip_events(events)
+    assert changed_events.shape[0] == 3
+
+
+def test_transform_vp_timestamps() -> None:
+    """
+    test that vehicle positions are reduced to one event per trip stop, with
+    move and stop timestamps and pipe delimited consist strings
+    """
+    consist = [{"label": "1700"}, {"label": "1701"}]
+    carriages = [{"label": "1800"}, {"label": "1801"}, {"label": "1802"}]
+    vehicle_positions = pandas.DataFrame(
+        {
+            "service_date": pandas.array([20240101] * 4, dtype="Int64"),
+            "route_id": ["Red"] * 4,
+            "trip_id": ["t1", "t1", "t1", "t2"],
+            "parent_station": ["place-alfcl", "place-alfcl", "place-davis", "place-alfcl"],
+            "stop_id": ["70061", "70061", "70063", "70061"],
+            "stop_sequence": [1, 1, 2, 1],
+            "start_time": pandas.array([100, 100, 100, None], dtype="Int64"),
+            "direction_id": [True] * 4,
+            "vehicle_id": ["R-1", "R-1", "R-1", "R-2"],
+            "vehicle_label": ["1700", "1700", "1700", "1800"],
+            "revenue": [True] * 4,
+            "static_version_key": [1] * 4,
+            "is_moving": [True, False, True, False],
+            "vehicle_timestamp": [1704085000, 1704085100, 1704085200, 1704085300],
+            "vehicle_consist": [consist, consist, consist, None],
+            "multi_carriage_details": [None, None, None, carriages],
+        }
+    )
+
+    events = transform_vp_timestamps(vehicle_positions)
+
+    assert events.shape[0] == 3
+    assert "is_moving" not in events.columns
+    assert "multi_carriage_details" not in events.columns
+    assert events["vp_move_timestamp"].tolist() == [1704085000, 1704085200, pandas.NA]
+    assert events["vp_stop_timestamp"].tolist() == [1704085100, pandas.NA, 1704085300]
+    # multi_carriage_details are used when vehicle_consist is missing
+    assert events["vehicle_consist"].tolist() == ["1700|1701", "1700|1701", "1800|1801|1802"]
+    assert events["start_time"].dtype == "Int64"
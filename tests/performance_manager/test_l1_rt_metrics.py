@@ -0,0 +1,131 @@
+import sqlalchemy as sa
+
+from lamp_py.performance_manager.l1_cte_statements import dirty_route_directions_filter
+from lamp_py.performance_manager.l1_rt_metrics import update_metrics_from_temp_events
+from lamp_py.postgres.rail_performance_manager_schema import TempEventCompare, VehicleTrips
+
+from ..test_resources import FakeDbManager
+
+
+def test_update_metrics_from_temp_events() -> None:
+    """
+    test that metrics updates are limited to changed trips, unless a full service date recompute is requested
+    """
+    db_manager = FakeDbManager(
+        selects=[
+            [
+                {"service_date": 20240101, "static_version_key": 1},
+                {"service_date": 20240102, "static_version_key": 1},
+            ]
+        ]
+    )
+    update_metrics_from_temp_events(db_manager, full_service_dates={20240102})
+
+    # travel times, dwell times, branch headways and trunk headways for each service date
+    assert len(db_manager.statements) == 8
+
+    dirty_statements = db_manager.statements[:4]
+    full_statements = db_manager.statements[4:]
+
+    for statement in dirty_statements:
+        assert "temp_event_compare" in statement
+        assert "IS DISTINCT FROM" in statement
+
+    for statement in full_statements:
+        assert "temp_event_compare" not in statement
+        assert "IS DISTINCT FROM" in statement
+
+    # headways are limited to the route and directions of changed trips, not the changed trips
+    route_directions = "vehicle_trips.route_id), vehicle_trips.direction_id) IN"
+    assert route_directions not in dirty_statements[0]
+    assert route_directions not in dirty_statements[1]
+    assert route_directions in dirty_statements[2]
+    assert route_directions in dirty_statements[3]
+
+
+def test_dirty_route_directions_filter() -> None:
+    """
+    test that headways are recomputed for neighbors of changed trips, trips on
+    the same trunk route and direction on the service date
+    """
+    engine = sa.create_engine("sqlite://")
+    VehicleTrips.metadata.create_all(engine, tables=[VehicleTrips.__table__, TempEventCompare.__table__])
+
+    trip_defaults = {"vehicle_id": "v", "revenue": True, "first_last_station_match": True, "static_version_key": 1}
+    trips = [
+        # changed trip on a green line branch
+        {
+            "pm_trip_id": 1,
+            "service_date": 20240101,
+            "route_id": "Green-B",
+            "trunk_route_id": "Green",
+            "direction_id": 0,
+        },
+        # neighbors on the same trunk route and direction
+        {
+            "pm_trip_id": 2,
+            "service_date": 20240101,
+            "route_id": "Green-B",
+            "trunk_route_id": "Green",
+            "direction_id": 0,
+        },
+        {
+            "pm_trip_id": 3,
+            "service_date": 20240101,
+            "route_id": "Green-C",
+            "trunk_route_id": "Green",
+            "direction_id": 0,
+        },
+        # other direction, other route and other service date
+        {
+            "pm_trip_id": 4,
+            "service_date": 20240101,
+            "route_id": "Green-B",
+            "trunk_route_id": "Green",
+            "direction_id": 1,
+        },
+        {"pm_trip_id": 5, "service_date": 20240101, "route_id": "Blue", "trunk_route_id": None, "direction_id": 0},
+        {
+            "pm_trip_id": 6,
+            "service_date": 20240102,
+            "route_id": "Green-B",
+            "trunk_route_id": "Green",
+            "direction_id": 0,
+        },
+        # changed trip without a trunk route, matched on route_id
+        {"pm_trip_id": 7, "service_date": 20240101, "route_id": "Orange", "trunk_route_id": None, "direction_id": 1},
+        {"pm_trip_id": 8, "service_date": 20240101, "route_id": "Orange", "trunk_route_id": None, "direction_id": 1},
+    ]
+    changed_events = [
+        {
+            "service_date": 20240101,
+            "pm_trip_id": pm_trip_id,
+            "trip_id": str(pm_trip_id),
+            "stop_id": "stop",
+            "parent_station": "place",
+            "direction_id": 0,
+            "route_id": "route",
+            "vehicle_id": "v",
+            "revenue": True,
+            "static_version_key": 1,
+        }
+        for pm_trip_id in (1, 7)
+    ]
+
+    with engine.begin() as connection:
+        connection.execute(
+            sa.insert(VehicleTrips.__table__),
+            [{**trip_defaults, **trip, "trip_id": str(trip["pm_trip_id"])} for trip in trips],
+        )
+        connection.execute(sa.insert(TempEventCompare.__table__), changed_events)
+
+        headway_trips = connection.execute(
+            sa.select(VehicleTrips.pm_trip_id)
+            .where(
+                VehicleTrips.service_date == 20240101,
+                dirty_route_directions_filter(20240101),
+            )
+            .order_by(VehicleTrips.pm_trip_id)
+        ).scalars()
+
+        assert list(headway_trips) == [1, 2, 3, 7, 8]
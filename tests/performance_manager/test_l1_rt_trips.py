@@ -0,0 +1,62 @@
+import pandas
+
+from lamp_py.performance_manager.l1_rt_trips import (
+    ServiceDateWork,
+    plan_service_dates,
+    update_branch_trunk_route_id,
+)
+
+from ..test_resources import FakeDbManager
+
+
+def test_plan_service_dates() -> None:
+    """
+    test grouping of service_date / static_version_key records into per service date work
+    """
+    stop_sequence_pairs = [
+        {"service_date": 20240102, "static_version_key": 2},
+        {"service_date": 20240101, "static_version_key": 1},
+        {"service_date": 20240102, "static_version_key": 3},
+    ]
+    backup_match_pairs = [
+        {"service_date": 20240101, "static_version_key": 1},
+        {"service_date": 20240103, "static_version_key": 3},
+    ]
+
+    plan = plan_service_dates(stop_sequence_pairs, backup_match_pairs)
+
+    assert plan == [
+        ServiceDateWork(20240101, stop_sequence_keys=[1], backup_match_keys=[1]),
+        ServiceDateWork(20240102, stop_sequence_keys=[2, 3], backup_match_keys=[]),
+        ServiceDateWork(20240103, stop_sequence_keys=[], backup_match_keys=[3]),
+    ]
+
+    assert not plan_service_dates([], [])
+
+
+def test_update_branch_trunk_route_id() -> None:
+    """
+    test that service dates of trips moved to a new trunk route are returned
+    """
+    trips = pandas.DataFrame(
+        {
+            "service_date": [20240101, 20240101, 20240102, 20240103],
+            "pm_trip_id": [1, 2, 3, 4],
+            "route_id": ["Green-B", "Blue", "Green-C", "Red"],
+            "branch_route_id": ["Green-B", None, "Green-C", None],
+            "trunk_route_id": ["Green", None, "Green-C", "Red"],
+        }
+    )
+    red_line_events = pandas.DataFrame({"pm_trip_id": [4], "stop_id": ["70087"]})
+    db_manager = FakeDbManager(selects=[trips, red_line_events])
+
+    # new trips and new branches of trips keep the same trunk route
+    assert update_branch_trunk_route_id(db_manager) == {20240102}
+
+    updates = db_manager.updates[0]
+    assert isinstance(updates, pandas.DataFrame)
+    assert updates.to_dict("list") == {
+        "pm_trip_id": [1, 2, 3, 4],
+        "branch_route_id": ["Green-B", None, "Green-C", "Red-A"],
+        "trunk_route_id": ["Green", "Blue", "Green", "Red"],
+    }
@@ -0,0 +1,276 @@
+import io
+import os
+from datetime import date, datetime, timezone
+from queue import Queue
+from typing import List, Optional
+from unittest import mock
+
+import numpy
+import pandas
+import polars as pl
+import pyarrow
+import pyarrow.csv as pv
+import pytest
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from lamp_py.performance_manager.l0_gtfs_static_load import (
+    get_table_objects,
+    insert_data_tables,
+    load_parquet_files,
+    transform_data_tables,
+)
+from lamp_py.postgres.postgres_utils import (
+    POSTGRES_ARROW_TYPES,
+    DatabaseManager,
+    MaintenanceThresholds,
+    _drain_metadata_queue,
+    csv_read_options,
+    maintenance_command,
+    frame_for_copy,
+    frame_to_csv_batches,
+)
+from lamp_py.postgres.rail_performance_manager_schema import TempEventCompare, VehicleTrips
+
+from ..test_resources import springboard_dir
+
+
+def test_drain_metadata_queue() -> None:
+    """
+    test that metadata paths are batched by size, deduplicated, and that the
+    final batch is returned when the writer is stopped
+    """
+    metadata_queue: Queue[Optional[str]] = Queue()
+    for path in ["a", "b", "a", "c", "d", None]:
+        metadata_queue.put(path)
+
+    # full batches are returned without waiting for more paths
+    assert _drain_metadata_queue(metadata_queue, max_size=2, max_seconds=60) == (["a", "b"], False)
+
+    # duplicate paths in a batch are only written once, remaining paths are
+    # returned with the stop signal
+    assert _drain_metadata_queue(metadata_queue, max_size=10, max_seconds=60) == (["a", "c", "d"], True)
+
+    # partial batches are returned once max_seconds have passed
+    metadata_queue.put("e")
+    assert _drain_metadata_queue(metadata_queue, max_size=10, max_seconds=0.01) == (["e"], False)
+
+    # stop signal with nothing left to write
+    metadata_queue.put(None)
+    assert _drain_metadata_queue(metadata_queue) == ([], True)
+
+
+def test_frame_for_copy() -> None:
+    """
+    test that dataframes are serialized into csv batches that COPY loads
+    with the same values and NULLs as the dataframe
+    """
+    events = pandas.DataFrame(
+        {
+            "service_date": [20240101, 20240101, 20240102],
+            "stop_sequence": [1.0, numpy.nan, 3.0],
+            "vp_move_timestamp": pandas.array([1704085200, None, 1704171600], dtype="Int64"),
+            "vehicle_label": ["1700", "", None],
+            "direction_id": [True, False, True],
+        }
+    )
+
+    for data in [events, pl.from_pandas(events), pyarrow.Table.from_pandas(events)]:
+        copy_frame = frame_for_copy(data, TempEventCompare.__table__)
+
+        # float columns loaded into integer table columns are cast to integers
+        assert copy_frame.schema["stop_sequence"] == pl.Int64
+
+        csv_batches = [buffer.read().decode() for buffer in frame_to_csv_batches(copy_frame, batch_size=2)]
+        assert csv_batches == [
+            '20240101,1,1704085200,1700,true\n20240101,,,"",false\n',
+            "20240102,3,1704171600,,true\n",
+        ]
+
+
+def test_insert_dataframe_static_schedule(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    test that static schedule dataframes, with object columns of strings and
+    None, are copied into their tables with every value intact
+    """
+
+    def static_parquet_paths(table_type: str, feed_info_path: str) -> List[str]:
+        table_dir = feed_info_path.replace("FEED_INFO", table_type)
+        if not os.path.exists(table_dir):
+            return []
+        return [os.path.join(table_dir, file) for file in os.listdir(table_dir)]
+
+    monkeypatch.setattr(
+        "lamp_py.performance_manager.l0_gtfs_static_load.get_static_parquet_paths", static_parquet_paths
+    )
+
+    static_tables = get_table_objects()
+    # stop times are not in the test files
+    static_tables["stop_times"].allow_empty_dataframe = True
+    load_parquet_files(static_tables, os.path.join(springboard_dir, "FEED_INFO", "timestamp=1682375024"))
+    transform_data_tables(static_tables)
+
+    copied: List[pl.DataFrame] = []
+    db_manager = DatabaseManager.__new__(DatabaseManager)
+    db_manager.engine = mock.MagicMock()
+    db_manager.session = mock.MagicMock()
+    with (
+        mock.patch.object(
+            DatabaseManager, "_copy_to_table", lambda self, cursor, data, table_name: copied.append(data)
+        ),
+        mock.patch.object(DatabaseManager, "vacuum_analyze"),
+    ):
+        insert_data_tables(static_tables, 1682375024, db_manager)
+
+    loaded_tables = [table for table in static_tables.values() if table.data_table.shape[0] > 0]
+    assert len(copied) == len(loaded_tables)
+    for table, copy_frame in zip(loaded_tables, copied):
+        csv = b"".join(buffer.read() for buffer in frame_to_csv_batches(copy_frame))
+        loaded = pl.read_csv(io.BytesIO(csv), has_header=False, schema=copy_frame.schema)
+
+        expected = table.data_table.astype(object).where(table.data_table.notna(), None)
+        assert loaded.to_dicts() == expected.to_dict("records"), table.table_name
+
+
+def test_update_dataframe() -> None:
+    """
+    test that dataframe updates are copied into a staging table and applied
+    with a single UPDATE ... FROM statement
+    """
+    copied: List[str] = []
+    db_manager = DatabaseManager.__new__(DatabaseManager)
+    db_manager.engine = sa.create_engine("postgresql+psycopg2://")
+    db_manager.session = mock.MagicMock()
+    cursor = db_manager.session.begin.return_value.__enter__.return_value
+
+    updates = pandas.DataFrame({"pm_trip_id": [1, 2], "start_time": [3600.0, numpy.nan]})
+    with (
+        mock.patch.object(
+            DatabaseManager,
+            "_copy_to_table",
+            lambda self, cursor, data, table_name: copied.extend([table_name, data.write_csv()]),
+        ),
+        mock.patch.object(DatabaseManager, "_disable_trip_trigger") as disable_patch,
+        mock.patch.object(DatabaseManager, "_enable_trip_trigger") as enable_patch,
+    ):
+        db_manager.update_dataframe(updates, VehicleTrips, key_columns=["pm_trip_id"])
+        db_manager.update_dataframe(updates.head(0), VehicleTrips, key_columns=["pm_trip_id"])
+
+    disable_patch.assert_called_once()
+    enable_patch.assert_called_once()
+    assert copied == ["staging_vehicle_trips", "pm_trip_id,start_time\n1,3600\n2,\n"]
+
+    create_staging, update_query = [call.args[0] for call in cursor.execute.call_args_list]
+    assert str(create_staging) == (
+        "CREATE TEMPORARY TABLE staging_vehicle_trips ON COMMIT DROP AS "
+        "SELECT pm_trip_id, start_time FROM vehicle_trips WITH NO DATA;"
+    )
+    assert " ".join(str(update_query.compile(dialect=postgresql.dialect())).split()) == (
+        "UPDATE vehicle_trips SET start_time=staging_vehicle_trips.start_time FROM staging_vehicle_trips "
+        "WHERE vehicle_trips.pm_trip_id = staging_vehicle_trips.pm_trip_id"
+    )
+
+
+def test_csv_read_options() -> None:
+    """
+    test that csv written by postgres COPY is read into arrow with NULLs,
+    empty strings, booleans and timestamps intact
+    """
+    copy_output = (
+        b"service_date,route_id,direction_id,stop_count,vehicle_label,updated_on\n"
+        b'2024-01-01,Red,t,17,"",2024-01-01 05:00:00.5+00\n'
+        b"2024-01-02,NULL,f,,,2024-01-01 22:00:00-05\n"
+    )
+    schema = pyarrow.schema(
+        [
+            ("service_date", POSTGRES_ARROW_TYPES[1082]),
+            ("route_id", POSTGRES_ARROW_TYPES[1043]),
+            ("direction_id", POSTGRES_ARROW_TYPES[16]),
+            ("stop_count", POSTGRES_ARROW_TYPES[21]),
+            ("vehicle_label", POSTGRES_ARROW_TYPES[25]),
+            ("updated_on", POSTGRES_ARROW_TYPES[1184]),
+        ]
+    )
+
+    read_options, parse_options, convert_options = csv_read_options(schema)
+    table = pv.read_csv(
+        io.BytesIO(copy_output),
+        read_options=read_options,
+        parse_options=parse_options,
+        convert_options=convert_options,
+    )
+
+    assert table.schema == schema
+    assert table.to_pylist() == [
+        {
+            "service_date": date(2024, 1, 1),
+            "route_id": "Red",
+            "direction_id": True,
+            "stop_count": 17,
+            "vehicle_label": "",
+            "updated_on": datetime(2024, 1, 1, 5, 0, 0, 500000, tzinfo=timezone.utc),
+        },
+        {
+            "service_date": date(2024, 1, 2),
+            "route_id": "NULL",
+            "direction_id": False,
+            "stop_count": None,
+            "vehicle_label": None,
+            "updated_on": datetime(2024, 1, 2, 3, 0, 0, tzinfo=timezone.utc),
+        },
+    ]
+
+
+def test_csv_read_options_newlines() -> None:
+    """
+    test that quoted values containing newlines are read when rows span
+    multiple csv blocks
+    """
+    copy_output = b"trip_id,note\n" + b"".join(
+        f'{trip_id},"line one\nline two {trip_id}"\n'.encode() for trip_id in range(50)
+    )
+    schema = pyarrow.schema([("trip_id", POSTGRES_ARROW_TYPES[23]), ("note", POSTGRES_ARROW_TYPES[25])])
+
+    read_options, parse_options, convert_options = csv_read_options(schema, block_size=64)
+    reader = pv.open_csv(
+        io.BytesIO(copy_output),
+        read_options=read_options,
+        parse_options=parse_options,
+        convert_options=convert_options,
+    )
+    table = reader.read_all()
+
+    assert table.num_rows == 50
+    assert table["note"][7].as_py() == "line one\nline two 7"
+
+
+def test_maintenance_command() -> None:
+    """
+    test that tables are only vacuumed or analyzed past thresholds
+    """
+    thresholds = MaintenanceThresholds(
+        vacuum_threshold=100,
+        vacuum_scale_factor=0.1,
+        analyze_threshold=10,
+        analyze_scale_factor=0.01,
+        max_analyze_age_seconds=60,
+    )
+    stats = {
+        "n_live_tup": 10_000,
+        "n_dead_tup": 1_000,
+        "n_mod_since_analyze": 100,
+        "analyze_age_seconds": 30,
+    }
+
+    # under all thresholds
+    assert maintenance_command(stats, thresholds) is None
+
+    # dead tuples past 100 + 0.1 * 10,000
+    assert maintenance_command({**stats, "n_dead_tup": 1_101}, thresholds) == "VACUUM (ANALYZE)"
+
+    # modifications past 10 + 0.01 * 10,000
+    assert maintenance_command({**stats, "n_mod_since_analyze": 111}, thresholds) == "ANALYZE"
+
+    # stale or missing statistics
+    assert maintenance_command({**stats, "analyze_age_seconds": 61}, thresholds) == "ANALYZE"
+    assert maintenance_command({**stats, "analyze_age_seconds": None}, thresholds) == "ANALYZE"
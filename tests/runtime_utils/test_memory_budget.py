@@ -0,0 +1,18 @@
+import os
+from unittest import mock
+
+from lamp_py.runtime_utils.memory_budget import memory_budget
+
+
+def test_memory_budget() -> None:
+    """
+    test that the memory budget is read from its environment variable and
+    defaults to 80% of system memory
+    """
+    with mock.patch.dict(os.environ, {"TEST_MEMORY_BUDGET_MB": "2048"}):
+        assert memory_budget("TEST_MEMORY_BUDGET_MB") == 2048 * 1024 * 1024
+
+    with mock.patch.dict(os.environ, {}, clear=True):
+        with mock.patch("psutil.virtual_memory") as virtual_memory:
+            virtual_memory.return_value.total = 10 * 1024 * 1024 * 1024
+            assert memory_budget("TEST_MEMORY_BUDGET_MB") == 8 * 1024 * 1024 * 1024
@@ -1,9 +1,15 @@
 import os
 from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Union
+from unittest import mock
 
+import pandas
 import pyarrow
+import sqlalchemy as sa
 from pyarrow import csv, parquet
+from sqlalchemy.dialects import postgresql
 
+from lamp_py.postgres.postgres_utils import DatabaseIndex, DatabaseManager, FrameType
 from lamp_py.runtime_utils.remote_files import S3_SPRINGBOARD, S3_INCOMING, S3Location
 
 test_files_dir = os.path.join(os.path.dirname(__file__), "test_files")
@@ -54,6 +60,53 @@ class LocalS3Location(S3Location):
         return os.path.join(test_files_dir, self.bucket, self.prefix)
 
 
+class FakeDbManager(DatabaseManager):
+    """
+    replace a database manager so it can be used in testing without a database
+
+    selects return the queued results in order, executed statements are
+    recorded as compiled postgres sql and updated dataframes are recorded
+    """
+
+    def __init__(self, selects: Optional[List[Any]] = None) -> None:
+        # pylint: disable=W0231
+        # no engine or session, nothing is sent to a database
+        self.db_index = DatabaseIndex.RAIL_PERFORMANCE_MANAGER
+        self.selects: List[Any] = list(selects or [])
+        self.queries: List[Union[sa.sql.expression.Select, sa.sql.expression.TextClause]] = []
+        self.statements: List[str] = []
+        self.updates: List[FrameType] = []
+
+    def execute(self, statement: Any, disable_trip_tigger: bool = False) -> sa.engine.CursorResult:
+        """record compiled statement"""
+        self.statements.append(str(statement.compile(dialect=postgresql.dialect())))
+        return mock.MagicMock()
+
+    def update_dataframe(
+        self,
+        data: FrameType,
+        update_table: Any,
+        key_columns: List[str],
+        disable_trip_tigger: bool = True,
+    ) -> None:
+        """record updated rows"""
+        self.updates.append(data)
+
+    def select_as_dataframe(
+        self, select_query: Union[sa.sql.expression.Select, sa.sql.expression.TextClause]
+    ) -> pandas.DataFrame:
+        """next queued result"""
+        self.queries.append(select_query)
+        return self.selects.pop(0)
+
+    def select_as_list(
+        self, select_query: Union[sa.sql.expression.Select, sa.sql.expression.TextClause]
+    ) -> Union[List[Any], List[Dict[str, Any]]]:
+        """next queued result"""
+        self.queries.append(select_query)
+        return self.selects.pop(0)
+
+
 rt_vehicle_positions = LocalS3Location(
     bucket=S3_SPRINGBOARD,
     prefix="RT_VEHICLE_POSITIONS",
@@ -1,11 +1,19 @@
+import os
+import shutil
+import time
 from datetime import date
+from pathlib import Path
 from unittest import mock
 
+from lamp_py.aws.s3 import CACHE_GRACE_SECONDS
 from lamp_py.utils.gtfs_utils import (
     bus_route_ids_for_service_date,
+    cached_gtfs_file,
     routes_for_service_date,
 )
 
+from tests.test_resources import LocalS3Location
+
 
 @mock.patch("lamp_py.utils.gtfs_utils.object_exists")
 def test_bus_routes_for_service_date(exists_patch: mock.MagicMock) -> None:
@@ -72,3 +80,69 @@ def test_routes_for_service_date(exists_patch: mock.MagicMock) -> None:
     # check that we're getting a non empty list
     assert len(routes) > 0
     assert routes["route_type"].unique().to_list() == [0, 1, 2, 3, 4]
+
+
+def test_cached_gtfs_file(tmp_path: Path) -> None:
+    """
+    Test that s3 GTFS archive files are downloaded once per ETag, and that
+    copies of replaced archive files are removed from the cache once unused
+    for the grace period
+    """
+    routes_file = LocalS3Location(bucket="PUBLIC_ARCHIVE", prefix="lamp/gtfs_archive/2023/routes.parquet").s3_uri
+    routes_uri = "s3://mbta-ctd-dataplatform-archive/lamp/gtfs_archive/2023/routes.parquet"
+
+    def copy_routes(_: str, file_name: str) -> bool:
+        shutil.copyfile(routes_file, file_name)
+        return True
+
+    cache_dir = tmp_path.joinpath("gtfs_archive_cache")
+    with (
+        mock.patch("lamp_py.utils.gtfs_utils.GTFS_CACHE_DIR", str(cache_dir)),
+        mock.patch("lamp_py.aws.s3.object_etag") as etag_patch,
+        mock.patch("lamp_py.aws.s3.download_file", side_effect=copy_routes) as download_patch,
+    ):
+        # missing s3 objects are not cached
+        etag_patch.return_value = None
+        assert cached_gtfs_file(routes_uri) is None
+        download_patch.assert_not_called()
+
+        # first read downloads, second read uses local copy
+        etag_patch.return_value = "etag-1"
+        first_path = cached_gtfs_file(routes_uri)
+        assert first_path is not None
+        assert cached_gtfs_file(routes_uri) == first_path
+        assert download_patch.call_count == 1
+
+        # replaced archive file is downloaded again, recently used old copy
+        # is kept for lazy frames of other processes
+        in_progress = f"{first_path}.0"
+        shutil.copyfile(first_path, in_progress)
+        etag_patch.return_value = "etag-2"
+        second_path = cached_gtfs_file(routes_uri)
+        assert second_path is not None
+        assert second_path != first_path
+        assert download_patch.call_count == 2
+        assert os.path.exists(first_path)
+
+        # old copy is removed once unused for the grace period, downloads in
+        # progress in other processes are kept
+        stale_time = time.time() - CACHE_GRACE_SECONDS - 1
+        os.utime(first_path, (stale_time, stale_time))
+        os.remove(second_path)
+        assert cached_gtfs_file(routes_uri) == second_path
+        assert download_patch.call_count == 3
+        assert sorted(os.listdir(cache_dir)) == sorted([os.path.basename(second_path), os.path.basename(in_progress)])
+
+        # reading a copy marks it as recently used
+        os.utime(second_path, (stale_time, stale_time))
+        assert cached_gtfs_file(routes_uri) == second_path
+        assert os.path.getmtime(second_path) > stale_time + 1
+
+        # failed downloads fall back to reading from s3
+        etag_patch.return_value = "etag-3"
+        with mock.patch("os.replace", side_effect=FileNotFoundError):
+            assert cached_gtfs_file(routes_uri) == routes_uri
+        download_patch.side_effect = None
+        download_patch.return_value = False
+        assert cached_gtfs_file(routes_uri) == routes_uri
+        assert sorted(os.listdir(cache_dir)) == sorted([os.path.basename(second_path), os.path.basename(in_progress)])